@@ -0,0 +1,130 @@
+"""
+Keyphrase ranking (TextRank / TF-IDF) over per-sentence candidate phrases
+"""
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Ranking methods
+TEXTRANK = 'textrank'
+TFIDF = 'tfidf'
+
+# Candidate phrases beyond this many (by frequency) are dropped before building the graph
+MAX_CANDIDATES = 500
+
+
+def _index_phrases(sentences: Sequence[Sequence[str]]) -> Tuple[List[str], List[List[int]], np.ndarray]:
+    """
+    Assign ids to phrases, keeping the most frequent MAX_CANDIDATES
+
+    Returns:
+        Tuple of (phrases in first-occurrence order, per-sentence phrase ids, term frequencies)
+    """
+    counts: Dict[str, int] = {}
+    for phrases in sentences:
+        for phrase in phrases:
+            counts[phrase] = counts.get(phrase, 0) + 1
+
+    if len(counts) > MAX_CANDIDATES:
+        keep = set(sorted(counts, key=lambda p: -counts[p])[:MAX_CANDIDATES])
+        counts = {p: c for p, c in counts.items() if p in keep}
+
+    ids = {phrase: i for i, phrase in enumerate(counts)}
+    sentence_ids = [sorted({ids[p] for p in phrases if p in ids}) for phrases in sentences]
+    frequencies = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    return list(counts), sentence_ids, frequencies
+
+
+def _textrank(sentence_ids: List[List[int]], size: int, damping: float = 0.85,
+              max_iter: int = 50, tol: float = 1e-6) -> np.ndarray:
+    """PageRank over the sentence co-occurrence graph of phrases"""
+    weights = np.zeros((size, size), dtype=np.float64)
+    for ids in sentence_ids:
+        if len(ids) > 1:
+            index = np.asarray(ids)
+            weights[np.ix_(index, index)] += 1.0
+    np.fill_diagonal(weights, 0.0)
+
+    out_degree = weights.sum(axis=1)
+    dangling = out_degree == 0
+    transition = np.divide(weights, out_degree[:, None], out=np.zeros_like(weights),
+                           where=~dangling[:, None])
+
+    rank = np.full(size, 1.0 / size)
+    for _ in range(max_iter):
+        spread = rank[dangling].sum() / size
+        updated = (1 - damping) / size + damping * (transition.T @ rank + spread)
+        if np.abs(updated - rank).sum() < tol:
+            rank = updated
+            break
+        rank = updated
+    return rank
+
+
+def _tfidf(sentence_ids: List[List[int]], frequencies: np.ndarray) -> np.ndarray:
+    """TF-IDF treating every sentence as a document"""
+    document_frequency = np.zeros(len(frequencies), dtype=np.float64)
+    for ids in sentence_ids:
+        document_frequency[ids] += 1
+    n_sentences = len(sentence_ids)
+    idf = np.log((1 + n_sentences) / (1 + document_frequency)) + 1
+    return frequencies * idf
+
+
+def rank_phrases(sentences: Sequence[Sequence[str]], top_n: int = 20,
+                 method: str = TEXTRANK) -> List[Tuple[str, float]]:
+    """
+    Rank candidate phrases
+
+    Args:
+        sentences: Candidate phrases of each sentence, in document order
+        top_n: Number of phrases to return
+        method: TEXTRANK or TFIDF
+
+    Returns:
+        List of (phrase, weight) sorted by weight, weights scaled so the best is 1.0
+    """
+    phrases, sentence_ids, frequencies = _index_phrases(sentences)
+    if not phrases:
+        return []
+
+    if method == TEXTRANK:
+        scores = _textrank(sentence_ids, len(phrases))
+        # Break ties between isolated phrases by how often they occur
+        scores = scores * (1 + np.log(frequencies))
+    elif method == TFIDF:
+        scores = _tfidf(sentence_ids, frequencies)
+    else:
+        raise ValueError(f"Unknown ranking method: {method}")
+
+    scores = scores / scores.max()
+    # Stable sort keeps first-occurrence order among equal scores
+    order = np.argsort(-scores, kind='stable')[:top_n]
+    return [(phrases[i], float(scores[i])) for i in order]
+
+
+def rank_sentences(sentences: Sequence[Sequence[str]], phrase_weights: Dict[str, float],
+                   top_n: int = 3) -> List[int]:
+    """
+    Pick the sentences that carry the most phrase weight
+
+    Args:
+        sentences: Candidate phrases of each sentence, in document order
+        phrase_weights: Weight per phrase, e.g. from rank_phrases
+        top_n: Number of sentences to return
+
+    Returns:
+        Indices of the selected sentences, in document order
+    """
+    scores = []
+    for index, phrases in enumerate(sentences):
+        unique = set(phrases)
+        if not unique:
+            continue
+        total = sum(phrase_weights.get(p, 0.0) for p in unique)
+        # Damp long sentences so they do not win just by listing everything
+        scores.append((total / (1 + math.log(len(unique))), index))
+
+    best = sorted(scores, key=lambda item: (-item[0], item[1]))[:top_n]
+    return sorted(index for score, index in best if score > 0)
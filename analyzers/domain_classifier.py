@@ -0,0 +1,135 @@
+"""
+Multi-pattern domain classifier built on an Aho-Corasick automaton
+"""
+import json
+from typing import Dict, Iterable, List, Mapping, Optional
+
+# Separator placed between words; never part of a keyword, so matches cannot span words
+_SEPARATOR = '\0'
+
+
+class DomainClassifier:
+    """
+    Score text against a domain lexicon in a single linear pass
+
+    Every keyword of every domain is compiled into one Aho-Corasick automaton.
+    Each automaton state carries a bitmask of the domains whose keywords end
+    there, so a word's matches are combined with a bitwise OR. The cost does
+    not depend on how many domains or keywords the lexicon has.
+
+    A word counts once for a domain when any of the domain's keywords occurs
+    inside it, e.g. "learning" matches "e-learning" and "learnings".
+    """
+
+    def __init__(self, lexicon: Mapping[str, Iterable[str]]):
+        """
+        Args:
+            lexicon: Mapping of domain name to its keywords
+        """
+        self.domains: List[str] = list(lexicon)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [0]
+
+        for index, domain in enumerate(self.domains):
+            for keyword in lexicon[domain]:
+                keyword = keyword.lower().strip()
+                if keyword:
+                    self._add_keyword(keyword, 1 << index)
+
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path: str) -> 'DomainClassifier':
+        """
+        Load a lexicon from a JSON file of the form {"domain": ["keyword", ...]}
+
+        Args:
+            path: Path to the lexicon file
+
+        Returns:
+            Compiled classifier
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _add_keyword(self, keyword: str, mask: int) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(0)
+            state = next_state
+        self._output[state] |= mask
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first construction of failure links, merging outputs along them"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def _match_masks(self, words: List[str]) -> List[int]:
+        """Return, for each word, the bitmask of domains with a keyword inside it"""
+        goto, fail, output = self._goto, self._fail, self._output
+        masks = [0] * len(words)
+        index = 0
+        state = 0
+        for char in _SEPARATOR.join(words):
+            if char == _SEPARATOR:
+                index += 1
+                state = 0
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            masks[index] |= output[state]
+        return masks
+
+    def score(self, words: Iterable[str], weights: Optional[Iterable[float]] = None) -> Dict[str, float]:
+        """
+        Score every domain against a list of words
+
+        Args:
+            words: Words to classify (matched case-insensitively)
+            weights: Optional weight per word (e.g. its frequency); defaults to 1
+
+        Returns:
+            Dictionary of domain name to score, in lexicon order
+        """
+        words = [word.lower() for word in words]
+        weights = [1] * len(words) if weights is None else list(weights)
+
+        totals = [0] * len(self.domains)
+        for mask, weight in zip(self._match_masks(words), weights):
+            while mask:
+                low_bit = mask & -mask
+                totals[low_bit.bit_length() - 1] += weight
+                mask ^= low_bit
+
+        return dict(zip(self.domains, totals))
+
+    def classify(self, words: Iterable[str], default: str = "general topic") -> str:
+        """
+        Return the best scoring domain, or ``default`` when nothing matches
+
+        Ties go to the domain listed first in the lexicon.
+        """
+        best_domain, best_score = default, 0
+        for domain, value in self.score(words).items():
+            if value > best_score:
+                best_domain, best_score = domain, value
+        return best_domain
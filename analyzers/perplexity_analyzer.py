@@ -5,27 +5,49 @@ import os
 import logging
 import aiohttp
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
 import asyncio
+import time
 from mocks.mock_api import MockPerplexityAPI
 
 # Sửa import từ relative thành absolute
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config  # Thay đổi từ relative thành absolute import
+from utils.metrics import API_CALL_SECONDS, API_RETRIES
+from utils.tracing import span, traced, current_span
+from utils.instrumentation import Instrument
+from utils.memory import track
 
 # Load environment variables
 load_dotenv()
 
 # Setup logger
 logger = logging.getLogger('perplexity_analyzer')
+instrument = Instrument(logger)
+
+# Shared TextAnalyzer for hybrid mode, loaded on first use
+_text_analyzer = None
+_text_analyzer_unavailable = False
+
+def _load_text_analyzer():
+    """Return the shared TextAnalyzer, or None when spaCy or its model is unavailable"""
+    global _text_analyzer, _text_analyzer_unavailable
+    if _text_analyzer is None and not _text_analyzer_unavailable:
+        try:
+            from analyzers.text_analyzer import text_analyzer
+            _text_analyzer = text_analyzer
+        except Exception as e:
+            logger.warning(f"Local NLP unavailable, concepts will be extracted via API: {str(e)}")
+            _text_analyzer_unavailable = True
+    return _text_analyzer
 
 class PerplexityAnalyzer:
     def __init__(self):
         # Load config
         self.api_key = os.getenv('PERPLEXITY_API_KEY')
-        self.base_url = "https://api.perplexity.ai/chat/completions"
+        self.base_url = Config.PERPLEXITY_BASE_URL
         self.model = os.getenv('PERPLEXITY_MODEL', 'sonar-medium-online')
         
         # Check for development mode override
@@ -41,8 +63,13 @@ class PerplexityAnalyzer:
             logger.info("Using Perplexity Pro API with model: " + self.model)
             self.use_api = True
         
+        self.analysis_mode = Config.ANALYSIS_MODE
+        
         logger.debug(f"Initialized with model: {self.model}")
+        # Live analyzers and sessions are reported by GET /api/memory
+        track('perplexity_analyzer', self)
 
+    @traced('analyzer.analyze')
     async def analyze(self, text: str) -> Dict[str, Any]:
         """
         Analyze text using Perplexity API
@@ -61,7 +88,7 @@ class PerplexityAnalyzer:
         # Check if using API or default responses
         if not self.use_api:
             logger.warning("Using default responses instead of API")
-            return {
+            results = {
                 "text": text,
                 "key_concepts": ["concept 1", "concept 2", "concept 3"],
                 "themes": ["theme 1", "theme 2"],
@@ -74,16 +101,27 @@ class PerplexityAnalyzer:
                 "analogies": self._get_default_result("analogies"),
                 "blooms": self._get_default_result("blooms")
             }
+            return results
         
         if not self.api_key:
             raise ValueError("API key is required")
         
+        # In hybrid mode concepts, themes and entities come from local NLP
+        # (the mock path above keeps its canned results and never loads spaCy)
+        local_data = None
+        if self.analysis_mode == 'hybrid':
+            local_data = await self._extract_locally(text)
+        
         try:
             # Create a session for API calls
             async with aiohttp.ClientSession() as session:
+                track('aiohttp_session', session)
                 # First, extract key concepts, themes, and entities
-                logger.info("Extracting concepts and entities...")
-                extracted_data = await self._extract_concepts_and_entities(session, text)
+                if local_data:
+                    extracted_data = local_data
+                else:
+                    logger.info("Extracting concepts and entities...")
+                    extracted_data = await self._extract_concepts_and_entities(session, text)
                 
                 # Generate different types of content
                 results = {
@@ -98,6 +136,9 @@ class PerplexityAnalyzer:
                     "summary": await self._generate_summary(session, text)
                 }
                 
+                if "concept_weights" in extracted_data:
+                    results["concept_weights"] = extracted_data["concept_weights"]
+                
                 # Generate Bloom's taxonomy questions
                 results["blooms"] = await self._generate_blooms_questions(session, text)
                 
@@ -111,6 +152,25 @@ class PerplexityAnalyzer:
             logger.error(f"Analysis failed: {str(e)}")
             raise
 
+    @traced('analyzer.extract_locally')
+    async def _extract_locally(self, text: str) -> Optional[Dict[str, Any]]:
+        """Extract concepts, themes and entities with spaCy, off the event loop"""
+        analyzer = _load_text_analyzer()
+        if analyzer is None:
+            return None
+        
+        try:
+            loop = asyncio.get_running_loop()
+            profile = await loop.run_in_executor(None, analyzer.profile, text)
+            # The profile is the ProfileCache entry itself; copy so results cannot modify the cache
+            return {
+                key: [dict(item) if isinstance(item, dict) else item for item in value] if isinstance(value, list) else value
+                for key, value in profile["insights"].items()
+            }
+        except Exception as e:
+            logger.warning(f"Local extraction failed, falling back to API: {str(e)}")
+            return None
+
     def _preprocess_text(self, text: str) -> str:
         """Preprocess text before analysis"""
         # Remove excessive whitespace
@@ -120,43 +180,43 @@ class PerplexityAnalyzer:
     async def _generate_questions(self, session: aiohttp.ClientSession, text: str) -> List[str]:
         """Generate Socratic questions based on the text"""
         prompt = f"Generate 5 Socratic questions about the following text:\n\n{text}"
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='questions')
         return self._process_response(result, "questions")
     
     async def _generate_explanations(self, session: aiohttp.ClientSession, text: str) -> List[str]:
         """Generate multi-level explanations about the text"""
         prompt = f"Generate multi-level explanations for the following text. Include basic, intermediate, and advanced explanations:\n\n{text}"
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='explanations')
         return self._process_response(result, "explanations")
     
     async def _generate_practice_questions(self, session: aiohttp.ClientSession, text: str) -> List[str]:
         """Generate practice questions based on the text"""
         prompt = f"Create 5 practice questions with varying difficulty levels based on this text:\n\n{text}"
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='practice')
         return self._process_response(result, "practice")
 
     async def _generate_key_terms(self, session: aiohttp.ClientSession, text: str) -> List[str]:
         """Generate key terms and definitions from the text"""
         prompt = f"Extract important terms and provide definitions from this text:\n\n{text}"
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='key_terms')
         return self._process_response(result, "key_terms")
     
     async def _generate_summary(self, session: aiohttp.ClientSession, text: str) -> List[str]:
         """Generate a summary of the text"""
         prompt = f"Provide a comprehensive summary of this text:\n\n{text}"
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='summary')
         return self._process_response(result, "summary")
 
     async def _generate_blooms_questions(self, session: aiohttp.ClientSession, text: str) -> List[str]:
         """Generate questions using Bloom's taxonomy levels"""
         prompt = f"Create questions for each level of Bloom's taxonomy (remember, understand, apply, analyze, evaluate, create) based on this text:\n\n{text}"
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='blooms')
         return self._process_response(result, "blooms")
     
     async def _generate_analogies(self, session: aiohttp.ClientSession, text: str) -> List[str]:
         """Generate analogies to explain concepts in the text"""
         prompt = f"Create 3-5 analogies to explain the concepts in this text:\n\n{text}"
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='analogies')
         return self._process_response(result, "analogies")
 
     def _process_response(self, result: str, type: str) -> List[str]:
@@ -198,6 +258,8 @@ class PerplexityAnalyzer:
 
     async def _call_api(self, session: aiohttp.ClientSession, prompt: str) -> str:
         """Call Perplexity API with given prompt"""
+        start = time.perf_counter()
+        status = 'error'
         try:
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -235,6 +297,7 @@ class PerplexityAnalyzer:
                 json=data,
                 timeout=60
             ) as response:
+                status = str(response.status)
                 response_text = await response.text()
                 logger.debug(f"Response status: {response.status}")
                 
@@ -275,35 +338,51 @@ class PerplexityAnalyzer:
         except Exception as e:
             logger.error(f"API call error: {str(e)}")
             return None
+        finally:
+            elapsed = time.perf_counter() - start
+            API_CALL_SECONDS.labels(status).observe(elapsed)
+            current_span().set_attribute('http.status_code', status)
+            # Parsed by tools/analyze_logs.py (JSON data fields or this message)
+            instrument.info("API call to {endpoint}: {status_code} in {duration_ms} ms",
+                            endpoint=self.base_url, status_code=status, duration_ms=round(elapsed * 1000, 3))
 
-    async def _call_api_with_retry(self, session: aiohttp.ClientSession, prompt: str, max_retries=3) -> str:
-        """Call Perplexity API with retry logic"""
-        retries = 0
-        while retries < max_retries:
-            try:
-                result = await self._call_api(session, prompt)
-                if result:
-                    return result
-                
-                # If we get here, the API call failed
-                retries += 1
-                logger.warning(f"API call failed. Retrying ({retries}/{max_retries})...")
-                await asyncio.sleep(1 * retries)  # Exponential backoff
-            except Exception as e:
-                logger.error(f"API call attempt {retries+1} failed: {str(e)}")
-                retries += 1
-                if retries >= max_retries:
-                    logger.error(f"Maximum retry attempts ({max_retries}) reached")
-                    return None
-                await asyncio.sleep(1 * retries)  # Exponential backoff
-        
-        return None
+    async def _call_api_with_retry(self, session: aiohttp.ClientSession, prompt: str, max_retries=3,
+                                   operation: str = 'call') -> str:
+        """Call Perplexity API with retry logic; traced as one span with a child span per attempt"""
+        with span('perplexity.call', operation=operation) as call_span:
+            retries = 0
+            while retries < max_retries:
+                try:
+                    with span('perplexity.attempt', attempt=retries + 1):
+                        result = await self._call_api(session, prompt)
+                    if result:
+                        call_span.set_attribute('retries', retries)
+                        return result
+                    
+                    # If we get here, the API call failed
+                    retries += 1
+                    if retries < max_retries:
+                        API_RETRIES.inc()
+                    logger.warning(f"API call failed. Retrying ({retries}/{max_retries})...")
+                    await asyncio.sleep(1 * retries)  # Exponential backoff
+                except Exception as e:
+                    logger.error(f"API call attempt {retries+1} failed: {str(e)}")
+                    retries += 1
+                    if retries >= max_retries:
+                        logger.error(f"Maximum retry attempts ({max_retries}) reached")
+                        call_span.set_attribute('retries', retries)
+                        return None
+                    API_RETRIES.inc()
+                    await asyncio.sleep(1 * retries)  # Exponential backoff
+            
+            call_span.set_attribute('retries', retries)
+            return None
 
     async def _extract_concepts_and_entities(self, session: aiohttp.ClientSession, text: str) -> Dict[str, List[str]]:
         """Extract key concepts, themes, and entities from text"""
         prompt = f"Extract from this text: 1) 5 key concepts, 2) 3 main themes, 3) important entities (people, places, technologies mentioned). Format as JSON with keys 'key_concepts', 'themes', 'entities', each containing an array of strings:\n\n{text}"
         
-        result = await self._call_api_with_retry(session, prompt)
+        result = await self._call_api_with_retry(session, prompt, operation='concepts')
         
         if not result:
             return {
@@ -0,0 +1,146 @@
+"""
+Bounded cache of text analysis profiles keyed by content hash
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from utils.memory import deep_sizeof
+
+logger = logging.getLogger('profile_cache')
+
+
+class ProfileCache:
+    """
+    LRU cache of extracted analysis profiles with optional disk persistence
+
+    Profiles are plain JSON-serializable dicts, so a hit never touches spaCy.
+    When ``cache_dir`` is set, entries evicted from memory (or written by
+    another process) are still found on disk.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        """
+        Args:
+            max_entries: Maximum number of profiles kept in memory
+            cache_dir: Directory for persisted profiles, or None to keep them in memory only
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, *salt: str) -> str:
+        """
+        Build a cache key from the text content and optional salt values
+
+        Args:
+            text: Text being analyzed
+            salt: Extra values (model name, profile version) that invalidate the key when changed
+
+        Returns:
+            Hex digest key
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        for value in salt:
+            digest.update(str(value).encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached profile for a key, or None"""
+        with self._lock:
+            profile = self._entries.get(key)
+            if profile is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return profile
+
+        if self.cache_dir:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    profile = json.load(f)
+            except FileNotFoundError:
+                profile = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read cached profile {key}: {str(e)}")
+                profile = None
+
+            if profile is not None:
+                self._remember(key, profile)
+                with self._lock:
+                    self.hits += 1
+                return profile
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, profile: Dict[str, Any]) -> None:
+        """Store a profile in memory and, if enabled, on disk"""
+        self._remember(key, profile)
+
+        if self.cache_dir:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(profile, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except (OSError, TypeError) as e:
+                logger.warning(f"Could not persist profile {key}: {str(e)}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def _remember(self, key: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = profile
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop all in-memory entries, and persisted ones when ``disk`` is True"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+        if disk and self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'persistent': bool(self.cache_dir)
+            }
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Approximate bytes held by the in-memory entries"""
+        with self._lock:
+            entries = dict(self._entries)
+        return {'bytes': deep_sizeof(entries), 'entries': len(entries), 'max_entries': self.max_entries}
@@ -0,0 +1,118 @@
+"""
+Text sanitization built on translate deletion tables and precompiled patterns
+"""
+import re
+from typing import Dict
+
+# Whitespace policies
+WHITESPACE_KEEP = 'keep'          # keep tabs, newlines and carriage returns as-is
+WHITESPACE_NEWLINES = 'newlines'  # normalize line endings to \n, tabs become spaces
+WHITESPACE_COLLAPSE = 'collapse'  # every whitespace run becomes a single space
+WHITESPACE_DROP = 'drop'          # delete tabs and newlines (legacy behaviour)
+
+WHITESPACE_POLICIES = (WHITESPACE_KEEP, WHITESPACE_NEWLINES, WHITESPACE_COLLAPSE, WHITESPACE_DROP)
+
+# Characters that could be interpreted as markup
+DEFAULT_REMOVE_CHARS = '<>'
+
+# Whitespace control characters handled by the whitespace policy
+_WHITESPACE_CONTROLS = '\t\n\r\x0b\x0c'
+
+# Precompiled patterns
+_CRLF_PATTERN = re.compile(r'\r\n?')
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+
+def _char_class(chars: str) -> 're.Pattern':
+    """Compile a pattern matching runs of any of the given characters"""
+    return re.compile('[' + ''.join(re.escape(c) for c in sorted(set(chars))) + ']+')
+
+
+class TextSanitizer:
+    """
+    Remove markup characters and control characters from user input
+
+    The policy is compiled once into a deletion table and a replacement map.
+    ASCII input (the common case) is cleaned with a single ``bytes.translate``
+    call; other input goes through a precompiled deletion pattern and
+    ``str.translate``. Both run in C, with no per-character Python work, and
+    replace each character on its own so they give identical results.
+    """
+
+    def __init__(self, whitespace: str = WHITESPACE_KEEP, strip_c1: bool = True,
+                 remove_chars: str = DEFAULT_REMOVE_CHARS):
+        """
+        Args:
+            whitespace: One of WHITESPACE_POLICIES
+            strip_c1: Also remove C1 control characters (U+0080-U+009F)
+            remove_chars: Additional characters to delete
+        """
+        if whitespace not in WHITESPACE_POLICIES:
+            raise ValueError(f"Unknown whitespace policy: {whitespace}")
+
+        self.whitespace = whitespace
+        self.strip_c1 = strip_c1
+        self.remove_chars = remove_chars
+
+        delete, replace = self._build_tables()
+
+        # Unicode path
+        self._delete_pattern = _char_class(delete)
+        self._replace_table = str.maketrans(replace) if replace else None
+
+        # ASCII fast path
+        ascii_delete = ''.join(c for c in delete if ord(c) < 0x80)
+        self._ascii_delete = ascii_delete.encode('ascii')
+        self._ascii_table = bytes.maketrans(
+            ''.join(replace).encode('ascii'),
+            ''.join(replace.values()).encode('ascii')
+        )
+        self._ascii_only = all(ord(c) < 0x80 for c in remove_chars)
+
+    def _build_tables(self):
+        """Return the characters to delete and the replacement map for the policy"""
+        delete = {chr(code) for code in range(0x20)}
+        delete.add('\x7f')
+        if self.strip_c1:
+            delete.update(chr(code) for code in range(0x80, 0xA0))
+        delete.update(self.remove_chars)
+
+        replace: Dict[str, str] = {}
+        if self.whitespace == WHITESPACE_KEEP:
+            delete.difference_update(_WHITESPACE_CONTROLS)
+        elif self.whitespace == WHITESPACE_NEWLINES:
+            # \r is kept so the CRLF pattern can normalize line endings
+            delete.difference_update(_WHITESPACE_CONTROLS)
+            replace = {'\t': ' ', '\x0b': ' ', '\x0c': ' '}
+        elif self.whitespace == WHITESPACE_COLLAPSE:
+            # Runs are collapsed afterwards, so controls only need to become whitespace
+            delete.difference_update(_WHITESPACE_CONTROLS)
+
+        return ''.join(sorted(delete)), replace
+
+    def sanitize(self, text: str) -> str:
+        """
+        Sanitize input text
+
+        Args:
+            text: Text to sanitize
+
+        Returns:
+            Sanitized text
+        """
+        if not text:
+            return ''
+
+        if self._ascii_only and text.isascii():
+            text = text.encode('ascii').translate(self._ascii_table, self._ascii_delete).decode('ascii')
+        else:
+            text = self._delete_pattern.sub('', text)
+            if self._replace_table is not None:
+                text = text.translate(self._replace_table)
+
+        if self.whitespace == WHITESPACE_NEWLINES:
+            text = _CRLF_PATTERN.sub('\n', text)
+        elif self.whitespace == WHITESPACE_COLLAPSE:
+            text = _WHITESPACE_RUN.sub(' ', text)
+
+        return text.strip()
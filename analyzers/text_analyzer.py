@@ -1,8 +1,8 @@
 # analyzers/text_analyzer.py
 import spacy
-import re
+from spacy.attrs import IDX, LENGTH, ORTH, IS_PUNCT, IS_SPACE
+import numpy as np
 from collections import Counter
-from functools import lru_cache
 from typing import List, Dict, Any, Union
 import os
 import sys
@@ -11,7 +11,23 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Config
-from learning_framework.utils.logger import setup_logger
+from utils.logger import setup_logger
+from analyzers.text_stats import text_statistics, statistics_from_offsets
+from analyzers.sanitizer import TextSanitizer
+from analyzers.profile_cache import ProfileCache
+from analyzers.domain_classifier import DomainClassifier
+from analyzers.concept_ranker import rank_phrases, rank_sentences
+from utils.memory import process_rss, register_component
+from utils.metrics import register_cache
+
+# Entity labels reported as "entities" (people, places, organizations, technologies...)
+ENTITY_LABELS = {
+    'PERSON', 'NORP', 'FAC', 'ORG', 'GPE', 'LOC', 'PRODUCT',
+    'EVENT', 'WORK_OF_ART', 'LAW', 'LANGUAGE'
+}
+
+# Bump when the profile layout changes so cached profiles are not reused
+PROFILE_VERSION = 3
 
 # Setup logger
 logger = setup_logger(__name__)
@@ -24,6 +40,12 @@ class TextAnalyzer:
     def __init__(self):
         self.max_text_size = Config.MAX_TEXT_SIZE
         self.default_language = Config.DEFAULT_LANGUAGE
+        self.sanitizer = TextSanitizer(whitespace=Config.SANITIZE_WHITESPACE)
+        self.profile_cache = ProfileCache(
+            max_entries=Config.PROFILE_CACHE_SIZE,
+            cache_dir=Config.PROFILE_CACHE_DIR if Config.PROFILE_CACHE_PERSIST else None
+        )
+        self.domain_classifier = DomainClassifier.from_file(Config.DOMAIN_LEXICON_PATH)
         try:
             # Load appropriate language model
             if self.default_language == "en":
@@ -44,6 +66,7 @@ class TextAnalyzer:
     
     def _load_spacy_model(self, model_name: str):
         """Load spaCy model with error handling and download if needed"""
+        rss_before = process_rss()
         try:
             self.nlp = spacy.load(model_name)
         except OSError:
@@ -51,6 +74,21 @@ class TextAnalyzer:
             import subprocess
             subprocess.run([sys.executable, "-m", "spacy", "download", model_name], check=True)
             self.nlp = spacy.load(model_name)
+        # RSS growth while loading: the model's weights and tables are mostly
+        # native memory that sys.getsizeof cannot see
+        rss_after = process_rss()
+        self.model_load_bytes = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    
+    def memory_report(self) -> Dict[str, Any]:
+        """Memory held by the spaCy model (process growth measured at load time)"""
+        vectors = self.nlp.vocab.vectors
+        return {
+            'bytes': self.model_load_bytes,
+            'model': f"{self.nlp.meta.get('lang', '')}_{self.nlp.meta.get('name', '')}",
+            'pipeline': list(self.nlp.pipe_names),
+            'vocab_strings': len(self.nlp.vocab.strings),
+            'vectors_bytes': int(vectors.data.nbytes) if vectors.shape[0] else 0
+        }
     
     def sanitize_text(self, text: str) -> str:
         """
@@ -62,11 +100,8 @@ class TextAnalyzer:
         Returns:
             Sanitized text
         """
-        # Remove dangerous special characters
-        text = re.sub(r'[<>]', '', text)
-        # Remove control characters
-        text = ''.join(char for char in text if ord(char) >= 32)
-        return text.strip()
+        # Remove dangerous special characters and control characters in one pass
+        return self.sanitizer.sanitize(text)
     
     def analyze(self, text: str) -> Dict[str, Any]:
         """
@@ -87,29 +122,54 @@ class TextAnalyzer:
 
         try:
             # Perform basic analysis
-            words = self._tokenize(text)
+            stats = text_statistics(text)
             
             return {
                 'text': text,
                 'language': self.default_language,
-                'word_count': len(words),
-                'complexity': self._calculate_complexity(words),
+                'word_count': stats['word_count'],
+                'complexity': stats['complexity'],
+                'readability': stats['flesch_reading_ease'],
                 'error': None
             }
 
         except Exception as e:
             return self._get_error_result(str(e))
 
-    def _tokenize(self, text: str) -> List[str]:
-        """Split text into words"""
-        return re.findall(r'\w+', text.lower())
-
-    def _calculate_complexity(self, words: List[str]) -> int:
-        """Calculate text complexity score"""
-        if not words:
-            return 0
-        avg_word_length = sum(len(word) for word in words) / len(words)
-        return min(5, int(avg_word_length / 2))
+    def profile(self, text: str) -> Dict[str, Any]:
+        """
+        Run the full NLP extraction once and cache the result by content hash
+        
+        Args:
+            text: Text to profile
+            
+        Returns:
+            Profile with concepts, keywords, entities, themes, context and complexity
+        """
+        key = ProfileCache.make_key(
+            text, self.nlp.meta.get('name', ''), self.nlp.meta.get('version', ''), PROFILE_VERSION
+        )
+        cached = self.profile_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        doc = self.nlp(text)
+        profile = {
+            'key_concepts': self.extract_key_concepts(doc),
+            'keywords': self.extract_keywords(doc),
+            'entities': self.extract_entities(doc),
+            'sentences': self.extract_sentences(doc),
+            'noun_chunks': self.extract_noun_chunks(doc),
+            'related_concepts': self.extract_related_concepts(doc),
+            'context': self.extract_context(doc),
+            'domain_scores': self.extract_domain_scores(doc),
+            'problems': self.extract_problems(doc),
+            'themes': self.identify_themes(doc),
+            'complexity': self.assess_complexity(doc),
+            'insights': self.extract_local_insights(doc)
+        }
+        self.profile_cache.set(key, profile)
+        return profile
 
     def _get_error_result(self, error_message: str) -> Dict[str, Any]:
         """Return error result structure"""
@@ -118,6 +178,7 @@ class TextAnalyzer:
             'language': self.default_language,
             'word_count': 0,
             'complexity': 0,
+            'readability': 0.0,
             'error': error_message
         }
 
@@ -183,39 +244,87 @@ class TextAnalyzer:
             
         return related
     
-    def extract_context(self, doc) -> str:
-        """Determine the general context of the text"""
-        # Extract and analyze frequency of meaningful words
+    def _common_words(self, doc, limit: int = 10) -> List[str]:
+        """Most frequent content nouns in the document"""
         content_words = [token.text.lower() for token in doc 
                         if not token.is_stop and not token.is_punct and token.pos_ in ('NOUN', 'PROPN')]
+        return [word for word, freq in Counter(content_words).most_common(limit)]
+    
+    def extract_domain_scores(self, doc) -> Dict[str, float]:
+        """Score every domain of the lexicon against the text"""
+        return self.domain_classifier.score(self._common_words(doc))
+    
+    def extract_context(self, doc) -> str:
+        """Determine the general context of the text"""
+        # If no specific domain is identified, "general topic" is returned
+        return self.domain_classifier.classify(self._common_words(doc), default="general topic")
+    
+    def _sentence_phrases(self, doc):
+        """
+        Normalized noun-chunk candidates for every sentence
         
-        # Count frequency
-        word_freq = Counter(content_words)
-        common_words = [word for word, freq in word_freq.most_common(10)]
-        
-        # Domain keywords
-        domain_keywords = {
-            "education": ["learning", "education", "teaching", "knowledge", "understanding", "method"],
-            "business": ["business", "market", "customer", "sales", "marketing", "strategy"],
-            "technology": ["software", "data", "technology", "system", "network", "internet"],
-            "science": ["research", "method", "experiment", "theory", "analysis"],
-            "health": ["health", "disease", "treatment", "doctor", "medicine", "patient"]
-        }
+        Returns:
+            Tuple of (per-sentence phrase keys, display form for each key)
+        """
+        sentences = []
+        forms = {}
+        for sent in doc.sents:
+            phrases = []
+            for chunk in sent.noun_chunks:
+                tokens = [t for t in chunk if not t.is_stop and not t.is_punct and not t.like_num]
+                if not tokens:
+                    continue
+                surface = ' '.join(t.text for t in tokens)
+                key = surface.lower()
+                if len(key) < 2:
+                    continue
+                # Keep the first surface form for display
+                forms.setdefault(key, surface)
+                phrases.append(key)
+            sentences.append(phrases)
+        return sentences, forms
+    
+    def extract_ranked_concepts(self, doc, top_n: int = 20, method: str = 'textrank') -> List[Dict[str, Any]]:
+        """
+        Rank noun-chunk concepts with TextRank or TF-IDF
         
-        # Determine the domain with the most matches
-        domain_scores = {}
-        for domain, keywords in domain_keywords.items():
-            score = sum(1 for word in common_words if any(kw in word for kw in keywords))
-            domain_scores[domain] = score
+        Args:
+            doc: spaCy Doc
+            top_n: Number of concepts to return
+            method: 'textrank' or 'tfidf'
+            
+        Returns:
+            List of {'text', 'weight'} dicts, best first
+        """
+        sentences, forms = self._sentence_phrases(doc)
+        return [
+            {'text': forms[phrase], 'weight': weight}
+            for phrase, weight in rank_phrases(sentences, top_n=top_n, method=method)
+        ]
+    
+    def extract_local_insights(self, doc) -> Dict[str, Any]:
+        """
+        Derive key concepts, themes and entities locally, in the shape
+        PerplexityAnalyzer expects from its extraction prompt
+        """
+        sentences, forms = self._sentence_phrases(doc)
+        # Keep a long ranked list so generators can scale their concept budget
+        ranked = rank_phrases(sentences, top_n=100)
+        sentence_texts = [sent.text.strip() for sent in doc.sents]
         
-        # Choose the domain with the highest score
-        if domain_scores:
-            best_domain = max(domain_scores.items(), key=lambda x: x[1])
-            if best_domain[1] > 0:
-                return best_domain[0]
+        entities = []
+        for ent in doc.ents:
+            if ent.label_ in ENTITY_LABELS and ent.text not in entities:
+                entities.append(ent.text)
         
-        # If no specific domain is identified
-        return "general topic"
+        return {
+            'key_concepts': [forms[phrase] for phrase, weight in ranked[:5]],
+            'concept_weights': [
+                {'text': forms[phrase], 'weight': weight} for phrase, weight in ranked
+            ],
+            'themes': [sentence_texts[i] for i in rank_sentences(sentences, dict(ranked), top_n=3)],
+            'entities': entities[:10]
+        }
     
     def extract_problems(self, doc) -> List[str]:
         """Extract problems mentioned in the text"""
@@ -235,11 +344,41 @@ class TextAnalyzer:
     
     def assess_complexity(self, doc) -> Dict[str, float]:
         """Assess text complexity"""
+        if not len(doc):
+            return {
+                "avg_sentence_length": 0,
+                "unique_words": 0,
+                "total_words": 0,
+                "type_token_ratio": 0.0,
+                "syllables_per_word": 0.0,
+                "flesch_reading_ease": 0.0,
+                "flesch_kincaid_grade": 0.0
+            }
+
+        # Token attributes as arrays: one pass over the Doc instead of per-token Python objects
+        attrs = doc.to_array([IDX, LENGTH, ORTH, IS_PUNCT, IS_SPACE])
+        starts, lengths, orths = attrs[:, 0], attrs[:, 1], attrs[:, 2]
+        is_word = (attrs[:, 3] == 0) & (attrs[:, 4] == 0)
+        sentence_starts = np.fromiter((sent.start_char for sent in doc.sents), dtype=np.int64)
+
+        stats = statistics_from_offsets(
+            doc.text,
+            starts[is_word],
+            starts[is_word] + lengths[is_word],
+            sentence_starts
+        )
         return {
-            "avg_sentence_length": sum(len(sent) for sent in doc.sents) / len(list(doc.sents)) if doc.sents else 0,
-            "unique_words": len(set(token.text for token in doc)),
-            "total_words": len(doc)
+            "avg_sentence_length": len(doc) / len(sentence_starts) if len(sentence_starts) else 0,
+            "unique_words": int(np.unique(orths).size),
+            "total_words": len(doc),
+            "type_token_ratio": stats["type_token_ratio"],
+            "syllables_per_word": stats["syllables_per_word"],
+            "flesch_reading_ease": stats["flesch_reading_ease"],
+            "flesch_kincaid_grade": stats["flesch_kincaid_grade"]
         }
 
 # Create a singleton instance
-text_analyzer = TextAnalyzer()
\ No newline at end of file
+text_analyzer = TextAnalyzer()
+register_cache('text_profiles', text_analyzer.profile_cache.stats)
+register_component('spacy_model', text_analyzer.memory_report)
+register_component('cache.text_profiles', text_analyzer.profile_cache.memory_report)
\ No newline at end of file
@@ -0,0 +1,308 @@
+"""
+Vectorized text statistics for complexity and readability metrics
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Characters that terminate a sentence
+_SENTENCE_TERMINALS = np.array([ord(c) for c in ".!?"], dtype=np.uint32)
+
+# Vowels used for syllable estimation (ASCII, lower case)
+_VOWELS = np.array([ord(c) for c in "aeiouy"], dtype=np.uint32)
+
+# Separator used when concatenating documents in a batch (not a word char)
+_DOC_SEPARATOR = "\n"
+
+# Constants for the per-token rolling hash used by type/token ratio
+_HASH_BASE = np.uint64(1099511628211)
+_HASH_LENGTH_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+# Names of the per-document columns returned by compute_statistics
+STAT_FIELDS = (
+    "word_count",
+    "sentence_count",
+    "char_count",
+    "syllable_count",
+    "unique_words",
+    "avg_word_length",
+    "avg_sentence_length",
+    "type_token_ratio",
+    "syllables_per_word",
+    "flesch_reading_ease",
+    "flesch_kincaid_grade",
+    "complexity",
+)
+
+
+@lru_cache(maxsize=None)
+def _word_table() -> np.ndarray:
+    """Lookup table marking word characters (``\\w``) in the Basic Multilingual Plane"""
+    table = np.fromiter((chr(i).isalnum() for i in range(0x10000)), dtype=bool, count=0x10000)
+    table[ord("_")] = True
+    return table
+
+
+def _encode(text: str) -> np.ndarray:
+    """Convert text into an array of code points"""
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+
+
+def _word_mask(codes: np.ndarray) -> np.ndarray:
+    """Boolean mask of word characters; code points outside the BMP are treated as non-word"""
+    return _word_table()[np.minimum(codes, 0xFFFF)]
+
+
+def _fold_ascii(codes: np.ndarray) -> np.ndarray:
+    """Lower-case ASCII letters without changing string offsets"""
+    upper = (codes >= 65) & (codes <= 90)
+    return np.where(upper, codes | 0x20, codes)
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return start and end offsets of the True runs in a boolean mask"""
+    padded = np.zeros(len(mask) + 2, dtype=np.int8)
+    padded[1:-1] = mask
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def token_offsets(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute word token offsets for a text
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Tuple of (starts, ends) character offset arrays
+    """
+    return _runs(_word_mask(_encode(text)))
+
+
+def _sentence_breaks(codes: np.ndarray, words: np.ndarray) -> np.ndarray:
+    """
+    Offsets right after each sentence terminator run (``...``, ``?!``) that is
+    not followed by a word character, so decimals like ``3.14`` do not split
+    """
+    terminal = np.isin(codes, _SENTENCE_TERMINALS)
+    run_end = terminal.copy()
+    run_end[:-1] &= ~terminal[1:]
+    followed_by_word = np.zeros(len(codes), dtype=bool)
+    followed_by_word[:-1] = words[1:]
+    return np.flatnonzero(run_end & ~followed_by_word) + 1
+
+
+def _syllables(folded: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Estimate syllables per token by counting vowel groups"""
+    vowel = np.isin(folded, _VOWELS)
+    group_start = vowel.copy()
+    group_start[1:] &= ~vowel[:-1]
+    cumulative = np.zeros(len(folded) + 1, dtype=np.int64)
+    np.cumsum(group_start, out=cumulative[1:])
+    counts = cumulative[ends] - cumulative[starts]
+
+    # Silent trailing "e" (but not "-le" as in "table")
+    last = folded[ends - 1]
+    before_last = folded[np.maximum(ends - 2, starts)]
+    silent_e = (last == ord("e")) & (before_last != ord("l")) & (counts > 1)
+    counts -= silent_e
+    return np.maximum(counts, 1)
+
+
+def _token_hashes(folded: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Hash every token's case-folded characters into a single uint64"""
+    lengths = ends - starts
+    offsets = np.cumsum(lengths) - lengths
+    relative = np.arange(lengths.sum()) - np.repeat(offsets, lengths)
+    positions = np.repeat(starts, lengths) + relative
+
+    powers = np.full(int(lengths.max()), _HASH_BASE, dtype=np.uint64)
+    powers[0] = 1
+    powers = np.cumprod(powers, dtype=np.uint64)
+
+    values = (folded[positions].astype(np.uint64) + np.uint64(1)) * powers[relative]
+    hashes = np.add.reduceat(values, offsets)
+    return hashes ^ (lengths.astype(np.uint64) * _HASH_LENGTH_MIX)
+
+
+def _aggregate(
+    codes: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    sentence_breaks: np.ndarray,
+    doc_breaks: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate per-token arrays into per-document statistics
+
+    Args:
+        codes: Code points of the (concatenated) text
+        starts: Token start offsets
+        ends: Token end offsets
+        sentence_breaks: Sorted offsets where a new sentence begins
+        doc_breaks: Sorted offsets where each document ends
+
+    Returns:
+        Dictionary of per-document metric arrays keyed by STAT_FIELDS
+    """
+    n_docs = len(doc_breaks)
+    folded = _fold_ascii(codes)
+    lengths = ends - starts
+
+    doc_ids = np.searchsorted(doc_breaks, starts, side="right")
+    breaks = np.union1d(sentence_breaks, doc_breaks)
+    sentence_ids = np.searchsorted(breaks, starts, side="right")
+
+    words = np.bincount(doc_ids, minlength=n_docs).astype(np.float64)
+    chars = np.bincount(doc_ids, weights=lengths, minlength=n_docs)
+
+    if len(starts):
+        first_in_sentence = np.ones(len(starts), dtype=bool)
+        first_in_sentence[1:] = sentence_ids[1:] != sentence_ids[:-1]
+        sentences = np.bincount(doc_ids[first_in_sentence], minlength=n_docs).astype(np.float64)
+
+        syllable_counts = _syllables(folded, starts, ends)
+        syllables = np.bincount(doc_ids, weights=syllable_counts, minlength=n_docs)
+
+        hashes = _token_hashes(folded, starts, ends)
+        order = np.lexsort((hashes, doc_ids))
+        sorted_hashes = hashes[order]
+        sorted_docs = doc_ids[order]
+        distinct = np.ones(len(order), dtype=bool)
+        distinct[1:] = (sorted_hashes[1:] != sorted_hashes[:-1]) | (sorted_docs[1:] != sorted_docs[:-1])
+        unique = np.bincount(sorted_docs[distinct], minlength=n_docs).astype(np.float64)
+    else:
+        sentences = np.zeros(n_docs)
+        syllables = np.zeros(n_docs)
+        unique = np.zeros(n_docs)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_word_length = np.where(words > 0, chars / words, 0.0)
+        avg_sentence_length = np.where(sentences > 0, words / sentences, 0.0)
+        type_token_ratio = np.where(words > 0, unique / words, 0.0)
+        syllables_per_word = np.where(words > 0, syllables / words, 0.0)
+
+    has_words = words > 0
+    flesch = np.where(
+        has_words, 206.835 - 1.015 * avg_sentence_length - 84.6 * syllables_per_word, 0.0
+    )
+    grade = np.where(
+        has_words, 0.39 * avg_sentence_length + 11.8 * syllables_per_word - 15.59, 0.0
+    )
+    complexity = np.minimum(5, (avg_word_length / 2).astype(np.int64))
+
+    return {
+        "word_count": words.astype(np.int64),
+        "sentence_count": sentences.astype(np.int64),
+        "char_count": chars.astype(np.int64),
+        "syllable_count": syllables.astype(np.int64),
+        "unique_words": unique.astype(np.int64),
+        "avg_word_length": avg_word_length,
+        "avg_sentence_length": avg_sentence_length,
+        "type_token_ratio": type_token_ratio,
+        "syllables_per_word": syllables_per_word,
+        "flesch_reading_ease": flesch,
+        "flesch_kincaid_grade": grade,
+        "complexity": complexity,
+    }
+
+
+def compute_statistics(texts: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Compute statistics for many documents in a single vectorized pass
+
+    All documents are concatenated into one code point array, so the cost per
+    document is dominated by NumPy kernels rather than Python loops.
+
+    Args:
+        texts: Documents to analyze
+
+    Returns:
+        Dictionary of per-document metric arrays keyed by STAT_FIELDS
+    """
+    texts = list(texts)
+    if not texts:
+        return {field: np.zeros(0) for field in STAT_FIELDS}
+
+    codes = _encode(_DOC_SEPARATOR.join(texts))
+    words = _word_mask(codes)
+    starts, ends = _runs(words)
+
+    doc_lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    doc_breaks = np.cumsum(doc_lengths + 1) - 1
+
+    return _aggregate(codes, starts, ends, _sentence_breaks(codes, words), doc_breaks)
+
+
+def _to_row(columns: Dict[str, np.ndarray], index: int) -> Dict[str, float]:
+    """Convert one row of columnar statistics into plain Python numbers"""
+    return {field: columns[field][index].item() for field in STAT_FIELDS}
+
+
+def batch_text_statistics(texts: Sequence[str]) -> List[Dict[str, float]]:
+    """
+    Compute statistics for many documents
+
+    Args:
+        texts: Documents to analyze
+
+    Returns:
+        List of statistics dictionaries, one per document
+    """
+    columns = compute_statistics(texts)
+    return [_to_row(columns, i) for i in range(len(columns["word_count"]))]
+
+
+def text_statistics(text: str) -> Dict[str, float]:
+    """
+    Compute statistics for a single document
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        Dictionary of token, sentence and readability metrics
+    """
+    return _to_row(compute_statistics([text]), 0)
+
+
+def statistics_from_offsets(
+    text: str,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    sentence_starts: Optional[np.ndarray] = None,
+) -> Dict[str, float]:
+    """
+    Compute statistics from externally produced token offsets (e.g. a spaCy Doc)
+
+    Args:
+        text: Original text the offsets refer to
+        starts: Token start character offsets
+        ends: Token end character offsets
+        sentence_starts: Optional sentence start character offsets; detected
+            from punctuation when omitted
+
+    Returns:
+        Dictionary of token, sentence and readability metrics
+    """
+    codes = _encode(text)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+
+    if sentence_starts is None:
+        breaks = _sentence_breaks(codes, _word_mask(codes))
+    else:
+        breaks = np.asarray(sentence_starts, dtype=np.int64)
+        breaks = np.sort(breaks[breaks > 0])
+
+    columns = _aggregate(codes, starts, ends, breaks, np.array([len(codes)], dtype=np.int64))
+    return _to_row(columns, 0)
+
+
+def complexity_score(avg_word_length: float) -> int:
+    """Map average word length onto the 0-5 complexity scale used by TextAnalyzer"""
+    return min(5, int(avg_word_length / 2))
@@ -22,10 +22,10 @@ class PerplexityAnalyzer:
         if not text:
             return {"error": "No text provided"}
             
-        # If no specific generators are requested, use all available
-        from generators import AVAILABLE_GENERATORS
+        # If no specific generators are requested, use the default ones
+        from generators import AVAILABLE_GENERATORS, generator_registry
         if not generators:
-            generators = list(AVAILABLE_GENERATORS.keys())
+            generators = generator_registry.default_keys()
             
         result = {}
         
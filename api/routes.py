@@ -1,19 +1,111 @@
 """
 API Routes for learning framework
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 import os
 import logging
 import json
 import datetime
 import asyncio
 from analyzers.perplexity_analyzer import PerplexityAnalyzer
+from generators import generator_registry
+from generators.streaming import stream_generator
 from utils.logger import setup_logger
+from utils.tracing import start_trace
+from utils.profiler import try_start_profile, finish_profile
+from utils.memory import memory_report, allocation_tracker
+from config import Config
 
 # Khởi tạo blueprint và logger
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 logger = setup_logger('api', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs'))
 
+@api_bp.route('/generators', methods=['GET'])
+def list_generators():
+    """List every registered generator and the analysis fields it uses"""
+    return jsonify({'generators': generator_registry.describe()})
+
+@api_bp.route('/generators/<name>/stream', methods=['POST'])
+def stream_generator_output(name):
+    """Run one generator on an analysis and stream its output as NDJSON, one line per record"""
+    if name not in generator_registry:
+        return jsonify({'error': f"Unknown generator: {name}"}), 404
+    if not request.is_json:
+        return jsonify({'error': 'Content-Type must be application/json'}), 415
+
+    analysis = (request.get_json() or {}).get('analysis')
+    if not isinstance(analysis, dict):
+        return jsonify({'error': 'An "analysis" object is required'}), 400
+
+    def ndjson_lines():
+        try:
+            for line in stream_generator(name, analysis):
+                yield json.dumps({'line': line}, ensure_ascii=False) + '\n'
+        except Exception as e:
+            # Headers are already sent; report the failure as the last record
+            logger.error(f"Streaming generator {name} failed: {str(e)}")
+            yield json.dumps({'error': str(e)}) + '\n'
+
+    return Response(stream_with_context(ndjson_lines()), mimetype='application/x-ndjson')
+
+@api_bp.route('/profile', methods=['POST'])
+async def profile_window():
+    """Sample every thread for ?seconds=N (default 10) and write the folded stacks to Config.PROFILE_DIR"""
+    if not Config.PROFILING_ENABLED:
+        return jsonify({'error': 'Profiling is disabled'}), 404
+    try:
+        seconds = float(request.args.get('seconds', 10))
+    except ValueError:
+        return jsonify({'error': 'seconds must be a number'}), 400
+    if not 0 < seconds <= Config.PROFILE_MAX_SECONDS:
+        return jsonify({'error': f"seconds must be in (0, {Config.PROFILE_MAX_SECONDS:g}]"}), 400
+
+    profiler = try_start_profile(Config.PROFILE_INTERVAL)
+    if profiler is None:
+        return jsonify({'error': 'Another profile is running'}), 409
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        finish_profile(profiler)
+
+    return jsonify({
+        'file': profiler.write(Config.PROFILE_DIR, 'window'),
+        'samples': profiler.samples,
+        'duration_s': round(profiler.duration, 3),
+        'top_frames': profiler.top_frames()
+    })
+
+@api_bp.route('/memory', methods=['GET'])
+def memory_usage():
+    """Memory by component (spaCy model, caches), live analyzers/sessions/results and in-flight requests"""
+    if not Config.MEMORY_DEBUG_ENABLED:
+        return jsonify({'error': 'Memory debugging is disabled'}), 404
+    return jsonify(memory_report())
+
+@api_bp.route('/memory/snapshot', methods=['POST', 'DELETE'])
+def memory_snapshot():
+    """POST: start tracemalloc and take a baseline snapshot; DELETE: drop it and stop tracing"""
+    if not Config.MEMORY_DEBUG_ENABLED:
+        return jsonify({'error': 'Memory debugging is disabled'}), 404
+    if request.method == 'DELETE':
+        allocation_tracker.stop()
+        return jsonify(allocation_tracker.status())
+    return jsonify(allocation_tracker.snapshot(Config.TRACEMALLOC_FRAMES))
+
+@api_bp.route('/memory/diff', methods=['GET'])
+def memory_diff():
+    """Allocation growth since the baseline snapshot (?limit=20&group_by=lineno|filename|traceback)"""
+    if not Config.MEMORY_DEBUG_ENABLED:
+        return jsonify({'error': 'Memory debugging is disabled'}), 404
+    try:
+        limit = int(request.args.get('limit', 20))
+        rows = allocation_tracker.diff(limit, request.args.get('group_by', 'lineno'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify({'diff': rows, 'tracemalloc': allocation_tracker.status()})
+
 @api_bp.route('/analyze', methods=['POST'])
 async def analyze():
     """API endpoint for text analysis"""
@@ -45,7 +137,12 @@ async def analyze():
                 
         # Perform analysis
         try:
-            results = await analyzer.analyze(text)
+            trace_dir = Config.TRACE_DIR if Config.TRACE_EXPORT else None
+            with start_trace('POST /api/analyze', export_dir=trace_dir, text_length=len(text)) as trace:
+                results = await analyzer.analyze(text)
+            results['trace_id'] = trace.trace_id
+            if Config.DEBUG:
+                results['trace'] = trace.waterfall()
             
             # Save results if needed
             result_id = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
@@ -9,6 +9,7 @@ from pathlib import Path
 import json
 import datetime
 import asyncio
+import time
 
 # Ensure the current directory is in the Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,7 +17,7 @@ if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
 # Flask imports
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
 from flask_cors import CORS
 
 # Third party imports
@@ -28,9 +29,14 @@ from asgiref.wsgi import WsgiToAsgi
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from analyzers.perplexity_analyzer import PerplexityAnalyzer
 from utils.logger import setup_logger
-logger = setup_logger("app", log_dir="logs") # Thêm log_dir
+from utils.instrumentation import set_default_sample_rate
+from utils.metrics import metrics, REQUEST_SECONDS, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from utils.tracing import start_trace
+from utils.profiler import try_start_profile, finish_profile, profile_path
+from utils.memory import request_started, request_finished
 from config import Config  # Import Config class
-from generators import AVAILABLE_GENERATORS
+from generators import AVAILABLE_GENERATORS, GENERATOR_SPECS, generator_registry
+from generators.executor import GeneratorExecutor
 from api.routes import api_bp
 
 # Initialize Flask app
@@ -42,6 +48,18 @@ app.config['APP_NAME'] = 'Dannv Learning Framework'
 # Setup logging
 logger = setup_logger('app', os.path.join(os.path.dirname(__file__), 'logs'))
 
+# Sample hot-path generator events (warnings and errors are always kept)
+set_default_sample_rate(Config.LOG_SAMPLE_RATE)
+
+# Generator execution stage shared by all requests
+generator_executor = GeneratorExecutor(
+    AVAILABLE_GENERATORS,
+    timeout=Config.GENERATOR_TIMEOUT,
+    cpu_bound=Config.GENERATOR_PROCESS_POOL,
+    max_workers=Config.GENERATOR_WORKERS,
+    specs=GENERATOR_SPECS
+)
+
 # Create error handlers
 def handle_400_error(error):
     """Handle 400 errors"""
@@ -69,6 +87,75 @@ app.register_error_handler(500, handle_500_error)
 # Đăng ký blueprint trong phần setup app
 app.register_blueprint(api_bp)
 
+# Request timing for /metrics and in-flight requests for /api/memory
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.inflight_id = request_started(request.method, request.path, request.content_length or 0)
+
+@app.after_request
+def record_request_time(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Label by route pattern, not path, to keep the number of series bounded
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.labels(request.method, endpoint, response.status_code).observe(time.perf_counter() - start)
+    return response
+
+# Opt-in per-request sampling profile ('X-Profile: 1' header)
+@app.before_request
+def start_request_profile():
+    if Config.PROFILING_ENABLED and request.headers.get('X-Profile', '').lower() in ('1', 'true'):
+        # None if another profile is running; the request is served unprofiled
+        g.profiler = try_start_profile(Config.PROFILE_INTERVAL)
+
+@app.after_request
+def write_request_profile(response):
+    if 'profiler' in g:
+        profiler = g.pop('profiler')
+        if profiler is None:
+            response.headers['X-Profile-File'] = 'busy'
+            return response
+        label = f"{request.method}-{request.url_rule.rule if request.url_rule else 'unmatched'}"
+        if response.is_streamed:
+            # The body is produced after this hook returns: keep sampling until the
+            # stream is closed, and announce the file before the headers are sent
+            path = profile_path(Config.PROFILE_DIR, label)
+            response.headers['X-Profile-File'] = path
+            response.call_on_close(lambda: _save_profile(profiler, path))
+            return response
+        finish_profile(profiler)
+        try:
+            response.headers['X-Profile-File'] = profiler.write(Config.PROFILE_DIR, label)
+        except OSError as e:
+            logger.warning(f"Could not write profile: {str(e)}")
+    return response
+
+def _save_profile(profiler, path):
+    finish_profile(profiler)
+    try:
+        profiler.save(path)
+    except OSError as e:
+        logger.warning(f"Could not write profile: {str(e)}")
+
+@app.teardown_request
+def finish_inflight_request(error=None):
+    inflight_id = g.pop('inflight_id', None)
+    if inflight_id is not None:
+        request_finished(inflight_id)
+
+@app.teardown_request
+def stop_request_profile(error=None):
+    # after_request is skipped when the view raises; still free the profiler
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        finish_profile(profiler)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose counters, gauges and latency histograms in Prometheus text format"""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/', methods=['GET'])
 async def index():
     """Render main page"""
@@ -134,44 +221,41 @@ async def analyze():
                 
             # Perform analysis with enhanced error handling
             try:
-                # Get basic analysis from perplexity
-                analysis_results = await analyzers["perplexity"].analyze(text)
-                
-                # Apply requested generators to the analysis results
-                generated_content = {}
-                
-                # Determine which generators to run
-                generator_keys = list(AVAILABLE_GENERATORS.keys())
-                if methods and 'all' not in methods:
-                    generator_keys = [key for key in methods if key in AVAILABLE_GENERATORS]
-                
-                # Run the generators
-                for key in generator_keys:
-                    if key in AVAILABLE_GENERATORS:
-                        try:
-                            generator_fn = AVAILABLE_GENERATORS[key]
-                            # Truyền toàn bộ analysis_results vào generator
-                            generated_content[key] = generator_fn(analysis_results)
-                            logger.info(f"Successfully generated {key} content")
-                        except Exception as e:
-                            logger.error(f"Error generating {key} content: {str(e)}", exc_info=True)
-                            generated_content[key] = [f"Error generating content: {str(e)}"]
+                # Trace the analyzer, its API calls and the generators of this request
+                trace_dir = Config.TRACE_DIR if Config.TRACE_EXPORT else None
+                with start_trace('POST /analyze', export_dir=trace_dir, text_length=len(text)) as trace:
+                    # Get basic analysis from perplexity
+                    analysis_results = await analyzers["perplexity"].analyze(text)
+                    
+                    # Determine which generators to run
+                    generator_keys = generator_registry.default_keys()
+                    if methods and 'all' not in methods:
+                        generator_keys = [key for key in methods if key in AVAILABLE_GENERATORS]
+                    
+                    # Run the generators concurrently
+                    generated_content, generator_timings = await generator_executor.run(generator_keys, analysis_results)
                 
                 # Combine results
                 final_results = {
                     "analysis": analysis_results,
                     "content": generated_content,
+                    "timings": generator_timings,
+                    "trace_id": trace.trace_id,
                     "timestamp": datetime.datetime.now().isoformat(),
                     "text": text[:500] + "..." if len(text) > 500 else text  # Include truncated original text
                 }
+                if Config.DEBUG:
+                    # Span waterfall: which API call, retry or generator took the time
+                    final_results["trace"] = trace.waterfall()
                 
                 # Save results
                 result_id = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
                 results_dir = os.path.join(Config.RESULTS_DIR)
                 os.makedirs(results_dir, exist_ok=True)
                 
+                # Compact separators: result files are read back by the app, not by people
                 with open(os.path.join(results_dir, f"{result_id}.json"), 'w') as f:
-                    json.dump(final_results, f, indent=2)
+                    json.dump(final_results, f, separators=(',', ':'))
                 
                 # Return results with ID for future reference
                 final_results["id"] = result_id
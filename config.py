@@ -26,6 +26,28 @@ class Config:
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     LOG_FILE = 'logs/app.log'
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))  # Fraction of hot-path DEBUG/INFO events kept
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'True').lower() == 'true'  # Write log files from a background thread
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))  # Records buffered before the overflow policy applies
+    LOG_QUEUE_OVERFLOW = os.getenv('LOG_QUEUE_OVERFLOW', 'drop_new')  # 'drop_new' or 'drop_oldest'
+    LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '256'))  # Records written between flushes
+    
+    # Tracing: export each /analyze trace as OTLP/JSON; in debug mode the
+    # span waterfall is also saved with the result
+    DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+    TRACE_EXPORT = os.getenv('TRACE_EXPORT', 'False').lower() == 'true'
+    TRACE_DIR = os.getenv('TRACE_DIR', os.path.join('logs', 'traces'))
+    
+    # Sampling profiler: off unless enabled; then a request with the
+    # 'X-Profile: 1' header or POST /api/profile writes folded stacks
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join('logs', 'profiles'))
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.005'))  # Seconds between stack samples
+    PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', '60'))  # Longest time window for POST /api/profile
+    
+    # Memory accounting: GET /api/memory and the tracemalloc snapshot/diff endpoints
+    MEMORY_DEBUG_ENABLED = os.getenv('MEMORY_DEBUG_ENABLED', 'False').lower() == 'true'
+    TRACEMALLOC_FRAMES = int(os.getenv('TRACEMALLOC_FRAMES', '10'))  # Stack depth recorded per allocation
     
     # Cache
     CACHE_TYPE = 'filesystem'
@@ -41,11 +63,32 @@ class Config:
     # Text Analysis
     MAX_TEXT_SIZE = 50000  # Maximum text size in characters
     DEFAULT_LANGUAGE = 'en'  # Default language for analysis
+    SANITIZE_WHITESPACE = os.getenv('SANITIZE_WHITESPACE', 'keep')  # keep, newlines, collapse or drop
+    PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', '256'))  # Analysis profiles kept in memory
+    PROFILE_CACHE_PERSIST = os.getenv('PROFILE_CACHE_PERSIST', 'False').lower() == 'true'
+    PROFILE_CACHE_DIR = os.path.join(CACHE_DIR, 'profiles')
+    DOMAIN_LEXICON_PATH = os.getenv(
+        'DOMAIN_LEXICON_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analyzers', 'domain_lexicon.json')
+    )
     
     # Perplexity API - API endpoint URL
-    PERPLEXITY_BASE_URL = "https://api.perplexity.ai/chat/completions"
+    # Point at mocks/fake_perplexity_server.py to exercise the real HTTP path locally
+    PERPLEXITY_BASE_URL = os.getenv('PERPLEXITY_BASE_URL', "https://api.perplexity.ai/chat/completions")
     PERPLEXITY_MODEL = os.getenv('PERPLEXITY_MODEL', 'sonar-pro')
     
+    # Analysis mode: 'hybrid' extracts concepts/themes/entities locally with spaCy
+    # and uses the API only for generative sections; 'api' uses the API for everything.
+    # Without the API (DEVELOPMENT_MODE, mock responses) both modes return the canned results
+    ANALYSIS_MODE = os.getenv('ANALYSIS_MODE', 'hybrid').lower()
+    
+    # Generators: per-generator timeout, worker pool size and the keys of
+    # CPU-heavy generators to run in a process pool instead of threads
+    GENERATOR_TIMEOUT = float(os.getenv('GENERATOR_TIMEOUT', '30'))
+    GENERATOR_WORKERS = int(os.getenv('GENERATOR_WORKERS', '4'))
+    GENERATOR_CACHE_SIZE = int(os.getenv('GENERATOR_CACHE_SIZE', '1024'))  # Memoized generator outputs
+    GENERATOR_PROCESS_POOL = [key.strip() for key in os.getenv('GENERATOR_PROCESS_POOL', '').split(',') if key.strip()]
+    
     # Results Storage
     RESULTS_DIR = 'results'
 
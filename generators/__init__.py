@@ -1,24 +1,91 @@
 """
 Available generators for the learning framework
+
+Every generator is registered here by import path and only imported when it is
+first selected. Default generators run when all generators are requested; the
+others are selected by key. Installed packages can add generators through the
+``learning_framework.generators`` entry point group.
 """
 
-from generators.questions_generator import generate_socratic_questions
-from generators.explanations_generator import generate_explanations
-from generators.practice_generator import generate_practice_questions
-from generators.blooms_generator import generate_blooms_questions
-from generators.key_terms_generator import generate_key_terms
-from generators.analogies_generator import generate_analogies
-from generators.summary_generator import generate_summary
-
-# Exported generators dictionary
-AVAILABLE_GENERATORS = {
-    "questions": generate_socratic_questions,
-    "explanations": generate_explanations,
-    "practice": generate_practice_questions,
-    "blooms": generate_blooms_questions,
-    "key_terms": generate_key_terms,
-    "analogies": generate_analogies,
-    "summary": generate_summary
-}
-
-__all__ = ['AVAILABLE_GENERATORS']
\ No newline at end of file
+from generators.executor import GeneratorSpec
+from generators.registry import GeneratorRegistry
+
+# Fields read by the BaseGenerator family (see BaseGenerator._normalize_input)
+_STRUCTURED_INPUTS = ("text", "concepts", "key_concepts", "context", "keywords")
+
+generator_registry = GeneratorRegistry()
+
+# Default generators; a generator whose input is missing from the analysis
+# waits for the generator that outputs it
+generator_registry.register(
+    "questions", "generators.questions_generator:generate_socratic_questions",
+    GeneratorSpec(inputs=("text", "key_concepts", "themes", "entities"), outputs=("questions",)),
+    default=True, description="Socratic questions")
+generator_registry.register(
+    "explanations", "generators.explanations_generator:generate_explanations",
+    GeneratorSpec(inputs=("text", "key_concepts", "summary"), outputs=("explanations",)),
+    default=True, description="Explanations at basic, intermediate and advanced level")
+generator_registry.register(
+    "practice", "generators.practice_generator:generate_practice_questions",
+    GeneratorSpec(inputs=("text", "key_concepts", "themes", "entities"), outputs=("practice",)),
+    default=True, description="Practice questions")
+generator_registry.register(
+    "blooms", "generators.blooms_generator:generate_blooms_questions",
+    GeneratorSpec(inputs=("text", "key_concepts", "themes", "entities"), outputs=("blooms",)),
+    default=True, description="Questions for each level of Bloom's taxonomy")
+generator_registry.register(
+    "key_terms", "generators.key_terms_generator:generate_key_terms",
+    GeneratorSpec(inputs=("keywords", "definitions"), outputs=("key_terms",)),
+    default=True, description="Key terms with definitions")
+generator_registry.register(
+    "analogies", "generators.analogies_generator:generate_analogies",
+    GeneratorSpec(inputs=("concepts",), outputs=("analogies",)),
+    default=True, description="Analogies for the main concepts")
+generator_registry.register(
+    "summary", "generators.summary_generator:generate_summary",
+    GeneratorSpec(inputs=("main_idea", "concepts", "summary"), outputs=("summary",)),
+    default=True, description="Summaries at several levels of detail")
+
+# Reasoning generators
+generator_registry.register(
+    "chain_of_thought", "generators.chain_of_thought:generate_chain_of_thought",
+    GeneratorSpec(inputs=("concepts", "context"), outputs=("chain_of_thought",)),
+    description="Step-by-step reasoning for the main concepts",
+    stream="generators.chain_of_thought:iter_chain_of_thought")
+generator_registry.register(
+    "seven_hats", "generators.seven_hat_generator:generate_seven_hat_analysis",
+    GeneratorSpec(inputs=("facts", "sentiment", "concepts"), outputs=("seven_hats",)),
+    description="Seven Thinking Hats analysis",
+    stream="generators.seven_hat_generator:iter_seven_hat_analysis")
+
+# Template-based BaseGenerator family, returning content by category
+for _name, _target, _description in (
+    ("structured.socratic", "generators.socratic:generate_socratic_questions", "Socratic questions by category"),
+    ("structured.multilevel", "generators.multilevel:generate_multilevel_explanations", "Explanations by level"),
+    ("structured.blooms", "generators.blooms:generate_blooms_questions", "Bloom's taxonomy questions by level"),
+    ("structured.practice", "generators.practice:generate_practice_questions", "Practice questions by type"),
+    ("structured.keyterms", "generators.keyterms:generate_keyterms", "Core concepts, related terms and definitions"),
+    ("structured.analogies", "generators.analogies:generate_analogies", "Analogies, examples and metaphors"),
+    ("structured.summary", "generators.summarizer:generate_summary", "Brief and detailed summaries with key points"),
+):
+    generator_registry.register(_name, _target, GeneratorSpec(inputs=_STRUCTURED_INPUTS), description=_description)
+
+# Simple generators working directly on concepts, summary and keywords
+generator_registry.register(
+    "simple.socratic", "generators.wrapped_generators:generate_socratic_questions",
+    GeneratorSpec(inputs=("concepts",)), description="One question pair per concept")
+generator_registry.register(
+    "simple.multilevel", "generators.wrapped_generators:generate_multilevels",
+    GeneratorSpec(inputs=("summary", "complexity_level", "context", "keywords")),
+    description="Explanations scaled to the text complexity")
+generator_registry.register(
+    "simple.practice", "generators.wrapped_generators:generate_practice_questions",
+    GeneratorSpec(inputs=("keywords",)), description="One practice question per keyword")
+
+generator_registry.discover()
+
+# Backwards compatible name: a lazy mapping of generator key to function
+AVAILABLE_GENERATORS = generator_registry
+GENERATOR_SPECS = generator_registry.specs
+
+__all__ = ['AVAILABLE_GENERATORS', 'GENERATOR_SPECS', 'generator_registry']
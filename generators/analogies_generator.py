@@ -4,6 +4,8 @@ Generator for analogies and metaphors
 from typing import Dict, Any, List
 import logging
 
+from generators.concept_selection import select_from_analysis
+
 logger = logging.getLogger('generators')
 
 def generate_analogies(analysis: Dict[str, Any]) -> List[str]:
@@ -36,7 +38,7 @@ def generate_analogies(analysis: Dict[str, Any]) -> List[str]:
             analogies.append("Market dynamics resemble an ecosystem: each species (company) adapts to changes or risks extinction.")
             
     # Concept-specific analogies
-    for concept in concepts[:3]:  # Limit to top 3 concepts
+    for concept in select_from_analysis(analysis):  # Diverse concepts, more for larger analyses
         analogies.append(f"The concept of {concept} is similar to {_get_analogy_for_concept(concept)}")
     
     return analogies
@@ -2,9 +2,16 @@
 Base generator class for standardized input processing and error handling
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional
+import random
 import traceback
 
+from utils.instrumentation import Instrument
+from .template_engine import TEMPLATES
+from .memo import generator_memo, canonical_input, derive_seed
+from .concept_selection import ranked_concepts, concept_budget, select_concepts
+from .results import GeneratedContent
+
 # Safe import của logger
 try:
     from learning_framework.utils.logger import logger
@@ -12,24 +19,48 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+instrument = Instrument(logger)
+
 class BaseGenerator:
+    # Name of the template set in templates.json used by this generator
+    template_key: Optional[str] = None
+    
+    # True when _generate_content only renders the template sections, which
+    # lets generate_many render a whole batch column by column
+    sections_only: bool = False
+    
+    # Bump when the generator's output changes for the same input; templates
+    # are versioned separately through TEMPLATES.digest
+    version: int = 2
+    
     def __init__(self, name: str):
         self.name = name
-        logger.debug(f"Initializing {self.name} generator")
+        self.templates = TEMPLATES.get(self.template_key) if self.template_key else None
+        instrument.debug("Initializing {name} generator", name=self.name)
     
-    def generate(self, analysis_result: Dict[str, Any]) -> Dict[str, List[str]]:
+    def generate(self, analysis_result: Dict[str, Any], seed: Optional[int] = None) -> Dict[str, List[str]]:
         """
         Main generate method that handles input normalization and error handling
+        
+        Output is seeded from the normalized input (unless ``seed`` is given),
+        so the same input always gives the same result, and is memoized.
         """
         try:
             # Normalize input
             normalized_input = self._normalize_input(analysis_result)
+            key, seed = self._cache_key(normalized_input, seed)
+            
+            cached = generator_memo.get(key)
+            if cached is not None:
+                return cached
             
             # Generate content
-            result = self._generate_content(normalized_input)
+            result = self._generate_content(normalized_input, random.Random(seed))
             
             # Validate result
-            return self._ensure_valid_result(result)
+            result = self._ensure_valid_result(result)
+            generator_memo.set(key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error in {self.name} generator: {str(e)}")
@@ -37,9 +68,101 @@ class BaseGenerator:
             # Return empty but valid structure
             return self._get_default_result()
     
+    def generate_many(self, analysis_results: Iterable[Dict[str, Any]], compact: bool = False) -> List[Dict[str, List[str]]]:
+        """
+        Generate content for many analysis results at once
+        
+        Inputs are normalized up front and cache misses are rendered as one
+        batch. Errors stay isolated per item: if the batch fails, items are
+        retried one by one and only the failing ones get the default result.
+        
+        Args:
+            analysis_results: Analysis results, e.g. one per document
+            compact: Return GeneratedContent objects, which use far less memory
+                for large batches and serialize straight to JSON
+            
+        Returns:
+            List of generated results, in input order
+        """
+        results: List[Optional[Dict[str, List[str]]]] = []
+        normalized_inputs = []
+        pending = []
+        
+        for analysis_result in analysis_results:
+            try:
+                normalized_input = self._normalize_input(analysis_result)
+                key, seed = self._cache_key(normalized_input)
+            except Exception as e:
+                logger.error(f"Error normalizing input in {self.name} generator: {str(e)}")
+                results.append(self._get_default_result())
+                continue
+            
+            cached = generator_memo.get(key)
+            if cached is None:
+                normalized_inputs.append(normalized_input)
+                pending.append((len(results), key, seed))
+            results.append(cached)
+        
+        rngs = [random.Random(seed) for _, _, seed in pending]
+        try:
+            contents = self._generate_content_many(normalized_inputs, rngs)
+        except Exception as e:
+            logger.warning(f"Batch generation failed in {self.name} generator, retrying per item: {str(e)}")
+            rngs = [random.Random(seed) for _, _, seed in pending]
+            contents = [self._generate_content_or_none(n, rng) for n, rng in zip(normalized_inputs, rngs)]
+        
+        for (position, key, _), content in zip(pending, contents):
+            if content is None:
+                results[position] = self._get_default_result()
+            else:
+                results[position] = self._ensure_valid_result(content)
+                generator_memo.set(key, results[position])
+        
+        instrument.debug("{name} generator produced {count} results in batch ({rendered} rendered)",
+                         name=self.name, count=len(results), rendered=len(pending))
+        if compact:
+            return [GeneratedContent.from_dict(result) for result in results]
+        return results
+    
+    def _cache_key(self, normalized_input: Dict[str, Any], seed: Optional[int] = None):
+        """Return (memo key, seed) for a normalized input, deriving the seed from its content"""
+        canonical = canonical_input(normalized_input)
+        if seed is None:
+            seed = derive_seed(canonical)
+        return generator_memo.make_key(self.name, canonical, seed, (self.version, TEMPLATES.digest)), seed
+    
+    def _generate_content_many(self, normalized_inputs: List[Dict[str, Any]],
+                               rngs: List[random.Random]) -> List[Dict[str, List[str]]]:
+        """
+        Generate content for a batch of normalized inputs
+        
+        Section-only generators render every template across the whole batch;
+        other generators fall back to calling _generate_content per item.
+        """
+        if self.sections_only and self.templates is not None:
+            return self.templates.render_sections_many(
+                [n['concepts'][0] for n in normalized_inputs],
+                [n['concepts'][1:] for n in normalized_inputs],
+                [n['context'] for n in normalized_inputs],
+                rngs
+            )
+        return [self._generate_content(n, rng) for n, rng in zip(normalized_inputs, rngs)]
+    
+    def _generate_content_or_none(self, normalized_input: Dict[str, Any],
+                                  rng: random.Random) -> Optional[Dict[str, List[str]]]:
+        """Generate content for one item, returning None instead of raising"""
+        try:
+            return self._generate_content(normalized_input, rng)
+        except Exception as e:
+            logger.error(f"Error in {self.name} generator: {str(e)}")
+            return None
+    
     def _normalize_input(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Normalize input data to ensure required fields exist
+        
+        ``concepts`` holds the selected concepts, best first, within the
+        analysis' ``concept_budget`` (or a budget derived from its size).
         """
         normalized = {
             'text': analysis_result.get('text', ''),
@@ -62,15 +185,21 @@ class BaseGenerator:
         if 'keywords' in analysis_result:
             normalized['keywords'] = analysis_result['keywords']
 
+        # Pick a diverse set of concepts, more of them for larger analyses
+        ranked = ranked_concepts(normalized['concepts'], analysis_result.get('concept_weights'))
+        budget = concept_budget(len(ranked), analysis_result.get('concept_budget'))
+        normalized['concepts'] = select_concepts(ranked, budget)
+
         # Ensure we always have at least one concept
         if not normalized['concepts']:
             normalized['concepts'] = ['general topic']
 
         return normalized
     
-    def _generate_content(self, normalized_input: Dict[str, Any]) -> Dict[str, List[str]]:
+    def _generate_content(self, normalized_input: Dict[str, Any],
+                          rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
         """
-        Abstract method to be implemented by subclasses
+        Abstract method to be implemented by subclasses; all randomness must come from ``rng``
         """
         raise NotImplementedError("Subclasses must implement _generate_content")
     
@@ -81,12 +210,10 @@ class BaseGenerator:
         if not result:
             return self._get_default_result()
             
-        # Ensure all lists exist and have at least one item
-        for key in result:
-            if not result[key]:
-                result[key] = [f"Default {key} content for {self.name}"]
-                
-        return result
+        # Ensure all lists have at least one item; only rebuild the dict when one is empty
+        if all(result.values()):
+            return result
+        return {key: items or [f"Default {key} content for {self.name}"] for key, items in result.items()}
     
     def _get_default_result(self) -> Dict[str, List[str]]:
         """
@@ -4,10 +4,13 @@ Generator for Bloom's Taxonomy questions
 import logging
 import random
 
+from generators.memo import seeded
+
 logger = logging.getLogger(__name__)
 
-def generate_blooms_questions(analysis_data):
-    """Generate questions based on Bloom's Taxonomy"""
+@seeded("blooms", fields=("text", "key_concepts", "entities", "themes"))
+def generate_blooms_questions(analysis_data, rng=random):
+    """Generate questions based on Bloom's Taxonomy; all choices are drawn from ``rng``"""
     try:
         text = analysis_data.get('text', '')
         if not text:
@@ -77,11 +80,11 @@ def generate_blooms_questions(analysis_data):
             
         # Generate questions for each level
         for level, templates in blooms_templates.items():
-            template = random.choice(templates)
+            template = rng.choice(templates)
             
             # Format template based on number of placeholders
             if template.count("{}") == 1:
-                concept = random.choice(concepts) if concepts else "this concept"
+                concept = rng.choice(concepts) if concepts else "this concept"
                 question = f"{level}: {template.format(concept)}"
             elif template.count("{}") == 2 and len(concepts) >= 2:
                 # Use two different concepts
@@ -90,8 +93,8 @@ def generate_blooms_questions(analysis_data):
                 question = f"{level}: {template.format(concept1, concept2)}"
             else:
                 # Fallback for templates with multiple placeholders but not enough concepts
-                concept = random.choice(concepts) if concepts else "this concept"
-                context = "the broader field" if not entities else random.choice(entities)
+                concept = rng.choice(concepts) if concepts else "this concept"
+                context = "the broader field" if not entities else rng.choice(entities)
                 question = f"{level}: {template.format(concept, context)}"
                 
             questions.append(question)
@@ -1,71 +1,70 @@
 """
 Generator for Chain of Thought reasoning
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List
 import logging
 
+from generators.concept_selection import select_from_analysis
+
 logger = logging.getLogger('generators')
 
-def generate_chain_of_thought(analysis: Dict[str, Any]) -> List[str]:
-    """Generate step-by-step reasoning chain for complex concepts"""
+def iter_chain_of_thought(analysis: Dict[str, Any]) -> Iterator[str]:
+    """Yield the step-by-step reasoning chain for complex concepts one line at a time"""
     logger.info("Generating Chain of Thought reasoning")
     
     # Default chain if no analysis is available
     if not analysis:
-        return ["No Chain of Thought reasoning available"]
-    
-    chain = []
+        yield "No Chain of Thought reasoning available"
+        return
     
     # Extract main concepts
     concepts = analysis.get('concepts', [])
     if not concepts:
-        return ["No concepts found to generate Chain of Thought"]
+        yield "No concepts found to generate Chain of Thought"
+        return
     
     # Introduction to the chain
-    chain.append("CHAIN OF THOUGHT REASONING:")
-    chain.append("Let's break down the key concepts step by step:")
+    yield "CHAIN OF THOUGHT REASONING:"
+    yield "Let's break down the key concepts step by step:"
     
     # Generate reasoning steps for each concept
-    for i, concept in enumerate(concepts[:3]):  # Limit to top 3 concepts
-        chain.append(f"\nCONCEPT {i+1}: {concept.upper()}")
-        steps = _generate_reasoning_steps(concept, analysis)
-        chain.extend(steps)
+    for i, concept in enumerate(select_from_analysis(analysis)):  # Diverse concepts, more for larger analyses
+        yield f"\nCONCEPT {i+1}: {concept.upper()}"
+        yield from _iter_reasoning_steps(concept)
     
     # Conclusion
-    chain.append("\nINTEGRATIVE CONCLUSION:")
-    chain.append("• These concepts interconnect to form a comprehensive understanding of the subject")
-    chain.append("• The reasoning chain reveals both explicit connections and implicit relationships")
-    chain.append("• This step-by-step approach helps identify gaps in understanding and areas for further exploration")
-    
-    return chain
+    yield "\nINTEGRATIVE CONCLUSION:"
+    yield "• These concepts interconnect to form a comprehensive understanding of the subject"
+    yield "• The reasoning chain reveals both explicit connections and implicit relationships"
+    yield "• This step-by-step approach helps identify gaps in understanding and areas for further exploration"
 
-def _generate_reasoning_steps(concept: str, analysis: Dict[str, Any]) -> List[str]:
-    """Generate reasoning steps for a specific concept"""
-    steps = []
-    
+def generate_chain_of_thought(analysis: Dict[str, Any]) -> List[str]:
+    """Generate step-by-step reasoning chain for complex concepts"""
+    return list(iter_chain_of_thought(analysis))
+
+def _iter_reasoning_steps(concept: str) -> Iterator[str]:
+    """Yield reasoning steps for a specific concept"""
     # Definition
-    steps.append(f"• Step 1: Define {concept}")
-    steps.append(f"  - {concept} refers to a key element in this domain")
-    steps.append(f"  - It can be understood as a fundamental building block")
+    yield f"• Step 1: Define {concept}"
+    yield f"  - {concept} refers to a key element in this domain"
+    yield "  - It can be understood as a fundamental building block"
     
     # Context
-    steps.append(f"• Step 2: Contextualize {concept}")
-    steps.append(f"  - {concept} exists within a broader framework of related ideas")
-    steps.append(f"  - Historical development provides important context")
+    yield f"• Step 2: Contextualize {concept}"
+    yield f"  - {concept} exists within a broader framework of related ideas"
+    yield "  - Historical development provides important context"
     
     # Analysis
-    steps.append(f"• Step 3: Analyze components of {concept}")
-    steps.append(f"  - Breaking down {concept} reveals its constituent elements")
-    steps.append(f"  - Each component serves a specific function")
+    yield f"• Step 3: Analyze components of {concept}"
+    yield f"  - Breaking down {concept} reveals its constituent elements"
+    yield "  - Each component serves a specific function"
     
     # Implications
-    steps.append(f"• Step 4: Examine implications of {concept}")
-    steps.append(f"  - Understanding {concept} leads to insights about related processes")
-    steps.append(f"  - Practical applications emerge from theoretical understanding")
+    yield f"• Step 4: Examine implications of {concept}"
+    yield f"  - Understanding {concept} leads to insights about related processes"
+    yield "  - Practical applications emerge from theoretical understanding"
     
     # Integration
-    steps.append(f"• Step 5: Integrate {concept} with other concepts")
-    steps.append(f"  - {concept} connects with other ideas through shared principles")
-    steps.append(f"  - These connections reveal a more comprehensive understanding")
-    
-    return steps
\ No newline at end of file
+    yield f"• Step 5: Integrate {concept} with other concepts"
+    yield f"  - {concept} connects with other ideas through shared principles"
+    yield "  - These connections reveal a more comprehensive understanding"
@@ -0,0 +1,132 @@
+"""
+Ranked, diversity-aware concept selection for generators
+
+Generators used to take the first three concepts of an analysis whatever its
+size. Instead they now take a budget of concepts that grows with the number
+of ranked concepts, picked by Maximal Marginal Relevance (MMR) so that near
+duplicates such as "neural network" and "neural network training" do not use
+up the budget. Similarity is word overlap between concepts, which needs no
+embeddings and costs O(budget x candidates).
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Concepts used when an analysis has few (matches the historical concepts[:3])
+BASE_BUDGET = 3
+
+# Upper bound on the automatic budget
+MAX_BUDGET = 20
+
+# Only the best ranked candidates are considered for selection
+MAX_CANDIDATES = 200
+
+
+def ranked_concepts(concepts: Sequence[Any], concept_weights: Optional[Iterable[Dict[str, Any]]] = None) -> List[Tuple[Any, float]]:
+    """
+    Merge weighted and plain concept lists into one ranked list
+
+    Args:
+        concepts: Concepts in rank order (weights decrease linearly with rank)
+        concept_weights: Optional [{'text': ..., 'weight': ...}] list, e.g. from
+            the local analysis; these come first, ordered by weight
+
+    Returns:
+        List of (concept, relevance) with relevance in (0, 1], best first
+    """
+    ranked: List[Tuple[Any, float]] = []
+    seen = set()
+
+    weighted = [(item['text'], float(item.get('weight', 0.0)))
+                for item in concept_weights or () if isinstance(item, dict) and item.get('text')]
+    if weighted:
+        top = max(weight for _, weight in weighted) or 1.0
+        for text, weight in sorted(weighted, key=lambda item: -item[1]):
+            if text.lower() not in seen:
+                seen.add(text.lower())
+                ranked.append((text, max(weight / top, 1e-6)))
+
+    count = len(concepts)
+    for rank, concept in enumerate(concepts):
+        key = str(concept).lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        # Plain concepts rank below weighted ones
+        ranked.append((concept, (count - rank) / count * (0.5 if weighted else 1.0)))
+    return ranked
+
+
+def concept_budget(candidates: int, requested: Optional[int] = None) -> int:
+    """
+    Number of concepts a generator should cover
+
+    Grows with the square root of the number of candidates, so output scales
+    with document size while staying bounded.
+
+    Args:
+        candidates: Number of ranked concepts available
+        requested: Explicit budget from the analysis, if any
+    """
+    if requested:
+        return max(1, int(requested))
+    return max(BASE_BUDGET, min(MAX_BUDGET, math.ceil(math.sqrt(candidates))))
+
+
+def _words(concept: Any) -> frozenset:
+    return frozenset(str(concept).lower().split())
+
+
+def select_concepts(ranked: Sequence[Tuple[Any, float]], budget: int, diversity: float = 0.3) -> List[Any]:
+    """
+    Pick up to ``budget`` relevant but mutually different concepts (MMR)
+
+    Args:
+        ranked: (concept, relevance) pairs, best first
+        budget: Maximum number of concepts to return
+        diversity: Weight of the redundancy penalty (0 keeps rank order)
+
+    Returns:
+        Selected concepts, in selection order (the best concept first)
+    """
+    if len(ranked) <= budget:
+        return [concept for concept, _ in ranked]
+
+    candidates = list(ranked[:MAX_CANDIDATES])
+    words = [_words(concept) for concept, _ in candidates]
+    # Highest word-overlap (Jaccard) with any selected concept, updated per pick
+    redundancy = [0.0] * len(candidates)
+    remaining = set(range(len(candidates)))
+    selected: List[int] = []
+
+    while remaining and len(selected) < budget:
+        best = max(remaining, key=lambda i: ((1 - diversity) * candidates[i][1] - diversity * redundancy[i], -i))
+        remaining.discard(best)
+        selected.append(best)
+
+        picked = words[best]
+        for i in remaining:
+            if picked and words[i]:
+                overlap = len(picked & words[i])
+                if overlap:
+                    redundancy[i] = max(redundancy[i], overlap / len(picked | words[i]))
+
+    return [candidates[i][0] for i in selected]
+
+
+def select_from_analysis(analysis: Dict[str, Any], field: str = 'concepts') -> List[Any]:
+    """
+    Select concepts from one field of an analysis result
+
+    Uses the analysis' ``concept_weights`` for ranking and ``concept_budget``
+    (when set) as the budget.
+
+    Args:
+        analysis: Analysis result
+        field: Field holding the plain concept list, e.g. 'concepts' or 'key_concepts'
+
+    Returns:
+        Selected concepts, best first
+    """
+    ranked = ranked_concepts(analysis.get(field) or [], analysis.get('concept_weights'))
+    return select_concepts(ranked, concept_budget(len(ranked), analysis.get('concept_budget')))
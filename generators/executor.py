@@ -0,0 +1,243 @@
+"""
+Concurrent execution stage for content generators
+
+Generators run side by side instead of one after another on the event loop:
+
+- async generators are awaited directly
+- regular generators run in a shared thread pool
+- generators listed as CPU heavy run in a shared process pool
+
+Every generator gets its own timeout, and a failure or timeout only affects
+that generator's output.
+
+Generators may declare the analysis fields they read (``inputs``) and the
+field they produce (``outputs``). When a selected generator needs a field the
+analysis does not have but another selected generator produces, it waits for
+that generator only; everything else starts immediately.
+"""
+
+import asyncio
+import atexit
+import inspect
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from utils.instrumentation import Instrument
+from utils.metrics import GENERATOR_SECONDS
+from utils.tracing import span, traced, STATUS_ERROR as SPAN_ERROR
+
+logger = logging.getLogger(__name__)
+instrument = Instrument(logger)
+
+# Generator status values reported in the timings
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+STATUS_TIMEOUT = 'timeout'
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_thread_pool(max_workers: Optional[int]) -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='generator')
+    return _thread_pool
+
+
+def _get_process_pool(max_workers: Optional[int]) -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+    return _process_pool
+
+
+def shutdown_pools() -> None:
+    """Shut down the shared worker pools (they are recreated on next use)"""
+    global _thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+atexit.register(shutdown_pools)
+
+
+class GeneratorSpec:
+    """Analysis fields a generator reads and produces"""
+
+    __slots__ = ('inputs', 'outputs')
+
+    def __init__(self, inputs: Iterable[str] = (), outputs: Iterable[str] = ()):
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+
+def build_dependencies(keys: List[str], specs: Mapping[str, GeneratorSpec],
+                       available: Iterable[str]) -> Dict[str, Set[str]]:
+    """
+    Build the dependency graph of the selected generators
+
+    A generator depends on another selected generator when it reads a field
+    that generator outputs and the analysis does not already provide it.
+    Edges that would close a cycle are dropped so every generator still runs.
+
+    Args:
+        keys: Selected generator keys
+        specs: Declared inputs/outputs by generator key
+        available: Fields already present in the analysis
+
+    Returns:
+        Mapping of generator key to the keys it waits for
+    """
+    available = set(available)
+    producers = {}
+    for key in keys:
+        for field in specs[key].outputs if key in specs else ():
+            producers.setdefault(field, key)
+
+    dependencies: Dict[str, Set[str]] = {key: set() for key in keys}
+    for key in keys:
+        for field in specs[key].inputs if key in specs else ():
+            producer = producers.get(field)
+            if field in available or producer is None or producer == key:
+                continue
+            if _reaches(dependencies, producer, key):
+                logger.warning(f"Ignoring cyclic generator dependency {key} -> {producer} on '{field}'")
+                continue
+            dependencies[key].add(producer)
+    return dependencies
+
+
+def _reaches(dependencies: Dict[str, Set[str]], start: str, target: str) -> bool:
+    """Return True if ``start`` already (transitively) waits for ``target``"""
+    stack, seen = [start], set()
+    while stack:
+        key = stack.pop()
+        if key == target:
+            return True
+        if key not in seen:
+            seen.add(key)
+            stack.extend(dependencies[key])
+    return False
+
+
+class GeneratorExecutor:
+    """Run a set of generators concurrently against one analysis result"""
+
+    def __init__(self, generators: Dict[str, Callable], timeout: float = 30.0,
+                 cpu_bound: Iterable[str] = (), max_workers: Optional[int] = None,
+                 specs: Optional[Mapping[str, GeneratorSpec]] = None):
+        """
+        Args:
+            generators: Mapping of generator key to generator function
+            timeout: Seconds each generator may run before it is abandoned
+            cpu_bound: Keys of generators to run in the process pool
+            max_workers: Size of each worker pool (None for the executor default)
+            specs: Declared inputs/outputs by generator key, used for scheduling
+        """
+        self.generators = generators
+        self.timeout = timeout
+        self.cpu_bound = frozenset(cpu_bound)
+        self.max_workers = max_workers
+        self.specs = dict(specs or {})
+
+    async def _run_one(self, key: str, analysis_results: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        """Run one generator, returning (content, timing)"""
+        generator_fn = self.generators[key]
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+
+        if inspect.iscoroutinefunction(generator_fn):
+            mode = 'async'
+            call = generator_fn(analysis_results)
+        elif key in self.cpu_bound:
+            mode = 'process'
+            call = loop.run_in_executor(_get_process_pool(self.max_workers), generator_fn, analysis_results)
+        else:
+            mode = 'thread'
+            call = loop.run_in_executor(_get_thread_pool(self.max_workers), generator_fn, analysis_results)
+
+        with span('generator', generator=key, mode=mode) as generator_span:
+            try:
+                content = await asyncio.wait_for(call, timeout=self.timeout)
+                status = STATUS_OK
+            except asyncio.TimeoutError:
+                content = [f"Error generating content: timed out after {self.timeout}s"]
+                status = STATUS_TIMEOUT
+                logger.error(f"Timed out generating {key} content after {self.timeout}s")
+            except Exception as e:
+                content = [f"Error generating content: {str(e)}"]
+                status = STATUS_ERROR
+                logger.error(f"Error generating {key} content: {str(e)}", exc_info=True)
+            generator_span.set_attribute('status', status)
+            if status != STATUS_OK:
+                generator_span.set_status(SPAN_ERROR)
+
+        elapsed = time.perf_counter() - start
+        GENERATOR_SECONDS.labels(key, status).observe(elapsed)
+        timing = {
+            'duration_ms': round(elapsed * 1000, 3),
+            'mode': mode,
+            'status': status
+        }
+        # Parsed by tools/analyze_logs.py (JSON data fields or this message)
+        instrument.info("Generated {generator} content ({status}, {duration_ms} ms)",
+                        generator=key, status=status, duration_ms=timing['duration_ms'])
+        return content, timing
+
+    @traced('generators.run')
+    async def run(self, keys: Iterable[str], analysis_results: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Dict]]:
+        """
+        Run the selected generators, each as soon as its inputs are ready
+
+        Args:
+            keys: Generator keys to run; unknown keys are ignored
+            analysis_results: Analysis result passed to every generator
+
+        Returns:
+            Tuple of (content by generator key, timing by generator key)
+        """
+        keys = [key for key in keys if key in self.generators]
+        dependencies = build_dependencies(keys, self.specs, analysis_results)
+        waiting = {key: set(deps) for key, deps in dependencies.items()}
+        produced: Dict[str, Any] = {}
+        outcomes: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        stage_start = time.perf_counter()
+        running: Dict[asyncio.Task, str] = {}
+
+        def start_ready() -> None:
+            for key in [key for key, deps in waiting.items() if not deps]:
+                del waiting[key]
+                # Dependents see the outputs of the generators they waited for
+                data = {**analysis_results, **produced} if dependencies[key] else analysis_results
+                task = asyncio.ensure_future(self._run_one(key, data))
+                running[task] = key
+                outcomes[key] = (None, {'start_ms': round((time.perf_counter() - stage_start) * 1000, 3)})
+
+        start_ready()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                key = running.pop(task)
+                content, timing = task.result()
+                timing = {**outcomes[key][1], **timing}
+                if dependencies[key]:
+                    timing['depends_on'] = sorted(dependencies[key])
+                outcomes[key] = (content, timing)
+
+                if timing['status'] == STATUS_OK:
+                    for field in self.specs[key].outputs if key in self.specs else ():
+                        produced.setdefault(field, content)
+                for deps in waiting.values():
+                    deps.discard(key)
+            start_ready()
+
+        content = {key: outcomes[key][0] for key in keys}
+        timings = {key: outcomes[key][1] for key in keys}
+        return content, timings
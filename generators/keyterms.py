@@ -2,7 +2,7 @@
 Key terms generator for educational content
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import random
 import traceback
 
@@ -13,18 +13,25 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+from utils.instrumentation import Instrument
 from .base_generator import BaseGenerator
 
+instrument = Instrument(logger)
+
 class KeyTermsGenerator(BaseGenerator):
+    template_key = "keyterms"
+    
     def __init__(self):
         super().__init__("KeyTerms")
     
-    def _generate_content(self, normalized_input: Dict[str, Any]) -> Dict[str, List[str]]:
+    def _generate_content(self, normalized_input: Dict[str, Any],
+                          rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
         """
         Generate key terms and definitions based on normalized input
         
         Args:
             normalized_input: Normalized input data
+            rng: Random generator for template variants
             
         Returns:
             Dictionary of key terms by category
@@ -35,7 +42,7 @@ class KeyTermsGenerator(BaseGenerator):
         keywords = normalized_input.get('keywords', [])
         
         # Log để debug
-        logger.debug(f"Generating key terms for concepts: {concepts}, keywords: {keywords}")
+        instrument.debug("Generating key terms for concepts: {concepts}, keywords: {keywords}", concepts=concepts, keywords=keywords)
         
         # Đảm bảo có concept để xử lý
         if not concepts:
@@ -49,25 +56,17 @@ class KeyTermsGenerator(BaseGenerator):
         }
         
         # LUÔN thêm các khái niệm cốt lõi
-        for concept in concepts[:3]:
+        for concept in concepts:
             terms["core_concepts"].append(concept)
         
         # Đảm bảo có ít nhất một khái niệm cốt lõi
         if not terms["core_concepts"]:
             terms["core_concepts"].append("main concept")
         
-        # Tạo các thuật ngữ liên quan
-        related_terms_templates = [
-            f"{concepts[0]} framework",
-            f"{concepts[0]} methodology",
-            f"{concepts[0]} in {context}",
-            f"{concepts[0]} theory",
-            f"{concepts[0]} application"
-        ]
-        
         # Thêm ít nhất 3 thuật ngữ liên quan
-        for i in range(min(3, len(related_terms_templates))):
-            terms["related_terms"].append(related_terms_templates[i])
+        terms["related_terms"].extend(
+            self.templates.render_all("related_terms", concept=concepts[0], context=context)
+        )
         
         # Thêm từ keywords nếu có
         for keyword in keywords[:2]:
@@ -76,12 +75,12 @@ class KeyTermsGenerator(BaseGenerator):
         
         # Tạo định nghĩa cho tất cả các thuật ngữ
         all_terms = terms["core_concepts"] + terms["related_terms"]
-        for term in all_terms:
-            definition = f"{term}: A key concept in {context} that refers to the systematic approach to understanding and implementing knowledge."
-            terms["definitions"].append(definition)
+        terms["definitions"].extend(
+            [self.templates.render("definition", rng=rng, term=term, context=context) for term in all_terms]
+        )
         
         # Log kết quả để debug
-        logger.info(f"Generated {sum(len(ts) for ts in terms.values())} key terms and definitions")
+        instrument.info("Generated {count} key terms and definitions", count=lambda: sum(len(ts) for ts in terms.values()))
         
         return terms
 
@@ -0,0 +1,103 @@
+"""
+Deterministic seeding and memoization of generator outputs
+
+Every generation is seeded from a hash of its normalized input, so identical
+inputs always give identical output. Outputs are cached under
+(generator, normalized input, seed, version): a repeated request is answered
+from the cache without running the generator again.
+"""
+
+import functools
+import hashlib
+import json
+import random
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from analyzers.profile_cache import ProfileCache
+from config import Config
+from utils.memory import register_component
+from utils.metrics import register_cache
+
+
+def canonical_input(data: Any) -> str:
+    """Serialize a normalized input so equal inputs give equal strings"""
+    return json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def derive_seed(canonical: str) -> int:
+    """Derive a 64-bit seed from a canonical input"""
+    return int.from_bytes(hashlib.blake2b(canonical.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'big')
+
+
+def copy_output(content: Any) -> Any:
+    """Copy a generator output (a list, or a dict of lists) so callers cannot modify a cached value"""
+    if isinstance(content, list):
+        return list(content)
+    if isinstance(content, dict):
+        return {key: list(value) if isinstance(value, list) else value for key, value in content.items()}
+    return content
+
+
+class GeneratorMemo:
+    """Cache of generator outputs keyed by (generator, normalized input, seed, version)"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.cache = ProfileCache(max_entries=max_entries)
+
+    @staticmethod
+    def make_key(name: str, canonical: str, seed: int, version: Any) -> str:
+        return ProfileCache.make_key(canonical, name, seed, version)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached output, or None"""
+        content = self.cache.get(key)
+        return None if content is None else copy_output(content)
+
+    def set(self, key: str, content: Any) -> None:
+        """Store a copy of an output"""
+        self.cache.set(key, copy_output(content))
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+# Shared by every generator in this process
+generator_memo = GeneratorMemo(max_entries=Config.GENERATOR_CACHE_SIZE)
+register_cache('generator_memo', generator_memo.stats)
+register_component('cache.generator_memo', generator_memo.cache.memory_report)
+
+
+def seeded(name: str, fields: Iterable[str], version: Any = 1) -> Callable:
+    """
+    Make a function-style generator deterministic and memoized
+
+    The decorated function must accept an ``rng`` keyword argument and draw all
+    of its randomness from it. The wrapper normalizes the input to ``fields``,
+    seeds ``rng`` from its hash (unless ``seed`` is given) and caches the output.
+
+    Args:
+        name: Generator name used in cache keys
+        fields: Analysis fields the generator reads
+        version: Bump when the generator's output changes for the same input
+    """
+    fields = tuple(fields)
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(analysis_data: Dict[str, Any], seed: Optional[int] = None):
+            normalized = {field: analysis_data.get(field) for field in fields} if analysis_data else {}
+            canonical = canonical_input(normalized)
+            if seed is None:
+                seed = derive_seed(canonical)
+
+            key = generator_memo.make_key(name, canonical, seed, version)
+            content = generator_memo.get(key)
+            if content is None:
+                content = function(analysis_data, rng=random.Random(seed))
+                generator_memo.set(key, content)
+            return content
+        return wrapper
+    return decorator
@@ -2,7 +2,7 @@
 Multi-level explanation generator for educational content
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import random
 import traceback
 
@@ -13,18 +13,26 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+from utils.instrumentation import Instrument
 from .base_generator import BaseGenerator
 
+instrument = Instrument(logger)
+
 class MultilevelGenerator(BaseGenerator):
+    template_key = "multilevel"
+    sections_only = True
+    
     def __init__(self):
         super().__init__("Multilevel")
     
-    def _generate_content(self, normalized_input: Dict[str, Any]) -> Dict[str, List[str]]:
+    def _generate_content(self, normalized_input: Dict[str, Any],
+                          rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
         """
         Generate multi-level explanations based on normalized input
         
         Args:
             normalized_input: Normalized input data
+            rng: Random generator for template variants
         
         Returns:
             Dictionary of explanations by complexity level
@@ -34,61 +42,18 @@ class MultilevelGenerator(BaseGenerator):
         context = normalized_input['context']
         
         # Log để debug
-        logger.debug(f"Generating multi-level explanations for: {concepts}")
+        instrument.debug("Generating multi-level explanations for: {concepts}", concepts=concepts)
         
         # Đảm bảo có concept để xử lý
         if not concepts:
             logger.warning("No concepts found, using default")
             concepts = ["general topic"]
         
-        # Lấy concept đầu tiên để đảm bảo luôn có kết quả
-        main_concept = concepts[0]
-        
-        # Khởi tạo kết quả với giá trị mặc định
-        explanations = {
-            "basic": [],
-            "intermediate": [],
-            "advanced": [],
-            "expert": []
-        }
-        
-        # Basic level
-        explanations["basic"].append(
-            f"At its most basic level, {main_concept} in {context} involves understanding fundamental principles and their direct applications."
-        )
-        
-        # Intermediate level
-        explanations["intermediate"].append(
-            f"At an intermediate level, {main_concept} demonstrates how different components in {context} interact and influence each other."
-        )
-        
-        # Advanced level
-        explanations["advanced"].append(
-            f"At an advanced level, {main_concept} reveals complex relationships and systemic effects within {context}, including feedback loops and emergent properties."
-        )
-        
-        # Expert level
-        explanations["expert"].append(
-            f"At an expert level, {main_concept} encompasses theoretical frameworks, practical implementations, and critical analysis of limitations and future directions in {context}."
-        )
-        
-        # Thêm giải thích cho các concepts khác nếu có
-        for concept in concepts[1:3]:
-            explanations["basic"].append(
-                f"{concept} provides a foundation for understanding basic principles in {context}."
-            )
-            explanations["intermediate"].append(
-                f"{concept} demonstrates interconnected relationships within {context}."
-            )
-            explanations["advanced"].append(
-                f"{concept} reveals complex dynamics and systemic effects in {context}."
-            )
-            explanations["expert"].append(
-                f"{concept} contributes to theoretical and practical advancements in {context}."
-            )
+        # Concept đầu tiên luôn có giải thích ở mọi cấp độ, thêm giải thích cho các concepts khác
+        explanations = self.templates.render_sections(concepts[0], concepts[1:], context, rng)
         
         # Log kết quả để debug
-        logger.info(f"Generated {sum(len(e) for e in explanations.values())} multi-level explanations")
+        instrument.info("Generated {count} multi-level explanations", count=lambda: sum(len(e) for e in explanations.values()))
         
         return explanations
 
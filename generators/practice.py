@@ -2,7 +2,7 @@
 Practice questions generator for educational content
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import random
 import traceback
 
@@ -13,18 +13,26 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+from utils.instrumentation import Instrument
 from .base_generator import BaseGenerator
 
+instrument = Instrument(logger)
+
 class PracticeGenerator(BaseGenerator):
+    template_key = "practice"
+    sections_only = True
+    
     def __init__(self):
         super().__init__("Practice")
     
-    def _generate_content(self, normalized_input: Dict[str, Any]) -> Dict[str, List[str]]:
+    def _generate_content(self, normalized_input: Dict[str, Any],
+                          rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
         """
         Generate practice questions based on normalized input
         
         Args:
             normalized_input: Normalized input data
+            rng: Random generator for template variants
             
         Returns:
             Dictionary of practice questions by type
@@ -34,73 +42,19 @@ class PracticeGenerator(BaseGenerator):
         context = normalized_input['context']
         
         # Log để debug
-        logger.debug(f"Generating practice questions for concepts: {concepts}")
+        instrument.debug("Generating practice questions for concepts: {concepts}", concepts=concepts)
         
         # Đảm bảo có concept để xử lý
         if not concepts:
             logger.warning("No concepts found, using default")
             concepts = ["general topic"]
         
-        # Lấy concept đầu tiên để đảm bảo luôn có kết quả
-        main_concept = concepts[0]
-        
-        questions = {
-            "multiple_choice": [],
-            "short_answer": [],
-            "discussion": []
-        }
-        
-        # LUÔN thêm ít nhất một câu hỏi cho mỗi loại
-        questions["multiple_choice"].append(
-            f"Which of the following best describes {main_concept}?\n"
-            "a) A systematic approach to understanding knowledge\n"
-            "b) A framework for organizing information\n"
-            "c) A method for analyzing complex ideas\n"
-            "d) All of the above"
-        )
-        
-        questions["short_answer"].append(
-            f"Briefly explain how {main_concept} relates to {context}."
-        )
-        
-        questions["discussion"].append(
-            f"Analyze the importance of {main_concept} in the broader context of {context}."
-        )
-        
-        # Thêm câu hỏi cho các concepts khác nếu có
-        for concept in concepts[1:3]:
-            # Multiple choice questions
-            mc_templates = [
-                f"What is the primary purpose of {concept} in {context}?\n"
-                "a) To organize information\n"
-                "b) To facilitate understanding\n"
-                "c) To analyze complex ideas\n"
-                "d) To synthesize knowledge",
-                
-                f"Which aspect of {concept} is most relevant to {context}?\n"
-                "a) Its theoretical framework\n"
-                "b) Its practical applications\n"
-                "c) Its historical development\n"
-                "d) Its future implications"
-            ]
-            questions["multiple_choice"].append(random.choice(mc_templates))
-            
-            # Short answer questions
-            sa_templates = [
-                f"Describe two key features of {concept}.",
-                f"Explain the significance of {concept} in relation to {context}."
-            ]
-            questions["short_answer"].append(random.choice(sa_templates))
-            
-            # Discussion questions
-            disc_templates = [
-                f"Evaluate the effectiveness of {concept} in addressing challenges within {context}.",
-                f"Discuss how different perspectives might approach {concept} differently."
-            ]
-            questions["discussion"].append(random.choice(disc_templates))
+        # LUÔN có ít nhất một câu hỏi cho mỗi loại (concept đầu tiên),
+        # thêm câu hỏi cho các concepts khác nếu có
+        questions = self.templates.render_sections(concepts[0], concepts[1:], context, rng)
         
         # Log kết quả để debug
-        logger.info(f"Generated {sum(len(qs) for qs in questions.values())} practice questions")
+        instrument.info("Generated {count} practice questions", count=lambda: sum(len(qs) for qs in questions.values()))
         
         return questions
 
@@ -4,10 +4,14 @@ Generator for practice questions
 import logging
 import random
 
+from generators.memo import seeded
+from generators.concept_selection import select_from_analysis
+
 logger = logging.getLogger(__name__)
 
-def generate_practice_questions(analysis_data):
-    """Generate practice questions based on analyzed text"""
+@seeded("practice", fields=("text", "key_concepts", "entities", "themes", "concept_weights", "concept_budget"), version=2)
+def generate_practice_questions(analysis_data, rng=random):
+    """Generate practice questions based on analyzed text; all choices are drawn from ``rng``"""
     try:
         text = analysis_data.get('text', '')
         if not text:
@@ -47,17 +51,18 @@ def generate_practice_questions(analysis_data):
         # Generate diverse practice questions
         questions = []
         
-        # Recall questions
-        if key_concepts:
-            for concept in key_concepts[:2]:
-                template = random.choice(recall_templates)
+        # Recall questions: two for small analyses, more as the concept budget grows
+        selected = select_from_analysis(analysis_data, 'key_concepts') if key_concepts else []
+        if selected:
+            for concept in selected[:max(len(selected) - 1, 2)]:
+                template = rng.choice(recall_templates)
                 questions.append(template.format(concept))
                 
         # Application questions
         if key_concepts and entities:
-            concept = random.choice(key_concepts)
-            context = random.choice(entities) if entities else "a different field"
-            template = random.choice(application_templates)
+            concept = rng.choice(key_concepts)
+            context = rng.choice(entities) if entities else "a different field"
+            template = rng.choice(application_templates)
             if "{}" in template:
                 if template.count("{}") == 1:
                     questions.append(template.format(concept))
@@ -66,7 +71,7 @@ def generate_practice_questions(analysis_data):
                 
         # Analysis questions
         if len(key_concepts) >= 2:
-            template = random.choice(analysis_templates)
+            template = rng.choice(analysis_templates)
             if template.count("{}") == 1:
                 questions.append(template.format(key_concepts[0]))
             else:
@@ -84,7 +89,7 @@ def generate_practice_questions(analysis_data):
             ]
             # Add randomly selected general questions
             num_to_add = min(5 - len(questions), len(general_questions))
-            questions.extend(random.sample(general_questions, num_to_add))
+            questions.extend(rng.sample(general_questions, num_to_add))
             
         return questions
             
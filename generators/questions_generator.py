@@ -3,6 +3,8 @@ Generator for Socratic questions
 """
 import logging
 
+from generators.concept_selection import select_from_analysis
+
 logger = logging.getLogger(__name__)
 
 def generate_socratic_questions(analysis_data):
@@ -21,9 +23,10 @@ def generate_socratic_questions(analysis_data):
         # Use these to form better questions
         questions = []
         
-        # Add some default questions if we have key concepts
-        if key_concepts:
-            for concept in key_concepts[:3]:  # Use top 3 concepts
+        # Add some default questions for a diverse selection of key concepts
+        selected = select_from_analysis(analysis_data, 'key_concepts') if key_concepts else []
+        if selected:
+            for concept in selected:
                 questions.append(f"What is the significance of {concept} in this context?")
                 questions.append(f"How does {concept} relate to other ideas presented?")
                 
@@ -46,7 +49,7 @@ def generate_socratic_questions(analysis_data):
             questions.extend(general_questions)
             
         # Return a reasonable number of questions
-        return questions[:8]  # Limit to 8 questions
+        return questions[:max(8, 2 * len(selected) + 2)]  # Scale the limit with the concept budget
             
     except Exception as e:
         logger.error(f"Error generating Socratic questions: {str(e)}")
@@ -0,0 +1,155 @@
+"""
+Lazy plugin registry for content generators
+
+Generators are registered by import path (``"package.module:function"``) and
+imported only the first time they are selected, so importing ``generators``
+stays cheap and module-level singletons are only created when needed.
+Third-party generators are discovered through the ``learning_framework.generators``
+entry point group, in the same ``name = module:function`` form.
+"""
+
+import importlib
+import logging
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from .executor import GeneratorSpec
+
+logger = logging.getLogger(__name__)
+
+# Entry point group scanned by GeneratorRegistry.discover
+ENTRY_POINT_GROUP = 'learning_framework.generators'
+
+
+class GeneratorEntry:
+    """A registered generator, imported on first use"""
+
+    __slots__ = ('name', 'target', 'spec', 'default', 'description', 'stream_target', '_function', '_stream')
+
+    def __init__(self, name: str, target: str, spec: Optional[GeneratorSpec] = None,
+                 default: bool = False, description: str = '', stream_target: Optional[str] = None):
+        for path in (target, stream_target):
+            if path is not None and ':' not in path:
+                raise ValueError(f"Generator target must look like 'module:function', got {path!r}")
+        self.name = name
+        self.target = target
+        self.spec = spec
+        self.default = default
+        self.description = description
+        self.stream_target = stream_target
+        self._function: Optional[Callable] = None
+        self._stream: Optional[Callable] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._function is not None
+
+    def load(self) -> Callable:
+        """Import the generator module and return the generator function"""
+        if self._function is None:
+            self._function = _resolve(self.target)
+            logger.debug(f"Loaded generator '{self.name}' from {self.target}")
+        return self._function
+
+    def load_stream(self) -> Optional[Callable]:
+        """Return the function yielding the generator's lines lazily, if it has one"""
+        if self._stream is None and self.stream_target is not None:
+            self._stream = _resolve(self.stream_target)
+        return self._stream
+
+
+def _resolve(target: str) -> Callable:
+    """Import ``module:attribute`` and return the attribute"""
+    module_name, _, attribute = target.partition(':')
+    function = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        function = getattr(function, part)
+    return function
+
+
+class GeneratorRegistry(Mapping):
+    """
+    Mapping of generator key to generator function with lazy imports
+
+    Membership tests and key listings never import anything; looking up a key
+    imports its module once.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, GeneratorEntry] = {}
+
+    def register(self, name: str, target: str, spec: Optional[GeneratorSpec] = None,
+                 default: bool = False, description: str = '', stream: Optional[str] = None) -> None:
+        """
+        Register a generator
+
+        Args:
+            name: Key used to select the generator
+            target: Import path in the form "module:function"
+            spec: Analysis fields the generator reads and produces
+            default: Whether the generator runs when all generators are requested
+            description: Short description shown in generator listings
+            stream: Import path of a function yielding the same output line by line
+        """
+        if name in self._entries:
+            raise ValueError(f"Generator '{name}' is already registered")
+        self._entries[name] = GeneratorEntry(name, target, spec, default, description, stream)
+
+    def discover(self, group: str = ENTRY_POINT_GROUP) -> int:
+        """
+        Register generators advertised by installed packages
+
+        Args:
+            group: Entry point group to scan
+
+        Returns:
+            Number of generators registered
+        """
+        count = 0
+        for entry_point in metadata.entry_points(group=group):
+            if entry_point.name in self._entries:
+                logger.warning(f"Skipping plugin generator '{entry_point.name}': name already registered")
+                continue
+            self.register(entry_point.name, entry_point.value)
+            count += 1
+        return count
+
+    def __getitem__(self, name: str) -> Callable:
+        return self._entries[name].load()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stream(self, name: str) -> Optional[Callable]:
+        """Return the streaming form of a generator, or None if it only returns whole results"""
+        return self._entries[name].load_stream()
+
+    def default_keys(self) -> List[str]:
+        """Keys of the generators that run when all generators are requested"""
+        return [name for name, entry in self._entries.items() if entry.default]
+
+    @property
+    def specs(self) -> Dict[str, GeneratorSpec]:
+        """Declared inputs/outputs by generator key"""
+        return {name: entry.spec for name, entry in self._entries.items() if entry.spec is not None}
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Describe every registered generator without importing it"""
+        return [
+            {
+                'name': name,
+                'description': entry.description,
+                'default': entry.default,
+                'inputs': list(entry.spec.inputs) if entry.spec else [],
+                'outputs': list(entry.spec.outputs) if entry.spec else [],
+                'streaming': entry.stream_target is not None,
+                'loaded': entry.loaded
+            }
+            for name, entry in self._entries.items()
+        ]
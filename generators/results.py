@@ -0,0 +1,137 @@
+"""
+Compact storage for generator output
+
+A generator result such as ``{"remember": ["Define ...", ...], ...}`` costs one
+Python string object per item plus a list per section. GeneratedContent keeps
+the whole result as a single string table instead: every item is stored
+already JSON-encoded, items are separated by commas, and an offset array
+records where each item starts. Serializing to JSON then only joins one slice
+per section, and bulk jobs hold a few objects per result instead of hundreds.
+"""
+
+import json
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Tuple
+
+from config import Config
+from utils.memory import track
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+class GeneratedContent(Mapping):
+    """
+    Read-only mapping of section name to items, backed by one string table
+
+    Item ``i`` is ``table[offsets[i]:offsets[i + 1] - 1]`` (JSON-encoded; the
+    trailing character is the comma separator). Section ``k`` holds items
+    ``bounds[k]`` to ``bounds[k + 1] - 1``.
+    """
+
+    __slots__ = ('sections', 'bounds', 'table', 'offsets', '__weakref__')
+
+    def __init__(self, sections: Tuple[str, ...], bounds: array, table: str, offsets: array):
+        self.sections = sections
+        self.bounds = bounds
+        self.table = table
+        self.offsets = offsets
+        # Only when debugging: bulk generate_many(compact=True) creates these by the thousand
+        if Config.MEMORY_DEBUG_ENABLED:
+            track('generated_content', self, GeneratedContent.nbytes)
+
+    @classmethod
+    def from_dict(cls, content: Mapping[str, List[str]]) -> 'GeneratedContent':
+        """
+        Build a compact result from a generator's dict of lists
+
+        Args:
+            content: Items by section
+
+        Returns:
+            Compact result with the same sections and items, in order
+        """
+        parts = []
+        offsets = array('L', [0])
+        bounds = array('L', [0])
+        position = 0
+        for items in content.values():
+            for item in items:
+                encoded = _encode(item)
+                parts.append(encoded)
+                # +1 for the comma that follows every item
+                position += len(encoded) + 1
+                offsets.append(position)
+            bounds.append(len(offsets) - 1)
+        return cls(tuple(content), bounds, ','.join(parts), offsets)
+
+    def _array_body(self, index: int) -> str:
+        """JSON array body (items joined by commas) of the section at ``index``"""
+        first, last = self.bounds[index], self.bounds[index + 1]
+        if first == last:
+            return ''
+        return self.table[self.offsets[first]:self.offsets[last] - 1]
+
+    def __getitem__(self, section: str) -> List[str]:
+        try:
+            index = self.sections.index(section)
+        except ValueError:
+            raise KeyError(section) from None
+        return json.loads(f"[{self._array_body(index)}]")
+
+    def __contains__(self, section: object) -> bool:
+        return section in self.sections
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sections)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def item_count(self) -> int:
+        """Total number of items across all sections"""
+        return len(self.offsets) - 1
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Decode into a plain dict of lists"""
+        return json.loads(self.to_json())
+
+    def to_json(self) -> str:
+        """Serialize to a JSON object without decoding any item"""
+        return '{' + ','.join(
+            f"{_encode(section)}:[{self._array_body(index)}]" for index, section in enumerate(self.sections)
+        ) + '}'
+
+    def to_msgpack(self) -> bytes:
+        """Serialize to msgpack (requires the optional msgpack package)"""
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+        return msgpack.packb(self.to_dict(), use_bin_type=True)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table and offset arrays"""
+        return sys.getsizeof(self.table) + sys.getsizeof(self.offsets) + sys.getsizeof(self.bounds)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, GeneratedContent):
+            return self.sections == other.sections and self.bounds == other.bounds and self.table == other.table
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"GeneratedContent(sections={len(self.sections)}, items={self.item_count()})"
+
+
+def json_default(value: Any) -> Any:
+    """``default`` hook letting json.dump serialize GeneratedContent inside larger documents"""
+    if isinstance(value, GeneratedContent):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
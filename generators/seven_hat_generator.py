@@ -1,121 +1,93 @@
 """
 Generator for Seven Hat Thinking analysis
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List
 import logging
 
 logger = logging.getLogger('generators')
 
-def generate_seven_hat_analysis(analysis: Dict[str, Any]) -> List[str]:
-    """Generate analysis using de Bono's Seven Thinking Hats method"""
+def iter_seven_hat_analysis(analysis: Dict[str, Any]) -> Iterator[str]:
+    """Yield analysis using de Bono's Seven Thinking Hats method one line at a time"""
     logger.info("Generating Seven Hat Thinking analysis")
     
     # Default analysis if no input is available
     if not analysis:
-        return ["No Seven Hat analysis available"]
-    
-    hat_analysis = []
+        yield "No Seven Hat analysis available"
+        return
     
     # White Hat (Facts and Information)
-    hat_analysis.append("WHITE HAT (Facts and Information):")
-    white_hat = _generate_white_hat(analysis)
-    hat_analysis.extend(white_hat)
+    yield "WHITE HAT (Facts and Information):"
+    yield from _iter_white_hat(analysis)
     
     # Red Hat (Feelings and Emotions)
-    hat_analysis.append("RED HAT (Feelings and Emotions):")
-    red_hat = _generate_red_hat(analysis)
-    hat_analysis.extend(red_hat)
+    yield "RED HAT (Feelings and Emotions):"
+    yield from _iter_red_hat(analysis)
     
     # Black Hat (Critical Judgment)
-    hat_analysis.append("BLACK HAT (Critical Judgment):")
-    black_hat = _generate_black_hat(analysis)
-    hat_analysis.extend(black_hat)
+    yield "BLACK HAT (Critical Judgment):"
+    yield from _iter_black_hat(analysis)
     
     # Yellow Hat (Positive Aspects)
-    hat_analysis.append("YELLOW HAT (Positive Aspects):")
-    yellow_hat = _generate_yellow_hat(analysis)
-    hat_analysis.extend(yellow_hat)
+    yield "YELLOW HAT (Positive Aspects):"
+    yield from _iter_yellow_hat(analysis)
     
     # Green Hat (Creativity and Alternatives)
-    hat_analysis.append("GREEN HAT (Creativity and Alternatives):")
-    green_hat = _generate_green_hat(analysis)
-    hat_analysis.extend(green_hat)
+    yield "GREEN HAT (Creativity and Alternatives):"
+    yield from _iter_green_hat(analysis)
     
     # Blue Hat (Process and Overview)
-    hat_analysis.append("BLUE HAT (Process and Overview):")
-    blue_hat = _generate_blue_hat(analysis)
-    hat_analysis.extend(blue_hat)
-    
-    return hat_analysis
+    yield "BLUE HAT (Process and Overview):"
+    yield from _iter_blue_hat(analysis)
 
-def _generate_white_hat(analysis: Dict[str, Any]) -> List[str]:
+def generate_seven_hat_analysis(analysis: Dict[str, Any]) -> List[str]:
+    """Generate analysis using de Bono's Seven Thinking Hats method"""
+    return list(iter_seven_hat_analysis(analysis))
+
+def _iter_white_hat(analysis: Dict[str, Any]) -> Iterator[str]:
     """Generate White Hat (facts and information) analysis"""
-    white_hat = []
-    
     if 'facts' in analysis and analysis['facts']:
         for fact in analysis['facts']:
-            white_hat.append(f"• {fact}")
+            yield f"• {fact}"
     else:
-        white_hat.append("• The text presents several key facts and data points")
-        white_hat.append("• The information appears to be structured around main concepts")
-        white_hat.append("• Multiple sources or references may be cited to support claims")
-    
-    return white_hat
+        yield "• The text presents several key facts and data points"
+        yield "• The information appears to be structured around main concepts"
+        yield "• Multiple sources or references may be cited to support claims"
 
-def _generate_red_hat(analysis: Dict[str, Any]) -> List[str]:
+def _iter_red_hat(analysis: Dict[str, Any]) -> Iterator[str]:
     """Generate Red Hat (feelings and emotions) analysis"""
-    red_hat = []
-    
     if 'sentiment' in analysis:
         sentiment = analysis['sentiment']
-        red_hat.append(f"• The overall tone of the text appears to be {sentiment}")
-    
-    red_hat.append("• The material may evoke curiosity and intellectual engagement")
-    red_hat.append("• Some concepts might cause confusion if not clearly explained")
-    red_hat.append("• The presentation style could affect emotional response to the content")
+        yield f"• The overall tone of the text appears to be {sentiment}"
     
-    return red_hat
+    yield "• The material may evoke curiosity and intellectual engagement"
+    yield "• Some concepts might cause confusion if not clearly explained"
+    yield "• The presentation style could affect emotional response to the content"
 
-def _generate_black_hat(analysis: Dict[str, Any]) -> List[str]:
+def _iter_black_hat(analysis: Dict[str, Any]) -> Iterator[str]:
     """Generate Black Hat (critical judgment) analysis"""
-    black_hat = []
-    
-    black_hat.append("• Some claims may lack sufficient supporting evidence")
-    black_hat.append("• Alternative perspectives might not be adequately addressed")
-    black_hat.append("• The scope of application could be limited by unstated constraints")
-    black_hat.append("• Potential risks or downsides should be more thoroughly examined")
-    
-    return black_hat
+    yield "• Some claims may lack sufficient supporting evidence"
+    yield "• Alternative perspectives might not be adequately addressed"
+    yield "• The scope of application could be limited by unstated constraints"
+    yield "• Potential risks or downsides should be more thoroughly examined"
 
-def _generate_yellow_hat(analysis: Dict[str, Any]) -> List[str]:
+def _iter_yellow_hat(analysis: Dict[str, Any]) -> Iterator[str]:
     """Generate Yellow Hat (positive aspects) analysis"""
-    yellow_hat = []
-    
-    yellow_hat.append("• The concepts presented offer valuable insights into the subject")
-    yellow_hat.append("• The approach could lead to effective problem-solving applications")
-    yellow_hat.append("• Understanding these ideas may provide competitive advantages")
-    yellow_hat.append("• Long-term benefits include deeper understanding of the domain")
-    
-    return yellow_hat
+    yield "• The concepts presented offer valuable insights into the subject"
+    yield "• The approach could lead to effective problem-solving applications"
+    yield "• Understanding these ideas may provide competitive advantages"
+    yield "• Long-term benefits include deeper understanding of the domain"
 
-def _generate_green_hat(analysis: Dict[str, Any]) -> List[str]:
+def _iter_green_hat(analysis: Dict[str, Any]) -> Iterator[str]:
     """Generate Green Hat (creativity and alternatives) analysis"""
-    green_hat = []
-    
-    green_hat.append("• Consider applying these concepts in entirely different domains")
-    green_hat.append("• What if the fundamental assumptions were reversed?")
-    green_hat.append("• Combining these ideas with emerging technologies could create new opportunities")
-    green_hat.append("• Alternative methodologies might yield complementary insights")
-    
-    return green_hat
+    yield "• Consider applying these concepts in entirely different domains"
+    yield "• What if the fundamental assumptions were reversed?"
+    yield "• Combining these ideas with emerging technologies could create new opportunities"
+    yield "• Alternative methodologies might yield complementary insights"
 
-def _generate_blue_hat(analysis: Dict[str, Any]) -> List[str]:
+def _iter_blue_hat(analysis: Dict[str, Any]) -> Iterator[str]:
     """Generate Blue Hat (process and overview) analysis"""
-    blue_hat = []
-    
-    blue_hat.append("• This analysis has examined the content from multiple perspectives")
-    blue_hat.append("• The key insights emerge from considering both critical and positive aspects")
-    blue_hat.append("• Further exploration should focus on practical applications and testing")
-    blue_hat.append("• The next steps involve synthesizing these viewpoints into actionable insights")
+    yield "• This analysis has examined the content from multiple perspectives"
+    yield "• The key insights emerge from considering both critical and positive aspects"
+    yield "• Further exploration should focus on practical applications and testing"
+    yield "• The next steps involve synthesizing these viewpoints into actionable insights"
     
-    return blue_hat
\ No newline at end of file
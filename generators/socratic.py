@@ -2,7 +2,7 @@
 Socratic questioning generator for educational content
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import random
 import traceback
 
@@ -13,18 +13,26 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+from utils.instrumentation import Instrument
 from .base_generator import BaseGenerator
 
+instrument = Instrument(logger)
+
 class SocraticGenerator(BaseGenerator):
+    template_key = "socratic"
+    sections_only = True
+    
     def __init__(self):
         super().__init__("Socratic")
     
-    def _generate_content(self, normalized_input: Dict[str, Any]) -> Dict[str, List[str]]:
+    def _generate_content(self, normalized_input: Dict[str, Any],
+                          rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
         """
         Generate Socratic questions based on normalized input
         
         Args:
             normalized_input: Normalized input data
+            rng: Random generator for template variants
             
         Returns:
             Dictionary of Socratic questions by category
@@ -32,54 +40,13 @@ class SocraticGenerator(BaseGenerator):
         concepts = normalized_input['concepts']
         context = normalized_input['context']
         
-        logger.debug(f"Generating Socratic questions for: {concepts}")
-        
-        questions = {
-            "conceptual": [],
-            "clarifying": [],
-            "probing": [],
-            "analytical": []
-        }
-        
-        # Always generate at least one question for each type
-        main_concept = concepts[0]
-        
-        # Conceptual questions
-        questions["conceptual"].append(
-            f"What are the fundamental principles underlying {main_concept} in the context of {context}?"
-        )
-        
-        # Clarifying questions
-        questions["clarifying"].append(
-            f"Could you elaborate on how {main_concept} specifically impacts {context}?"
-        )
-        
-        # Probing questions
-        questions["probing"].append(
-            f"What evidence supports the relationship between {main_concept} and outcomes in {context}?"
-        )
-        
-        # Analytical questions
-        questions["analytical"].append(
-            f"How might different stakeholders in {context} view the implications of {main_concept}?"
-        )
+        instrument.debug("Generating Socratic questions for: {concepts}", concepts=concepts)
         
-        # Add questions for additional concepts
-        for concept in concepts[1:3]:
-            questions["conceptual"].append(
-                f"How does {concept} relate to core principles in {context}?"
-            )
-            questions["clarifying"].append(
-                f"What specific aspects of {concept} need further examination in {context}?"
-            )
-            questions["probing"].append(
-                f"What assumptions underlie the relationship between {concept} and {context}?"
-            )
-            questions["analytical"].append(
-                f"How might changes in {concept} affect different aspects of {context}?"
-            )
+        # Always generate at least one question for each type,
+        # plus questions for additional concepts
+        questions = self.templates.render_sections(concepts[0], concepts[1:], context, rng)
         
-        logger.info(f"Generated {sum(len(q) for q in questions.values())} Socratic questions")
+        instrument.info("Generated {count} Socratic questions", count=lambda: sum(len(q) for q in questions.values()))
         
         return questions
 
@@ -0,0 +1,116 @@
+"""
+Line-by-line output for generators that produce long text
+
+Chain of Thought and Seven Hats build their output as a list of lines.
+Their streaming forms (registered with ``stream=``) yield the same lines one
+at a time, so the HTTP layer can send each line as soon as it exists and batch
+jobs can write lines straight to disk instead of holding every result in memory.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from generators import generator_registry
+
+# Lines written per file.write call
+WRITE_CHUNK_LINES = 256
+
+
+def stream_generator(name: str, analysis: Dict[str, Any]) -> Iterator[str]:
+    """
+    Yield a generator's output one line at a time
+
+    Generators without a streaming form are run once and their list (or the
+    items of every section of a dict result) is yielded item by item.
+
+    Args:
+        name: Registered generator key
+        analysis: Analysis result passed to the generator
+
+    Returns:
+        Iterator over output lines
+    """
+    stream = generator_registry.stream(name)
+    if stream is not None:
+        return stream(analysis)
+    return _iter_items(generator_registry[name](analysis))
+
+
+def _iter_items(content: Any) -> Iterator[str]:
+    if isinstance(content, dict):
+        for items in content.values():
+            yield from _iter_items(items)
+    elif isinstance(content, (list, tuple)):
+        for item in content:
+            yield str(item)
+    elif content is not None:
+        yield str(content)
+
+
+def write_stream(lines: Iterable[str], path: str, fmt: str = 'text') -> int:
+    """
+    Write lines to a file as they are produced
+
+    Lines go to a temporary file in the target directory, written in chunks of
+    WRITE_CHUNK_LINES, which then replaces ``path``; readers never see a
+    partially written file.
+
+    Args:
+        lines: Lines to write, typically from stream_generator
+        path: Output file
+        fmt: 'text' (one line per line) or 'ndjson' (one JSON string per line)
+
+    Returns:
+        Number of lines written
+    """
+    if fmt not in ('text', 'ndjson'):
+        raise ValueError(f"Unsupported stream format: {fmt}")
+    encode = json.dumps if fmt == 'ndjson' else str
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            chunk = []
+            for line in lines:
+                chunk.append(encode(line))
+                count += 1
+                if len(chunk) >= WRITE_CHUNK_LINES:
+                    f.write('\n'.join(chunk) + '\n')
+                    chunk.clear()
+            if chunk:
+                f.write('\n'.join(chunk) + '\n')
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+
+def write_batch(name: str, analyses: Iterable[Dict[str, Any]], output_dir: str,
+                fmt: str = 'text', prefix: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream one generator over many analyses, one output file per analysis
+
+    Only the lines of the current chunk are in memory at any time.
+
+    Args:
+        name: Registered generator key
+        analyses: Analysis results, consumed lazily
+        output_dir: Directory for the output files
+        fmt: 'text' or 'ndjson'
+        prefix: File name prefix (defaults to the generator key)
+
+    Returns:
+        Iterator over the paths written, in input order
+    """
+    extension = 'ndjson' if fmt == 'ndjson' else 'txt'
+    prefix = prefix or name
+    for index, analysis in enumerate(analyses):
+        path = os.path.join(output_dir, f"{prefix}_{index:05d}.{extension}")
+        write_stream(stream_generator(name, analysis), path, fmt)
+        yield path
@@ -2,7 +2,8 @@
 Summary generator for educational content
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import random
 import traceback
 
 # Safe import của logger
@@ -12,18 +13,25 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+from utils.instrumentation import Instrument
 from .base_generator import BaseGenerator
 
+instrument = Instrument(logger)
+
 class SummaryGenerator(BaseGenerator):
+    template_key = "summary"
+    
     def __init__(self):
         super().__init__("Summary")
     
-    def _generate_content(self, normalized_input: Dict[str, Any]) -> Dict[str, List[str]]:
+    def _generate_content(self, normalized_input: Dict[str, Any],
+                          rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
         """
         Generate summary based on normalized input
         
         Args:
             normalized_input: Normalized input data
+            rng: Random generator for template variants
             
         Returns:
             Dictionary of summary content
@@ -34,45 +42,35 @@ class SummaryGenerator(BaseGenerator):
         context = normalized_input['context']
         
         # Log để debug
-        logger.debug(f"Generating summary for text of length {len(text)}, concepts: {concepts}")
+        instrument.debug("Generating summary for text of length {length}, concepts: {concepts}", length=len(text), concepts=concepts)
         
         # Đảm bảo có concept để xử lý
         if not concepts:
             logger.warning("No concepts found, using default")
             concepts = ["general topic"]
         
-        summary = {
-            "brief": [],
-            "detailed": [],
-            "key_points": []
-        }
-        
-        # LUÔN thêm ít nhất một mục cho mỗi loại
+        # LUÔN có ít nhất một mục cho mỗi loại
+        templates = self.templates
         
         # Brief summary
-        concepts_str = ", ".join(concepts[:3])
-        summary["brief"].append(f"This text discusses {concepts_str} in the context of {context}.")
+        brief = templates.render("brief", rng=rng, concepts=", ".join(concepts[:3]), context=context)
         
         # Detailed summary
-        detailed_summary = f"The content examines {concepts[0]} and its relationship to {context}. "
+        detailed_summary = templates.render("detailed", rng=rng, concept=concepts[0], context=context)
         if len(concepts) > 1:
-            detailed_summary += f"It explores key aspects including {', '.join(concepts[1:3])}."
+            detailed_summary += templates.render("detailed_more", rng=rng, others=", ".join(concepts[1:3]))
         else:
-            detailed_summary += f"It explores key aspects related to this concept."
-        summary["detailed"].append(detailed_summary)
-        
-        # Key points - luôn có ít nhất 3 điểm chính
-        summary["key_points"].append(f"{concepts[0]} is an important element in understanding {context}.")
-        summary["key_points"].append(f"The relationship between {concepts[0]} and {context} highlights significant patterns and trends.")
-        summary["key_points"].append(f"Understanding {concepts[0]} requires consideration of multiple perspectives and approaches.")
+            detailed_summary += templates.render("detailed_single", rng=rng)
         
-        # Thêm key points cho các concepts khác nếu có
-        for concept in concepts[1:3]:
-            key_point = f"{concept} contributes to the broader understanding of {context} through its unique characteristics and applications."
-            summary["key_points"].append(key_point)
+        # Key points - luôn có ít nhất 3 điểm chính, thêm key points cho các concepts khác nếu có
+        summary = {
+            "brief": [brief],
+            "detailed": [detailed_summary],
+            **templates.render_sections(concepts[0], concepts[1:], context, rng)
+        }
         
         # Log kết quả để debug
-        logger.info(f"Generated summary with {sum(len(points) for points in summary.values())} components")
+        instrument.info("Generated summary with {count} components", count=lambda: sum(len(points) for points in summary.values()))
         
         return summary
 
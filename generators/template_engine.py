@@ -0,0 +1,170 @@
+"""
+Declarative template registry shared by the BaseGenerator family
+
+Templates live in ``templates.json`` and are compiled once at import. Each
+generator owns a template set made of:
+
+- ``sections``: output categories, each with ``main`` templates (all rendered
+  for the main concept) and ``extra`` variants (one picked per extra concept)
+- ``strings``: named template lists used for one-off sentences
+
+Adding a template variant only requires editing the JSON file.
+"""
+
+import hashlib
+import json
+import os
+import random
+from string import Formatter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Placeholders a template may use
+ALLOWED_FIELDS = frozenset({'concept', 'context', 'concepts', 'others', 'term'})
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates.json')
+
+
+class CompiledTemplate:
+    """A template string validated once and rendered through its bound ``str.format``"""
+
+    __slots__ = ('source', 'fields', 'format')
+
+    def __init__(self, source: str):
+        fields = set()
+        for _, field, spec, conversion in Formatter().parse(source):
+            if field is None:
+                continue
+            if field not in ALLOWED_FIELDS or spec or conversion:
+                raise ValueError(f"Unsupported placeholder {{{field}}} in template: {source!r}")
+            fields.add(field)
+
+        self.source = source
+        self.fields = frozenset(fields)
+        self.format = source.format
+
+
+def _compile_all(sources: Iterable[str]) -> Tuple[CompiledTemplate, ...]:
+    return tuple(CompiledTemplate(source) for source in sources)
+
+
+class TemplateSet:
+    """Compiled templates for one generator"""
+
+    def __init__(self, name: str, spec: Dict):
+        self.name = name
+        self.sections: List[Tuple[str, Tuple[CompiledTemplate, ...], Tuple[CompiledTemplate, ...]]] = [
+            (section, _compile_all(body.get('main', [])), _compile_all(body.get('extra', [])))
+            for section, body in spec.get('sections', {}).items()
+        ]
+        self.strings: Dict[str, Tuple[CompiledTemplate, ...]] = {
+            key: _compile_all(variants) for key, variants in spec.get('strings', {}).items()
+        }
+
+    def render_sections(self, main_concept: str, extra_concepts: List[str], context: str,
+                        rng: Optional[random.Random] = None) -> Dict[str, List[str]]:
+        """
+        Render every section for a main concept and a list of extra concepts
+
+        Args:
+            main_concept: Concept rendered with all ``main`` templates
+            extra_concepts: Concepts each rendered with one ``extra`` variant
+            context: Context substituted into every template
+            rng: Random generator used to pick variants (module ``random`` if None)
+
+        Returns:
+            Dictionary of rendered strings by section
+        """
+        choice = (rng or random).choice
+        result = {}
+        for section, main, extra in self.sections:
+            items = [template.format(concept=main_concept, context=context) for template in main]
+            if len(extra) == 1:
+                render = extra[0].format
+                items.extend([render(concept=concept, context=context) for concept in extra_concepts])
+            elif extra:
+                items.extend([
+                    choice(extra).format(concept=concept, context=context)
+                    for concept in extra_concepts
+                ])
+            result[section] = items
+        return result
+
+    def render_sections_many(self, main_concepts: List[str], extra_concepts: List[List[str]],
+                             contexts: List[str],
+                             rngs: Optional[List[random.Random]] = None) -> List[Dict[str, List[str]]]:
+        """
+        Render every section for a batch of inputs, one template column at a time
+
+        Args:
+            main_concepts: Main concept of each input
+            extra_concepts: Extra concepts of each input
+            contexts: Context of each input
+            rngs: Random generator of each input (module ``random`` if None)
+
+        Returns:
+            One dictionary of rendered strings by section per input
+        """
+        results: List[Dict[str, List[str]]] = [{} for _ in main_concepts]
+        choices = [rng.choice for rng in rngs] if rngs is not None else [random.choice] * len(main_concepts)
+        for section, main, extra in self.sections:
+            # Each main template is rendered for the whole batch in one comprehension
+            columns = [
+                [template.format(concept=concept, context=context)
+                 for concept, context in zip(main_concepts, contexts)]
+                for template in main
+            ]
+            single = extra[0].format if len(extra) == 1 else None
+
+            for index, result in enumerate(results):
+                items = [column[index] for column in columns]
+                if extra_concepts[index] and extra:
+                    context = contexts[index]
+                    if single is not None:
+                        items.extend([single(concept=c, context=context) for c in extra_concepts[index]])
+                    else:
+                        choice = choices[index]
+                        items.extend([
+                            choice(extra).format(concept=c, context=context)
+                            for c in extra_concepts[index]
+                        ])
+                result[section] = items
+        return results
+
+    def render(self, key: str, rng: Optional[random.Random] = None, **values) -> str:
+        """Render one variant (chosen at random when there are several) of a named string"""
+        variants = self.strings[key]
+        template = variants[0] if len(variants) == 1 else (rng or random).choice(variants)
+        return template.format(**values)
+
+    def render_all(self, key: str, **values) -> List[str]:
+        """Render every variant of a named string"""
+        return [template.format(**values) for template in self.strings[key]]
+
+
+class TemplateRegistry:
+    """All compiled template sets, by generator name"""
+
+    def __init__(self, data: Dict[str, Dict]):
+        self._sets = {name: TemplateSet(name, spec) for name, spec in data.items()}
+        # Changes whenever any template changes; part of generator cache keys
+        self.digest = hashlib.blake2b(json.dumps(data, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+
+    @classmethod
+    def load(cls, path: str = TEMPLATES_PATH) -> 'TemplateRegistry':
+        """Load and compile a template file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def get(self, name: str) -> TemplateSet:
+        """Return the template set of a generator"""
+        try:
+            return self._sets[name]
+        except KeyError:
+            raise KeyError(f"No templates registered for generator '{name}'") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sets
+
+
+# Shared registry, compiled once per process
+TEMPLATES = TemplateRegistry.load()
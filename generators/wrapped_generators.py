@@ -5,12 +5,15 @@ Generator functions to transform raw analysis into structured educational conten
 from typing import Dict, Any, List
 import logging
 
+from utils.instrumentation import Instrument
+
 # Setup logger
 logger = logging.getLogger('generators')
+instrument = Instrument(logger)
 
 def generate_socratic_questions(analysis: Dict[str, Any]) -> List[str]:
     """Generate Socratic questions based on analysis"""
-    logger.info(f"Generating Socratic questions from {len(analysis.get('concepts', []))} concepts")
+    instrument.info("Generating Socratic questions from {count} concepts", count=lambda: len(analysis.get('concepts', [])))
     questions = []
     
     concepts = analysis.get('concepts', [])
@@ -65,10 +68,3 @@ def generate_practice_questions(analysis: Dict[str, Any]) -> List[str]:
         questions.append(f"Explain the concept of {keyword} in your own words.")
     
     return questions
-
-# Map of available generators
-AVAILABLE_GENERATORS = {
-    "socratic": generate_socratic_questions,
-    "multilevel": generate_multilevels,
-    "practice": generate_practice_questions
-}
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+Local stand-in for the Perplexity chat completions endpoint
+
+Unlike MockPerplexityAPI (canned answers, no I/O), this is a real HTTP server:
+requests go through aiohttp, connection pooling, timeouts and the retry loop
+exactly as they would against api.perplexity.ai. Latency, 5xx errors and 429
+rate limiting are injected from a seeded random generator, so runs are
+repeatable:
+
+    with FakePerplexityServer(latency='lognormal:300:0.5', error_rate=0.05).serve_in_thread() as server:
+        analyzer.base_url = server.url
+
+Run it standalone to point the app at it (PERPLEXITY_BASE_URL):
+
+    python mocks/fake_perplexity_server.py --port 8765 --latency uniform:100:400 --rate-limit-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from aiohttp import web
+
+CHAT_PATH = '/chat/completions'
+
+
+class LatencyModel:
+    """
+    Response delay distribution, parsed from ``kind:arg:arg`` (milliseconds)
+
+    - ``fixed:200`` always 200 ms
+    - ``uniform:100:400`` uniform between 100 and 400 ms
+    - ``lognormal:300:0.5`` median 300 ms, log standard deviation 0.5 (long tail)
+    """
+
+    __slots__ = ('kind', 'args')
+
+    _ARITY = {'fixed': 1, 'uniform': 2, 'lognormal': 2}
+
+    def __init__(self, kind: str, *args: float):
+        if kind not in self._ARITY or len(args) != self._ARITY[kind]:
+            raise ValueError(f"Invalid latency model: {kind}{list(args)}")
+        self.kind = kind
+        self.args = args
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyModel':
+        kind, *args = spec.split(':')
+        try:
+            return cls(kind, *(float(arg) for arg in args))
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec!r}") from None
+
+    def sample(self, rng: random.Random) -> float:
+        """Delay in seconds"""
+        if self.kind == 'fixed':
+            ms = self.args[0]
+        elif self.kind == 'uniform':
+            ms = rng.uniform(*self.args)
+        else:
+            ms = self.args[0] * math.exp(rng.gauss(0.0, self.args[1]))
+        return max(ms, 0.0) / 1000
+
+    def __str__(self) -> str:
+        return ':'.join([self.kind] + [f"{arg:g}" for arg in self.args])
+
+
+def fake_completion(prompt: str) -> str:
+    """Plausible answer text for a prompt: JSON for extraction prompts, numbered lines otherwise"""
+    words = [word.strip('.,:;()"\'') for word in prompt.split()[-60:]]
+    words = [word for word in words if len(word) > 4] or ['concept']
+    if 'Format as JSON' in prompt:
+        return json.dumps({
+            'key_concepts': words[:5],
+            'themes': words[5:8] or words[:3],
+            'entities': words[8:11] or words[:2]
+        })
+    return '\n'.join(f"{i}. {' '.join(words[i:i + 6]) or words[0]}?" for i in range(1, 6))
+
+
+class FakePerplexityServer:
+    """OpenAI-style chat completions server with injected latency, errors and rate limiting"""
+
+    def __init__(self, latency: Any = 'fixed:0', error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 token_delay: float = 0.0, seed: int = 0, api_key_prefix: str = 'pplx-'):
+        """
+        Args:
+            latency: LatencyModel or spec string, applied before every response
+            error_rate: Fraction of requests answered with 500
+            rate_limit_rate: Fraction of requests answered with 429 (with Retry-After)
+            token_delay: Seconds between chunks of a streamed (``"stream": true``) response
+            seed: Random seed for latency and fault injection
+            api_key_prefix: Bearer tokens must start with this, otherwise 401
+        """
+        self.latency = LatencyModel.parse(latency) if isinstance(latency, str) else latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.token_delay = token_delay
+        self.api_key_prefix = api_key_prefix
+        self.rng = random.Random(seed)
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.requests = 0
+        self.status_counts: Dict[int, int] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Client (host, port) pairs seen: one per TCP connection, so pooling shows as reuse
+        self.connections = set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'status_counts': {str(code): count for code, count in sorted(self.status_counts.items())},
+            'peak_in_flight': self.peak_in_flight,
+            'connections': len(self.connections)
+        }
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(CHAT_PATH, self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        peer = request.transport.get_extra_info('peername') if request.transport else None
+        if peer:
+            self.connections.add(tuple(peer[:2]))
+        try:
+            response = await self._respond(request)
+        finally:
+            self.in_flight -= 1
+        self.status_counts[response.status] = self.status_counts.get(response.status, 0) + 1
+        return response
+
+    async def _respond(self, request: web.Request) -> web.StreamResponse:
+        if not request.headers.get('Authorization', '').startswith(f"Bearer {self.api_key_prefix}"):
+            return web.json_response({'error': {'message': 'Invalid API key'}}, status=401)
+        try:
+            body = await request.json()
+            prompt = body['messages'][-1]['content']
+        except (ValueError, KeyError, IndexError, TypeError):
+            return web.json_response({'error': {'message': 'Malformed request'}}, status=400)
+
+        # Draw every random value up front so a run's fault sequence depends only on the seed
+        delay = self.latency.sample(self.rng)
+        fault = self.rng.random()
+        if fault < self.rate_limit_rate:
+            return web.json_response({'error': {'message': 'Rate limit exceeded'}}, status=429,
+                                     headers={'Retry-After': '1'})
+        await asyncio.sleep(delay)
+        if fault < self.rate_limit_rate + self.error_rate:
+            return web.json_response({'error': {'message': 'Injected server error'}}, status=500)
+
+        content = fake_completion(prompt)
+        if body.get('stream'):
+            return await self._stream(request, body, content)
+        return web.json_response({
+            'id': f"fake-{self.requests}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': len(prompt.split()), 'completion_tokens': len(content.split())}
+        })
+
+    async def _stream(self, request: web.Request, body: Dict[str, Any], content: str) -> web.StreamResponse:
+        """Server-sent events, one chunk per whitespace-separated token"""
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        tokens = content.split(' ')
+        for i, token in enumerate(tokens):
+            chunk = {'object': 'chat.completion.chunk', 'model': body.get('model'),
+                     'choices': [{'index': 0, 'delta': {'content': token + (' ' if i < len(tokens) - 1 else '')}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start listening (port 0 picks a free port); returns the chat completions URL"""
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.url = f"http://{bound_host}:{bound_port}{CHAT_PATH}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'FakePerplexityServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    @contextmanager
+    def serve_in_thread(self, host: str = '127.0.0.1', port: int = 0) -> Iterator['FakePerplexityServer']:
+        """
+        Serve from a separate thread and event loop
+
+        Keeps the server's own work off the event loop being measured.
+        """
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name='fake-perplexity', daemon=True)
+        thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self.start(host, port), loop).result()
+            yield self
+        finally:
+            asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Local fake Perplexity API server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='lognormal:300:0.5', help='fixed:MS, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--token-delay', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = FakePerplexityServer(args.latency, args.error_rate, args.rate_limit_rate, args.token_delay, args.seed)
+
+    async def serve():
+        url = await server.start(args.host, args.port)
+        print(f"Fake Perplexity API listening on {url} (latency {server.latency})")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
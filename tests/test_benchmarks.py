@@ -0,0 +1,87 @@
+"""
+Kiểm tra benchmark runner (tools/bench_runner.py): schema, so sánh với baseline và lịch sử
+"""
+import os
+import sys
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+
+# Add project root and tools to path
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+
+from bench_runner import (SCHEMA_VERSION, metric, compare_metric, compare_runs, run_suite, save_run,
+                          save_baseline, load_history, legacy_to_run, main)
+
+
+class TestBenchRunner(unittest.TestCase):
+    """Tests for benchmark runs, regression detection and legacy history"""
+
+    def test_compare_metric_status(self):
+        """Clear shifts beyond the threshold are flagged; overlapping samples are noise"""
+        baseline = metric([10.0, 10.2, 9.9, 10.1, 10.0], 'ms')
+        self.assertEqual(compare_metric(metric([12.0, 12.1, 11.9, 12.2, 12.0], 'ms'), baseline)['status'], 'regressed')
+        self.assertEqual(compare_metric(metric([8.0, 8.1, 7.9, 8.2, 8.0], 'ms'), baseline)['status'], 'improved')
+        self.assertEqual(compare_metric(metric([10.1, 9.9, 10.0, 10.2, 9.8], 'ms'), baseline)['status'], 'unchanged')
+        self.assertEqual(compare_metric(metric([6.0, 20.0, 11.5, 8.0, 16.0], 'ms'), baseline)['status'], 'noise')
+
+        # For throughput a lower median is the regression
+        result = compare_metric(metric([80, 81, 79, 80, 82], 'calls/s', 'higher'),
+                                metric([100, 101, 99, 100, 102], 'calls/s', 'higher'))
+        self.assertEqual(result['status'], 'regressed')
+        self.assertLess(result['ci95'][1], 1.0)
+        self.assertEqual(compare_metric(baseline, None)['status'], 'missing')
+
+    def test_run_schema_and_baseline_cycle(self):
+        """Runs carry environment metadata; a slower run fails against the saved baseline"""
+        run = run_suite('sanitizer', repeats=2)
+        self.assertEqual(run['schema'], SCHEMA_VERSION)
+        self.assertEqual(len(run['metrics']['sanitize_mb_per_s']['samples']), 2)
+        self.assertIn('python', run['environment'])
+        self.assertIn('git_commit', run['environment'])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            save_baseline(save_run(run, tmp), tmp)
+            slower = json.loads(json.dumps(run))
+            slower['timestamp'] = '2099-01-01T00:00:00'
+            slower['metrics']['sanitize_mb_per_s']['samples'] = [0.001, 0.001]
+            slower_path = save_run(slower, tmp)
+
+            comparison = compare_runs(slower, run)
+            self.assertEqual(comparison['regressed'], ['sanitize_mb_per_s'])
+            self.assertEqual(comparison['environment_differences'], {})
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(main(['--results-dir', tmp, 'compare', slower_path,
+                                       os.path.join(tmp, 'baselines', 'sanitizer.json'), '--fail-on-regression']), 1)
+            self.assertEqual([r['timestamp'] for r in load_history(tmp, 'sanitizer')],
+                             [run['timestamp'], '2099-01-01T00:00:00'])
+
+    def test_legacy_files(self):
+        """Pre-schema result files are converted for the history view"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'benchmark_analyze_20250411_122631.json'), 'w') as f:
+                json.dump({'method': 'analyze', 'iterations': 2, 'times': [0.1, 0.3], 'avg_time': 0.2, 'std_dev': 0.14}, f)
+            with open(os.path.join(tmp, 'cache_benchmark_20250411_122901.json'), 'w') as f:
+                json.dump({'cold_time': 0.3, 'warm_time': 0.2, 'improvement_factor': 1.5}, f)
+            with open(os.path.join(tmp, 'notes.json'), 'w') as f:
+                json.dump({'cold_time': 1}, f)
+
+            run = legacy_to_run(os.path.join(tmp, 'benchmark_analyze_20250411_122631.json'))
+            self.assertEqual(run['suite'], 'legacy.benchmark_analyze')
+            self.assertEqual(set(run['metrics']), {'time_s'})
+            self.assertEqual(run['metrics']['time_s']['samples'], [0.1, 0.3])
+
+            runs = load_history(tmp, legacy=True)
+            self.assertEqual([r['suite'] for r in runs], ['legacy.benchmark_analyze', 'legacy.cache_benchmark'])
+            self.assertEqual(runs[1]['metrics']['improvement_factor']['better'], 'higher')
+            with redirect_stdout(io.StringIO()) as output, redirect_stderr(io.StringIO()):
+                self.assertEqual(main(['--results-dir', tmp, 'history', '--legacy']), 0)
+            self.assertIn('legacy.cache_benchmark:', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
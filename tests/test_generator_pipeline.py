@@ -0,0 +1,377 @@
+"""
+Kiểm tra các thành phần dùng chung của generators (templates, registry, pipeline)
+"""
+import os
+import sys
+import unittest
+import asyncio
+import json
+import time
+import logging
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('test_generator_pipeline')
+
+from generators.template_engine import TemplateRegistry, CompiledTemplate, TEMPLATES
+from generators.blooms import generate_blooms_questions
+from generators.keyterms import generate_keyterms
+from generators.summarizer import generate_summary
+from generators.socratic import generator as socratic_generator
+from generators.keyterms import generator as keyterms_generator
+from generators.executor import (GeneratorExecutor, GeneratorSpec, build_dependencies,
+                                 STATUS_OK, STATUS_ERROR, STATUS_TIMEOUT)
+from generators import AVAILABLE_GENERATORS, GENERATOR_SPECS, generator_registry
+from generators.registry import GeneratorRegistry
+from generators.memo import generator_memo
+from generators.blooms import generator as blooms_generator
+from utils.instrumentation import Instrument
+from generators.results import GeneratedContent, json_default
+from generators.concept_selection import ranked_concepts, concept_budget, select_concepts
+from generators.chain_of_thought import iter_chain_of_thought, generate_chain_of_thought
+from generators.seven_hat_generator import generate_seven_hat_analysis
+from generators.streaming import stream_generator, write_stream, write_batch
+import tempfile
+
+SAMPLE_ANALYSIS = {
+    'text': 'Machine learning uses data to train a model.',
+    'concepts': ['machine learning', 'data', 'model', 'training'],
+    'context': 'technology',
+    'keywords': ['machine learning', 'dataset']
+}
+
+
+class TestTemplateEngine(unittest.TestCase):
+    """Tests for the shared template registry"""
+
+    def test_rejects_unknown_placeholders(self):
+        """Templates are validated when they are compiled"""
+        self.assertEqual(CompiledTemplate("{concept} in {context}").fields, {'concept', 'context'})
+        with self.assertRaises(ValueError):
+            CompiledTemplate("{concept} and {unknown}")
+        with self.assertRaises(ValueError):
+            CompiledTemplate("{concept!r}")
+
+    def test_render_sections(self):
+        """Main templates use the main concept, extra variants one per extra concept"""
+        registry = TemplateRegistry({
+            'demo': {'sections': {'items': {'main': ['Main {concept}', 'Also {concept}'],
+                                            'extra': ['Extra {concept} in {context}']}}}
+        })
+        rendered = registry.get('demo').render_sections('A', ['B', 'C'], 'ctx')
+        self.assertEqual(rendered, {'items': ['Main A', 'Also A', 'Extra B in ctx', 'Extra C in ctx']})
+        with self.assertRaises(KeyError):
+            registry.get('missing')
+
+    def test_every_generator_has_templates(self):
+        """Each BaseGenerator template key is registered"""
+        for key in ('socratic', 'multilevel', 'blooms', 'practice', 'keyterms', 'analogies', 'summary'):
+            with self.subTest(generator=key):
+                self.assertIn(key, TEMPLATES)
+
+    def test_generator_output_shape(self):
+        """Generators keep their categories and per-concept counts"""
+        blooms = generate_blooms_questions(SAMPLE_ANALYSIS)
+        self.assertEqual(list(blooms), ['remember', 'understand', 'apply', 'analyze', 'evaluate', 'create'])
+        self.assertTrue(all(len(questions) == 3 for questions in blooms.values()))
+        self.assertEqual(blooms['remember'][0], "Define machine learning in your own words.")
+
+        summary = generate_summary(SAMPLE_ANALYSIS)
+        self.assertEqual(summary['brief'], ["This text discusses machine learning, data, model in the context of technology."])
+        self.assertEqual(len(summary['key_points']), 5)
+
+        terms = generate_keyterms(SAMPLE_ANALYSIS)
+        self.assertEqual(terms['related_terms'][:3], [
+            "machine learning framework", "machine learning methodology", "machine learning in technology"
+        ])
+        self.assertEqual(len(terms['definitions']), len(terms['core_concepts']) + len(terms['related_terms']))
+
+
+class TestBatchGeneration(unittest.TestCase):
+    """Tests for BaseGenerator.generate_many"""
+
+    def test_batch_matches_single(self):
+        """Batch results equal one generate() call per input"""
+        analyses = [
+            SAMPLE_ANALYSIS,
+            {'concepts': ['photosynthesis'], 'context': 'science'},
+            {'text': 'No concepts here'}
+        ]
+        for gen in (socratic_generator, keyterms_generator):
+            with self.subTest(generator=gen.name):
+                self.assertEqual(gen.generate_many(analyses), [gen.generate(a) for a in analyses])
+
+    def test_errors_are_isolated(self):
+        """A bad item gets the default result without affecting the others"""
+        results = socratic_generator.generate_many([SAMPLE_ANALYSIS, None, SAMPLE_ANALYSIS])
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], results[2])
+        self.assertTrue(results[0]['conceptual'])
+        self.assertEqual(results[1], socratic_generator._get_default_result())
+
+
+class TestDeterministicGeneration(unittest.TestCase):
+    """Tests for content-hash seeding and memoized outputs"""
+
+    def setUp(self):
+        generator_memo.clear()
+
+    def test_same_input_same_output(self):
+        """Random template variants are seeded from the input, so output survives a cache clear"""
+        first = blooms_generator.generate(SAMPLE_ANALYSIS)
+        generator_memo.clear()
+        self.assertEqual(blooms_generator.generate(dict(SAMPLE_ANALYSIS)), first)
+        self.assertEqual(blooms_generator.generate_many([SAMPLE_ANALYSIS])[0], first)
+
+        outputs = {str(blooms_generator.generate(SAMPLE_ANALYSIS, seed=seed)) for seed in range(20)}
+        self.assertGreater(len(outputs), 1)
+
+        practice = AVAILABLE_GENERATORS['practice']
+        analysis = {'text': 'x', 'key_concepts': ['a', 'b', 'c'], 'entities': ['e1', 'e2']}
+        generator_memo.clear()
+        self.assertEqual(practice(analysis), practice(dict(analysis)))
+
+    def test_outputs_are_memoized(self):
+        """Repeated inputs are served from the cache and callers get their own copy"""
+        result = blooms_generator.generate(SAMPLE_ANALYSIS)
+        result['remember'].append('changed by caller')
+        again = blooms_generator.generate(SAMPLE_ANALYSIS)
+        self.assertNotIn('changed by caller', again['remember'])
+        stats = generator_memo.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+class TestConceptSelection(unittest.TestCase):
+    """Tests for ranked, diverse concept selection"""
+
+    def test_small_analyses_keep_rank_order(self):
+        """With few concepts the first three are used, as before"""
+        ranked = ranked_concepts(SAMPLE_ANALYSIS['concepts'])
+        self.assertEqual(concept_budget(len(ranked)), 3)
+        self.assertEqual(select_concepts(ranked, 3), ['machine learning', 'data', 'model'])
+
+    def test_selection_prefers_diverse_concepts(self):
+        """Near duplicates lose to different concepts, and weights outrank plain order"""
+        ranked = ranked_concepts(['neural network', 'neural network training', 'gradient descent', 'loss']
+                                 + [f'other {i}' for i in range(6)])
+        self.assertEqual(select_concepts(ranked, 3), ['neural network', 'gradient descent', 'loss'])
+
+        weighted = ranked_concepts(['a', 'b'], [{'text': 'c', 'weight': 0.2}, {'text': 'b', 'weight': 0.9}])
+        self.assertEqual([concept for concept, _ in weighted], ['b', 'c', 'a'])
+
+    def test_output_scales_with_concepts(self):
+        """Large analyses cover more concepts, within the budget"""
+        concepts = [f"topic {i} term{i}" for i in range(100)]
+        self.assertEqual(concept_budget(len(concepts)), 10)
+        socratic = socratic_generator.generate({'concepts': concepts, 'context': 'science'})
+        self.assertEqual(len(socratic['conceptual']), 10)
+        limited = socratic_generator.generate({'concepts': concepts, 'concept_budget': 4})
+        self.assertEqual(len(limited['conceptual']), 4)
+
+        questions = AVAILABLE_GENERATORS['questions']({'text': 'x', 'key_concepts': concepts})
+        self.assertEqual(len(questions), 20)
+
+
+class TestCompactResults(unittest.TestCase):
+    """Tests for the string-table result representation"""
+
+    CONTENT = {'questions': ['Why "this"?', 'Café, naïve\n\\path'], 'empty': [], 'single': ['{concept}']}
+
+    def test_round_trip(self):
+        """Sections, items and order survive compaction"""
+        compact = GeneratedContent.from_dict(self.CONTENT)
+        self.assertEqual(compact.to_dict(), self.CONTENT)
+        self.assertEqual(list(compact), ['questions', 'empty', 'single'])
+        self.assertEqual(compact['questions'], self.CONTENT['questions'])
+        self.assertEqual(compact['empty'], [])
+        self.assertEqual(compact.item_count(), 3)
+        self.assertEqual(compact, self.CONTENT)
+        with self.assertRaises(KeyError):
+            compact['missing']
+
+    def test_serializes_like_json(self):
+        """to_json matches json.dumps of the original dict"""
+        compact = GeneratedContent.from_dict(self.CONTENT)
+        self.assertEqual(compact.to_json(), json.dumps(self.CONTENT, ensure_ascii=False, separators=(',', ':')))
+        self.assertEqual(json.loads(json.dumps({'content': compact}, default=json_default))['content'], self.CONTENT)
+
+    def test_generate_many_compact(self):
+        """Batch generation can return compact results"""
+        plain, compact = (socratic_generator.generate_many([SAMPLE_ANALYSIS], compact=flag)[0] for flag in (False, True))
+        self.assertIsInstance(compact, GeneratedContent)
+        self.assertEqual(compact.to_dict(), plain)
+
+
+class TestStreamingGenerators(unittest.TestCase):
+    """Tests for line-by-line generator output"""
+
+    def test_stream_matches_list_output(self):
+        """Streaming forms yield exactly the lines of the list forms"""
+        analysis = dict(SAMPLE_ANALYSIS, facts=['Models learn from data'], sentiment={'polarity': 0.2})
+        self.assertEqual(list(stream_generator('chain_of_thought', analysis)), generate_chain_of_thought(analysis))
+        self.assertEqual(list(stream_generator('seven_hats', analysis)), generate_seven_hat_analysis(analysis))
+        streaming = {entry['name'] for entry in generator_registry.describe() if entry['streaming']}
+        self.assertEqual(streaming, {'chain_of_thought', 'seven_hats'})
+
+    def test_stream_is_lazy(self):
+        """Only the lines consumed so far are produced"""
+        lines = iter_chain_of_thought(SAMPLE_ANALYSIS)
+        self.assertEqual(next(lines), "CHAIN OF THOUGHT REASONING:")
+
+    def test_fallback_flattens_sections(self):
+        """Generators without a streaming form yield their items"""
+        lines = list(stream_generator('structured.keyterms', SAMPLE_ANALYSIS))
+        self.assertEqual(lines, [item for items in generate_keyterms(SAMPLE_ANALYSIS).values() for item in items])
+
+    def test_write_stream_and_batch(self):
+        """Lines are written to disk as text or NDJSON, one file per analysis"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cot.ndjson')
+            count = write_stream(iter_chain_of_thought(SAMPLE_ANALYSIS), path, fmt='ndjson')
+            with open(path, encoding='utf-8') as f:
+                written = [json.loads(line) for line in f]
+            self.assertEqual(written, generate_chain_of_thought(SAMPLE_ANALYSIS))
+            self.assertEqual(count, len(written))
+
+            paths = list(write_batch('chain_of_thought', [SAMPLE_ANALYSIS, {}], tmp))
+            self.assertEqual(len(paths), 2)
+            with open(paths[1], encoding='utf-8') as f:
+                self.assertEqual(f.read(), "No Chain of Thought reasoning available\n")
+            self.assertEqual([name for name in os.listdir(tmp) if name.endswith('.tmp')], [])
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Tests for lazy, level-checked and sampled generator logging"""
+
+    def setUp(self):
+        self.logger = logging.getLogger('test_generator_pipeline.instrument')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def test_disabled_events_do_no_work(self):
+        """Fields are not evaluated below the logger level"""
+        calls = []
+        Instrument(self.logger).debug("Generated {count}", count=lambda: calls.append(1) or 1)
+        self.assertEqual(calls, [])
+
+    def test_fields_and_sampling(self):
+        """Emitted events carry their fields; DEBUG/INFO are sampled, warnings never"""
+        instrument = Instrument(self.logger, sample_rate=0.25)
+        with self.assertLogs(self.logger, level='INFO') as captured:
+            for i in range(8):
+                instrument.info("Generated {count} items", count=lambda: i)
+            instrument.warning("Slow {key}", key='blooms')
+        self.assertEqual([r.getMessage() for r in captured.records],
+                         ["Generated 0 items", "Generated 4 items", "Slow blooms"])
+        self.assertEqual(captured.records[-1].data, {'key': 'blooms'})
+
+
+def _slow_generator(analysis):
+    time.sleep(0.2)
+    return ['slow']
+
+
+def _failing_generator(analysis):
+    raise RuntimeError('boom')
+
+
+async def _async_generator(analysis):
+    await asyncio.sleep(0)
+    return list(analysis['concepts'][:1])
+
+
+class TestGeneratorExecutor(unittest.TestCase):
+    """Tests for the concurrent generator stage"""
+
+    def test_runs_generators_concurrently(self):
+        """Blocking generators overlap instead of running back to back"""
+        executor = GeneratorExecutor({'a': _slow_generator, 'b': _slow_generator, 'c': _slow_generator},
+                                     timeout=5, max_workers=4)
+        start = time.perf_counter()
+        content, timings = asyncio.run(executor.run(['a', 'b', 'c'], SAMPLE_ANALYSIS))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(content, {'a': ['slow'], 'b': ['slow'], 'c': ['slow']})
+        self.assertTrue(all(t['status'] == STATUS_OK and t['mode'] == 'thread' for t in timings.values()))
+
+    def test_failures_and_timeouts_are_isolated(self):
+        """One failing or slow generator does not affect the others"""
+        executor = GeneratorExecutor({'slow': _slow_generator, 'fail': _failing_generator,
+                                      'async': _async_generator}, timeout=0.05)
+        content, timings = asyncio.run(executor.run(['slow', 'fail', 'async', 'unknown'], SAMPLE_ANALYSIS))
+        self.assertEqual(list(content), ['slow', 'fail', 'async'])
+        self.assertEqual(timings['slow']['status'], STATUS_TIMEOUT)
+        self.assertEqual(timings['fail']['status'], STATUS_ERROR)
+        self.assertEqual(content['fail'], ['Error generating content: boom'])
+        self.assertEqual(content['async'], ['machine learning'])
+        self.assertEqual(timings['async']['mode'], 'async')
+
+    def test_process_pool(self):
+        """CPU-bound generators run in the process pool"""
+        executor = GeneratorExecutor({'blooms': generate_blooms_questions}, timeout=30,
+                                     cpu_bound=['blooms'], max_workers=1)
+        content, timings = asyncio.run(executor.run(['blooms'], SAMPLE_ANALYSIS))
+        self.assertEqual(timings['blooms']['mode'], 'process')
+        self.assertEqual(content['blooms']['remember'][0], "Define machine learning in your own words.")
+
+
+    def test_dependencies_follow_missing_inputs(self):
+        """Generators wait only for fields the analysis does not already provide"""
+        keys = generator_registry.default_keys()
+        with_summary = build_dependencies(keys, GENERATOR_SPECS, {'text', 'summary'})
+        self.assertTrue(all(not deps for deps in with_summary.values()))
+        without_summary = build_dependencies(keys, GENERATOR_SPECS, {'text'})
+        self.assertEqual(without_summary['explanations'], {'summary'})
+
+        cyclic = {'a': GeneratorSpec(inputs=['y'], outputs=['x']), 'b': GeneratorSpec(inputs=['x'], outputs=['y'])}
+        self.assertEqual(build_dependencies(['a', 'b'], cyclic, ()), {'a': {'b'}, 'b': set()})
+
+    def test_dependents_start_when_inputs_ready(self):
+        """A dependent gets the upstream output; independent generators are not delayed"""
+        def produce(analysis):
+            time.sleep(0.1)
+            return ['produced']
+
+        executor = GeneratorExecutor(
+            {'source': produce, 'sink': lambda analysis: analysis['field'], 'other': _slow_generator},
+            timeout=5,
+            specs={'source': GeneratorSpec(outputs=['field']), 'sink': GeneratorSpec(inputs=['field'])}
+        )
+        content, timings = asyncio.run(executor.run(['sink', 'source', 'other'], SAMPLE_ANALYSIS))
+        self.assertEqual(content['sink'], ['produced'])
+        self.assertEqual(timings['sink']['depends_on'], ['source'])
+        self.assertGreaterEqual(timings['sink']['start_ms'], 100)
+        self.assertLess(timings['other']['start_ms'], 50)
+
+
+class TestGeneratorRegistry(unittest.TestCase):
+    """Tests for the lazy generator registry"""
+
+    def test_imports_only_on_lookup(self):
+        """Registering and listing never import the generator module"""
+        registry = GeneratorRegistry()
+        registry.register('demo', 'json:dumps', GeneratorSpec(outputs=['demo']), default=True)
+        self.assertIn('demo', registry)
+        self.assertFalse(registry.describe()[0]['loaded'])
+        self.assertEqual(registry['demo']([1]), '[1]')
+        self.assertTrue(registry.describe()[0]['loaded'])
+        with self.assertRaises(ValueError):
+            registry.register('demo', 'json:loads')
+        with self.assertRaises(KeyError):
+            registry['missing']
+
+    def test_every_generator_is_registered(self):
+        """All generator families are reachable by key"""
+        for key in ('questions', 'summary', 'chain_of_thought', 'seven_hats',
+                    'structured.socratic', 'structured.summary', 'simple.multilevel'):
+            with self.subTest(generator=key):
+                self.assertIn(key, AVAILABLE_GENERATORS)
+                self.assertTrue(AVAILABLE_GENERATORS[key](SAMPLE_ANALYSIS))
+        self.assertEqual(generator_registry.default_keys(),
+                         ['questions', 'explanations', 'practice', 'blooms', 'key_terms', 'analogies', 'summary'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,195 @@
+"""
+Kiểm tra công cụ phân tích log (tools/analyze_logs.py)
+"""
+import os
+import sys
+import gzip
+import json
+import random
+import tempfile
+import unittest
+import io
+from contextlib import redirect_stdout, redirect_stderr
+
+# Add project root and tools to path
+ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+
+from analyze_logs import (LatencySketch, LogStats, LogTailer, parse_line, expand_log_paths,
+                          analyze_files, format_report, main)
+
+JSON_LINE = json.dumps({
+    'timestamp': '2024-05-01T10:15:00.123', 'name': 'perplexity_analyzer', 'level': 'INFO',
+    'message': 'API call', 'data': {'endpoint': '/chat', 'status_code': 200, 'duration_ms': 120.5}
+})
+TEXT_LINE = "2024-05-01 10:16:00,456 - generators.executor - INFO - Generated blooms content (ok, 3.25 ms)"
+
+
+class TestLatencySketch(unittest.TestCase):
+    """Tests for the mergeable percentile sketch"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Percentiles stay within 1% of the exact values"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 1) for _ in range(20000)]
+        sketch = LatencySketch(0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q) / exact, 1.0, delta=0.011)
+        # Memory depends on the value range, not the number of values
+        self.assertLess(len(sketch.buckets), 1000)
+
+    def test_merge_equals_single_pass(self):
+        """Merging sketches of two halves gives the sketch of the whole"""
+        values = [float(i % 500) + 0.5 for i in range(3000)]
+        whole, first, second = LatencySketch(), LatencySketch(), LatencySketch()
+        for i, value in enumerate(values):
+            whole.add(value)
+            (first if i % 2 else second).add(value)
+        first.merge(second)
+        self.assertEqual(first.summary(), whole.summary())
+        self.assertEqual(LatencySketch.from_dict(json.loads(json.dumps(whole.to_dict()))).summary(),
+                         whole.summary())
+
+
+class TestLogAnalytics(unittest.TestCase):
+    """Tests for parsing and streaming aggregation of log files"""
+
+    def test_parse_both_formats(self):
+        """JSON data fields and plain-text messages yield the same event shape"""
+        record = parse_line(JSON_LINE)
+        self.assertEqual(record['event'], {'duration_ms': 120.5, 'status': '200', 'endpoint': '/chat'})
+
+        record = parse_line(TEXT_LINE)
+        self.assertEqual(record['level'], 'INFO')
+        self.assertEqual(record['timestamp'], '2024-05-01T10:16:00.456')
+        self.assertEqual(record['event'], {'duration_ms': 3.25, 'status': 'ok', 'generator': 'blooms'})
+
+        self.assertIsNone(parse_line('Traceback (most recent call last):'))
+
+    def test_rotated_and_compressed_files(self):
+        """A live log file selects its rotations, oldest first, including .gz files"""
+        with tempfile.TemporaryDirectory() as tmp:
+            base = os.path.join(tmp, 'api.log')
+            with gzip.open(base + '.2.gz', 'wt', encoding='utf-8') as f:
+                f.write(JSON_LINE + '\n')
+            with open(base + '.1', 'w', encoding='utf-8') as f:
+                f.write(TEXT_LINE + '\n  File "app.py", line 1\n')
+            with open(base, 'w', encoding='utf-8') as f:
+                f.write(JSON_LINE + '\n')
+            with open(os.path.join(tmp, 'other.log'), 'w', encoding='utf-8') as f:
+                f.write(JSON_LINE + '\n')
+
+            files = expand_log_paths([base])
+            self.assertEqual([os.path.basename(path) for path in files], ['api.log.2.gz', 'api.log.1', 'api.log'])
+
+            report = analyze_files(files).report()
+            self.assertEqual(report['records'], 3)
+            self.assertEqual(report['unparsed_lines'], 1)
+            self.assertEqual(report['latency_ms']['count'], 3)
+            self.assertEqual(set(report['latency_ms_by']['status']), {'200', 'ok'})
+            self.assertEqual(report['latency_ms_by']['generator']['blooms']['count'], 1)
+            self.assertIn('By endpoint:', format_report(report))
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(main([base, '--json']), 0)
+
+    def test_stats_merge_and_roundtrip(self):
+        """LogStats from separate files merge and survive serialization"""
+        first, second = LogStats(), LogStats()
+        first.add(parse_line(JSON_LINE))
+        second.add(parse_line(TEXT_LINE))
+        first.merge(LogStats.from_dict(json.loads(json.dumps(second.to_dict()))))
+        report = first.report()
+        self.assertEqual(report['records'], 2)
+        self.assertEqual(report['first_timestamp'], '2024-05-01T10:15:00.123')
+        self.assertEqual(report['last_timestamp'], '2024-05-01T10:16:00.456')
+
+
+class TestLogTailer(unittest.TestCase):
+    """Tests for incremental reading with persisted checkpoints"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.log = os.path.join(self.tmp.name, 'api.log')
+        self.checkpoint = os.path.join(self.tmp.name, 'state', 'logs.ckpt')
+
+    def _append(self, path, text):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_reads_only_appended_complete_lines(self):
+        """Each poll reads new complete lines; a partial line waits for its newline"""
+        self._append(self.log, JSON_LINE + '\n' + TEXT_LINE + '\n')
+        tailer = LogTailer([self.log], self.checkpoint)
+        self.assertEqual(tailer.poll().records, 2)
+
+        self._append(self.log, JSON_LINE[:20])
+        self.assertEqual(tailer.poll().records, 0)
+        self._append(self.log, JSON_LINE[20:] + '\n')
+        interval = tailer.poll()
+        self.assertEqual(interval.records, 1)
+        self.assertEqual(interval.latency.count, 1)
+        self.assertEqual(tailer.stats.records, 3)
+
+    def test_checkpoint_survives_runs_and_rotation(self):
+        """A new run resumes at the saved offset and follows a rename rotation"""
+        self._append(self.log, JSON_LINE + '\n')
+        LogTailer([self.log], self.checkpoint).poll()
+
+        # Lines written before and after a RotatingFileHandler-style rotation
+        self._append(self.log, TEXT_LINE + '\n')
+        os.rename(self.log, self.log + '.1')
+        self._append(self.log, JSON_LINE + '\n')
+
+        tailer = LogTailer([self.log], self.checkpoint)
+        interval = tailer.poll()
+        self.assertEqual(interval.records, 2)
+        self.assertEqual(tailer.stats.records, 3)
+
+        # Truncation restarts from the beginning of the file
+        with open(self.log, 'w', encoding='utf-8') as f:
+            f.write(TEXT_LINE + '\n')
+        self.assertEqual(tailer.poll().records, 1)
+
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(main([self.log, '--checkpoint', self.checkpoint, '--json']), 0)
+        self.assertEqual(LogTailer([self.log], self.checkpoint).stats.records, 4)
+
+    def test_truncate_then_rewrite_past_offset(self):
+        """A copytruncate rotation refilled beyond the saved offset is read from the start"""
+        self._append(self.log, JSON_LINE + '\n')
+        tailer = LogTailer([self.log], self.checkpoint)
+        tailer.poll()
+
+        # Same inode, now longer than the old offset, but with different content
+        with open(self.log, 'w', encoding='utf-8') as f:
+            f.write(TEXT_LINE + '\n' + TEXT_LINE + '\n')
+        with redirect_stderr(io.StringIO()) as errors:
+            interval = LogTailer([self.log], self.checkpoint).poll()
+        self.assertEqual(interval.records, 2)
+        self.assertIn('truncated and rewritten', errors.getvalue())
+
+        # Plain appends keep the fingerprint and are read incrementally
+        self._append(self.log, JSON_LINE + '\n')
+        self.assertEqual(LogTailer([self.log], self.checkpoint).poll().records, 1)
+
+    def test_follow_prints_summaries(self):
+        """Follow mode prints one summary line per period"""
+        self._append(self.log, JSON_LINE + '\n' + TEXT_LINE + '\n')
+        output = io.StringIO()
+        with redirect_stdout(output):
+            LogTailer([self.log]).follow(interval=0, summary_every=0, as_json=True, max_polls=2)
+        summaries = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([summary['records'] for summary in summaries], [2, 0])
+        self.assertEqual(summaries[0]['latency_ms']['count'], 2)
+        self.assertEqual(summaries[-1]['total_records'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
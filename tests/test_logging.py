@@ -0,0 +1,227 @@
+"""
+Kiểm tra logging backend: log queue, sinks và formatters
+"""
+import os
+import sys
+import json
+import unittest
+import tempfile
+import logging
+import datetime
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from utils.log_queue import LogQueue, BatchFileHandler, DROP_NEW, DROP_OLDEST
+from utils.enhanced_logger import setup_enhanced_logger, CustomJsonFormatter
+from utils.logger import setup_logger
+
+
+class TestLogQueue(unittest.TestCase):
+    """Tests for the non-blocking queue-based logging backend"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _logger(self, name, log_queue):
+        logger = logging.getLogger(name)
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.handlers = [log_queue.handler]
+        self.addCleanup(setattr, logger, 'handlers', [])
+        return logger
+
+    def test_records_written_by_background_thread(self):
+        """Records reach the file sink after a flush, with message arguments and tracebacks"""
+        log_queue = LogQueue(maxsize=100, batch_size=8)
+        path = os.path.join(self.tmp.name, 'queue.log')
+        sink = BatchFileHandler(path, encoding='utf-8')
+        sink.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        log_queue.add_sink(sink, 'test_logging.queue')
+        log_queue.start()
+        self.addCleanup(sink.close)
+        self.addCleanup(log_queue.stop)
+
+        logger = self._logger('test_logging.queue', log_queue)
+        other = self._logger('test_logging.other', log_queue)
+        for i in range(20):
+            logger.info("record %d", i)
+        other.info("filtered out")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        self.assertTrue(log_queue.flush())
+
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn("INFO record 19", content)
+        self.assertIn("ValueError: boom", content)
+        self.assertNotIn("filtered out", content)
+
+    def test_overflow_drops_instead_of_blocking(self):
+        """A full queue drops records and counts them; errors displace older records"""
+        log_queue = LogQueue(maxsize=3, overflow=DROP_NEW)
+        logger = self._logger('test_logging.overflow', log_queue)
+        for i in range(5):
+            logger.info("record %d", i)
+        logger.error("important")
+
+        self.assertEqual(log_queue.handler.take_dropped(), 3)
+        queued = [log_queue.queue.get_nowait().getMessage() for _ in range(3)]
+        self.assertEqual(queued, ["record 1", "record 2", "important"])
+
+        log_queue = LogQueue(maxsize=2, overflow=DROP_OLDEST)
+        logger = self._logger('test_logging.overflow_oldest', log_queue)
+        for i in range(4):
+            logger.info("record %d", i)
+        queued = [log_queue.queue.get_nowait().getMessage() for _ in range(2)]
+        self.assertEqual(queued, ["record 2", "record 3"])
+
+    def test_flush_with_stalled_listener(self):
+        """A flush that times out leaves no waiting thread behind; the marker survives overflow"""
+        import threading
+        release = threading.Event()
+
+        class StalledHandler(logging.Handler):
+            def emit(self, record):
+                release.wait(5)
+
+        log_queue = LogQueue(maxsize=2, overflow=DROP_OLDEST, batch_size=1)
+        log_queue.add_sink(StalledHandler(), 'test_logging.stalled')
+        log_queue.start()
+        self.addCleanup(log_queue.stop)
+        self.addCleanup(release.set)
+        logger = self._logger('test_logging.stalled', log_queue)
+
+        logger.info("blocks the listener")
+        threads = threading.active_count()
+        for _ in range(3):
+            self.assertFalse(log_queue.flush(timeout=0.05))
+        self.assertEqual(threading.active_count(), threads)
+
+        # Records evicted by DROP_OLDEST never take a queued marker with them
+        for i in range(5):
+            logger.info("record %d", i)
+        release.set()
+        self.assertTrue(log_queue.flush(timeout=2))
+
+    def test_stop_while_producers_overflow(self):
+        """stop() returns even when concurrent DROP_OLDEST producers keep the queue full"""
+        import threading
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+
+        for _ in range(20):
+            log_queue = LogQueue(maxsize=2, overflow=DROP_OLDEST, batch_size=1)
+            log_queue.add_sink(logging.NullHandler(), 'test_logging.flood')
+            log_queue.start()
+            logger = self._logger('test_logging.flood', log_queue)
+            done = threading.Event()
+
+            def produce():
+                while not done.is_set():
+                    logger.info("flood")
+
+            producers = [threading.Thread(target=produce, daemon=True) for _ in range(4)]
+            for producer in producers:
+                producer.start()
+            stopper = threading.Thread(target=log_queue.stop, daemon=True)
+            stopper.start()
+            stopper.join(5)
+            done.set()
+            for producer in producers:
+                producer.join(5)
+            self.assertFalse(stopper.is_alive(), "stop() lost its sentinel")
+
+    def test_evicted_sentinel_survives_racing_producer(self):
+        """A sentinel evicted by DROP_OLDEST is re-queued even if another producer took its slot"""
+        import threading
+        log_queue = LogQueue(maxsize=2, overflow=DROP_OLDEST, batch_size=1)
+        logger = self._logger('test_logging.race', log_queue)
+        rival = logging.makeLogRecord({'name': 'test_logging.race', 'msg': 'rival'})
+
+        get_nowait = log_queue.queue.get_nowait
+
+        def racing_get_nowait():
+            item = get_nowait()
+            if item is None:
+                # Another producer fills the freed slot before the sentinel is put back
+                log_queue.queue.put_nowait(rival)
+            return item
+
+        log_queue.queue.get_nowait = racing_get_nowait
+        log_queue.listener.enqueue_sentinel()
+        logger.info("fills the queue")
+        producer = threading.Thread(target=logger.info, args=("evicts the sentinel",), daemon=True)
+        producer.start()
+        producer.join(1)
+
+        log_queue.listener.start()
+        producer.join(5)
+        log_queue.listener._thread.join(5)
+        self.assertFalse(log_queue.listener._thread.is_alive(), "the stop sentinel was lost")
+
+    def test_synchronous_logger_does_not_start_queue(self):
+        """Reconfiguring a logger with use_queue=False never creates the background writer"""
+        from unittest import mock
+        import utils.log_queue
+        with mock.patch.object(utils.log_queue, '_log_queue', None):
+            for _ in range(2):
+                logger = setup_enhanced_logger('test_logging.sync', log_dir=self.tmp.name, use_queue=False)
+            self.assertIsNone(utils.log_queue.existing_log_queue())
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+
+    def test_enhanced_logger_sinks(self):
+        """The enhanced logger writes JSON to both rotating files through the queue"""
+        logger = setup_enhanced_logger('test_logging.enhanced', log_dir=self.tmp.name, use_queue=True)
+        self.addCleanup(lambda: logger.handlers.clear())
+        from utils.log_queue import get_log_queue
+        self.addCleanup(get_log_queue().remove_sinks, 'test_logging.enhanced')
+
+        logger.info("structured", extra={'data': {'key': 'value'}})
+        self.assertTrue(get_log_queue().flush())
+
+        for file_name in ('test_logging.enhanced.log', 'test_logging.enhanced_daily.log'):
+            with open(os.path.join(self.tmp.name, file_name), encoding='utf-8') as f:
+                record = json.loads(f.readline())
+            self.assertEqual(record['message'], "structured")
+            self.assertEqual(record['data'], {'key': 'value'})
+
+
+class TestLogFormatting(unittest.TestCase):
+    """Tests for format-once JSON logging and single handler chains"""
+
+    def test_record_rendered_once_for_all_sinks(self):
+        """Handlers sharing a formatter reuse the first rendering"""
+        formatter = CustomJsonFormatter()
+        calls = []
+        render = formatter.render
+        formatter.render = lambda record: calls.append(1) or render(record)
+
+        record = logging.makeLogRecord({'name': 'test', 'levelno': logging.INFO, 'levelname': 'INFO',
+                                        'msg': 'hello', 'created': 0.0})
+        texts = {formatter.format(record) for _ in range(3)}
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(texts), 1)
+
+        # The timestamp is the record's creation time, not the time of formatting
+        logged = json.loads(texts.pop())
+        self.assertEqual(logged['timestamp'], datetime.datetime.fromtimestamp(0.0).isoformat())
+
+    def test_setup_logger_single_chain(self):
+        """Repeated setup adds no handlers and records do not propagate to root handlers"""
+        logger = setup_logger('test_logging.single', use_queue=False)
+        self.addCleanup(lambda: logger.handlers.clear())
+        handlers = list(logger.handlers)
+        self.assertIs(setup_logger('test_logging.single', use_queue=False), logger)
+        self.assertEqual(logger.handlers, handlers)
+        self.assertFalse(logger.propagate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,295 @@
+"""
+Kiểm tra metrics registry, endpoint /metrics, tracing, profiler và memory accounting
+"""
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+import timeit
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from utils.metrics import MetricsRegistry, metrics, register_cache
+from utils.tracing import start_trace, span, current_trace_id
+from utils.profiler import SamplingProfiler
+from utils.memory import deep_sizeof, memory_report, allocation_tracker
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for counters, gauges, histograms and Prometheus rendering"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        """Counters only increase; labelled children are rendered sorted"""
+        calls = self.registry.counter('calls_total', 'Calls', ('outcome',))
+        calls.labels('ok').inc()
+        calls.labels('ok').inc(2)
+        calls.labels('error').inc()
+        depth = self.registry.gauge('queue_depth', 'Queue depth')
+        depth.set(5)
+        depth.dec()
+
+        text = self.registry.render()
+        self.assertIn('# TYPE calls_total counter', text)
+        self.assertIn('calls_total{outcome="ok"} 3', text)
+        self.assertLess(text.index('outcome="error"'), text.index('outcome="ok"'))
+        self.assertIn('queue_depth 4', text)
+        with self.assertRaises(ValueError):
+            calls.labels('ok', 'extra')
+        with self.assertRaises(ValueError):
+            self.registry.counter('calls_total', 'Duplicate')
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Bucket bounds are inclusive and rendered cumulatively with _sum and _count"""
+        latency = self.registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            latency.observe(value)
+
+        lines = self.registry.render().splitlines()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{le="1"} 3', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_sum 2.65', lines)
+        self.assertIn('latency_seconds_count 4', lines)
+
+    def test_cache_callbacks_read_at_scrape_time(self):
+        """Registered caches report their own counters without extra bookkeeping"""
+        stats = {'hits': 1, 'misses': 2, 'entries': 3}
+        register_cache('test_cache', lambda: stats)
+        stats['hits'] = 7
+        text = metrics.render()
+        self.assertIn('cache_hits_total{cache="test_cache"} 7', text)
+        self.assertIn('cache_entries{cache="test_cache"} 3', text)
+
+    def test_observe_overhead(self):
+        """Recording a labelled observation stays in the microsecond range"""
+        latency = self.registry.histogram('overhead_seconds', 'Overhead', ('status',))
+        per_call = min(timeit.repeat(lambda: latency.labels('200').observe(0.2), number=10000, repeat=3)) / 10000
+        self.assertLess(per_call, 2e-5)
+
+    def test_metrics_endpoint(self):
+        """GET /metrics serves the Prometheus text format, including request timings"""
+        from app import app
+        client = app.test_client()
+        client.get('/api/generators')
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        self.assertIn('http_request_duration_seconds_count{method="GET",endpoint="/api/generators",status="200"}',
+                      response.get_data(as_text=True))
+
+
+class TestTracing(unittest.TestCase):
+    """Tests for request-scoped tracing spans"""
+
+    def test_spans_nest_across_tasks(self):
+        """Spans opened in tasks created under a span become its children"""
+        async def child(name):
+            with span(name):
+                await asyncio.sleep(0)
+
+        async def request():
+            with start_trace('request') as trace:
+                with span('generators.run'):
+                    await asyncio.gather(child('a'), child('b'))
+            return trace
+
+        trace = asyncio.run(request())
+        by_name = {s.name: s for s in trace.spans}
+        self.assertEqual(by_name['a'].parent_id, by_name['generators.run'].span_id)
+        self.assertEqual(by_name['b'].parent_id, by_name['generators.run'].span_id)
+        self.assertEqual(by_name['generators.run'].parent_id, trace.root.span_id)
+        self.assertEqual({s.trace_id for s in trace.spans}, {trace.trace_id})
+        self.assertEqual([row['depth'] for row in trace.waterfall()], [0, 1, 2, 2])
+
+        # Outside a trace spans are no-ops
+        with span('untraced') as untraced:
+            untraced.set_attribute('ignored', True)
+        self.assertIsNone(current_trace_id())
+
+    def test_api_call_and_retry_spans(self):
+        """Each _call_api_with_retry call is a span with one child span per attempt"""
+        from analyzers.perplexity_analyzer import PerplexityAnalyzer
+        analyzer = PerplexityAnalyzer()
+
+        async def request():
+            with start_trace('request') as trace:
+                with mock.patch.object(analyzer, '_call_api', mock.AsyncMock(side_effect=[None, 'answer'])), \
+                        mock.patch('analyzers.perplexity_analyzer.asyncio.sleep', mock.AsyncMock()):
+                    result = await analyzer._call_api_with_retry(None, 'prompt', operation='summary')
+            return trace, result
+
+        trace, result = asyncio.run(request())
+        self.assertEqual(result, 'answer')
+        call = next(s for s in trace.spans if s.name == 'perplexity.call')
+        attempts = [s for s in trace.spans if s.name == 'perplexity.attempt']
+        self.assertEqual(call.attributes, {'operation': 'summary', 'retries': 1})
+        self.assertEqual([s.attributes['attempt'] for s in attempts], [1, 2])
+        self.assertTrue(all(s.parent_id == call.span_id for s in attempts))
+
+    def test_export_otlp_json(self):
+        """Finished traces are exported in the OTLP/JSON layout"""
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                with start_trace('request', export_dir=tmp) as trace:
+                    with span('step', count=3):
+                        raise ValueError('boom')
+            except ValueError:
+                pass
+            with open(os.path.join(tmp, f"{trace.trace_id}.json"), encoding='utf-8') as f:
+                exported = json.load(f)
+
+        spans = exported['resourceSpans'][0]['scopeSpans'][0]['spans']
+        self.assertEqual([s['name'] for s in spans], ['request', 'step'])
+        self.assertEqual(spans[1]['parentSpanId'], spans[0]['spanId'])
+        self.assertEqual(spans[1]['status'], {'code': 2})
+        self.assertIn({'key': 'count', 'value': {'intValue': '3'}}, spans[1]['attributes'])
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+class TestProfiler(unittest.TestCase):
+    """Tests for the opt-in sampling profiler"""
+
+    def test_folded_stacks(self):
+        """Samples of a busy thread are written as 'thread;outer;...;inner count' lines"""
+        import threading
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,), name='busy-worker')
+        worker.start()
+        try:
+            with SamplingProfiler(interval=0.001) as profiler:
+                while profiler.samples < 20:
+                    stop.wait(0.01)
+        finally:
+            stop.set()
+            worker.join()
+
+        busy = [line for line in profiler.to_folded().splitlines() if line.startswith('busy-worker;')]
+        self.assertTrue(busy)
+        stack, count = busy[0].rsplit(' ', 1)
+        self.assertGreater(int(count), 0)
+        self.assertIn('_busy_loop (test_metrics.py:', stack)
+        self.assertNotIn('sampling-profiler', profiler.to_folded())
+        self.assertTrue(any('_busy_loop' in frame or '<genexpr>' in frame
+                            for frame, _ in profiler.top_frames()))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = profiler.write(tmp, 'POST-/analyze')
+            self.assertTrue(path.endswith('-POST-_analyze.folded'))
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), profiler.to_folded())
+
+    def test_request_header_and_admin_endpoint(self):
+        """X-Profile profiles one request; both surfaces are off unless enabled"""
+        from app import app
+        from config import Config
+        client = app.test_client()
+        with tempfile.TemporaryDirectory() as tmp:
+            response = client.get('/api/generators', headers={'X-Profile': '1'})
+            self.assertNotIn('X-Profile-File', response.headers)
+            self.assertEqual(client.post('/api/profile').status_code, 404)
+
+            with mock.patch.object(Config, 'PROFILING_ENABLED', True), \
+                    mock.patch.object(Config, 'PROFILE_DIR', tmp):
+                response = client.get('/api/generators', headers={'X-Profile': '1'})
+                self.assertTrue(os.path.exists(response.headers['X-Profile-File']))
+                self.assertEqual(client.post('/api/profile?seconds=0').status_code, 400)
+                data = client.post('/api/profile?seconds=0.05').get_json()
+                self.assertTrue(os.path.exists(data['file']))
+                self.assertGreater(data['samples'], 0)
+
+                # A streamed response is profiled until its body has been sent
+                analysis = {'text': 'Machine learning uses data to train a model.',
+                            'concepts': ['machine learning', 'data', 'model'], 'context': 'technology'}
+                response = client.post('/api/generators/chain_of_thought/stream', headers={'X-Profile': '1'},
+                                       json={'analysis': analysis})
+                path = response.headers['X-Profile-File']
+                self.assertFalse(os.path.exists(path))
+                self.assertTrue(response.get_data())
+                response.close()
+                self.assertTrue(os.path.exists(path))
+
+
+class TestMemoryAccounting(unittest.TestCase):
+    """Tests for per-component memory reports and tracemalloc diffs"""
+
+    def test_components_and_live_objects(self):
+        """Caches report their entry sizes; tracked objects disappear once collected"""
+        import gc
+        from analyzers.profile_cache import ProfileCache
+        import generators.memo  # noqa: F401 - registers its cache
+        from generators.results import GeneratedContent
+
+        cache = ProfileCache(max_entries=10)
+        empty = cache.memory_report()['bytes']
+        cache.set('key', {'items': ['x' * 1000]})
+        self.assertGreater(cache.memory_report()['bytes'] - empty, 1000)
+        # Shared objects are counted once
+        shared = 'x' * 500
+        self.assertLess(deep_sizeof([shared, shared]), deep_sizeof([shared, 'y' * 500]))
+
+        # Compact results are only tracked while memory debugging is on
+        live_count = lambda: memory_report()['live_objects'].get('generated_content', {}).get('count', 0)
+        before = live_count()
+        untracked = GeneratedContent.from_dict({'remember': ['Not counted']})
+        self.assertEqual(live_count(), before)
+        with mock.patch('generators.results.Config.MEMORY_DEBUG_ENABLED', True):
+            content = GeneratedContent.from_dict({'remember': ['Define a term', 'List examples']})
+        report = memory_report()
+        self.assertIn('cache.generator_memo', report['components'])
+        self.assertGreaterEqual(report['live_objects']['generated_content']['count'], 1)
+        self.assertGreaterEqual(report['live_objects']['generated_content']['bytes'], content.nbytes())
+
+        before = report['live_objects']['generated_content']['count']
+        del content
+        gc.collect()
+        self.assertEqual(memory_report()['live_objects']['generated_content']['count'], before - 1)
+
+    def test_allocation_diff(self):
+        """Allocations made after the baseline are attributed to their source line"""
+        allocation_tracker.snapshot(frames=5)
+        try:
+            retained = [bytearray(10000) for _ in range(50)]
+            rows = allocation_tracker.diff(limit=5)
+        finally:
+            allocation_tracker.stop()
+        self.assertTrue(any('test_metrics.py' in row['location'][0] and row['size_diff'] >= 500000
+                            for row in rows))
+        self.assertEqual(len(retained), 50)
+        with self.assertRaises(RuntimeError):
+            allocation_tracker.diff()
+
+    def test_memory_endpoints(self):
+        """The memory endpoints are off unless enabled, then report and diff"""
+        from app import app
+        from config import Config
+        client = app.test_client()
+        self.assertEqual(client.get('/api/memory').status_code, 404)
+        with mock.patch.object(Config, 'MEMORY_DEBUG_ENABLED', True):
+            report = client.get('/api/memory').get_json()
+            # The request reading the report is itself in flight
+            self.assertEqual(report['inflight_requests']['count'], 1)
+            self.assertEqual(report['inflight_requests']['oldest'][0]['path'], '/api/memory')
+            self.assertEqual(client.get('/api/memory/diff').status_code, 409)
+            try:
+                self.assertTrue(client.post('/api/memory/snapshot').get_json()['tracing'])
+                response = client.get('/api/memory/diff?limit=3')
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(response.get_json()['diff']), 3)
+                self.assertEqual(client.get('/api/memory/diff?group_by=module').status_code, 400)
+            finally:
+                self.assertFalse(client.delete('/api/memory/snapshot').get_json()['tracing'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -519,6 +519,151 @@ class TestPerformance(unittest.TestCase):
         }
         
         self.save_results(memory_results, "memory_benchmark")
+    
+    def test_benchmark_sanitize_text(self):
+        """Micro-benchmark sanitize: translate table vs. vòng lặp ký tự cũ"""
+        import re
+        from analyzers.sanitizer import TextSanitizer, WHITESPACE_DROP
+        
+        def legacy_sanitize(text):
+            text = re.sub(r'[<>]', '', text)
+            text = ''.join(char for char in text if ord(char) >= 32)
+            return text.strip()
+        
+        sanitizer = TextSanitizer(WHITESPACE_DROP, strip_c1=False)
+        chunk = SAMPLE_TEXT_LONG + "<script>\x00\x07</script>\t"
+        results = {}
+        
+        for size_mb in (1, 4):
+            text = chunk * (size_mb * 1024 * 1024 // len(chunk))
+            
+            start_time = time.perf_counter()
+            legacy_result = legacy_sanitize(text)
+            legacy_time = time.perf_counter() - start_time
+            
+            start_time = time.perf_counter()
+            fast_result = sanitizer.sanitize(text)
+            fast_time = time.perf_counter() - start_time
+            
+            self.assertEqual(fast_result, legacy_result, "Kết quả sanitize phải giống cách cũ")
+            
+            results[f"{size_mb}mb"] = {
+                "text_length": len(text),
+                "legacy_time": legacy_time,
+                "translate_time": fast_time,
+                "legacy_mb_per_s": size_mb / legacy_time if legacy_time > 0 else None,
+                "translate_mb_per_s": size_mb / fast_time if fast_time > 0 else None,
+                "speedup": legacy_time / fast_time if fast_time > 0 else None
+            }
+            logger.info(f"Sanitize {size_mb}MB - legacy: {legacy_time:.3f}s, translate: {fast_time:.3f}s")
+        
+        self.save_results(results, "sanitize_benchmark")
+    
+    def test_benchmark_compact_results(self):
+        """So sánh bộ nhớ và thời gian serialize: dict-of-lists vs. GeneratedContent"""
+        import tracemalloc
+        from generators.blooms import generator as blooms_generator
+        from generators.memo import generator_memo
+        
+        analyses = [
+            {'concepts': [f"concept {i} {j}" for j in range(50)], 'context': 'science'}
+            for i in range(500)
+        ]
+        results = {}
+        
+        for compact in (False, True):
+            generator_memo.clear()
+            tracemalloc.start()
+            batch = blooms_generator.generate_many(analyses, compact=compact)
+            # Only count what the batch itself keeps alive, not the memo cache
+            generator_memo.clear()
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            
+            start_time = time.perf_counter()
+            if compact:
+                payload = '[' + ','.join(result.to_json() for result in batch) + ']'
+            else:
+                payload = json.dumps(batch, ensure_ascii=False, separators=(',', ':'))
+            serialize_time = time.perf_counter() - start_time
+            
+            results["compact" if compact else "dict"] = {
+                "memory_bytes": memory,
+                "serialize_time": serialize_time,
+                "payload_length": len(payload)
+            }
+            del batch
+        
+        self.assertEqual(results["compact"]["payload_length"], results["dict"]["payload_length"])
+        self.assertLess(results["compact"]["memory_bytes"], results["dict"]["memory_bytes"])
+        logger.info(f"Compact results: {results}")
+        self.save_results(results, "compact_results_benchmark")
+
+
+class TestRealApiPath(unittest.TestCase):
+    """Benchmark the real _call_api path against the local fake Perplexity server"""
+    
+    save_results = TestPerformance.save_results
+    
+    @classmethod
+    def setUpClass(cls):
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tools'))
+    
+    def test_fake_server_faults(self):
+        """The fake server answers like the real API and injects 401, 429 and 500 responses"""
+        import aiohttp
+        from mocks.fake_perplexity_server import FakePerplexityServer, LatencyModel
+        from bench_api import make_analyzer
+        
+        self.assertEqual(str(LatencyModel.parse('lognormal:300:0.5')), 'lognormal:300:0.5')
+        with self.assertRaises(ValueError):
+            LatencyModel.parse('gamma:1')
+        
+        async def scenario(server):
+            analyzer = make_analyzer(server.url)
+            async with aiohttp.ClientSession() as session:
+                ok = await analyzer._call_api(session, "Generate 5 Socratic questions about gravity and orbits")
+                server.rate_limit_rate = 1.0
+                limited = await analyzer._call_api(session, "Any prompt")
+                server.rate_limit_rate, server.error_rate = 0.0, 1.0
+                failed = await analyzer._call_api(session, "Any prompt")
+                server.error_rate = 0.0
+                analyzer.api_key = 'invalid'
+                unauthorized = await analyzer._call_api(session, "Any prompt")
+                async with session.post(server.url, json={'stream': True, 'messages': [{'content': 'Explain orbits'}]},
+                                        headers={'Authorization': 'Bearer pplx-test'}) as response:
+                    events = [line for line in (await response.text()).split('\n\n') if line]
+            return ok, limited, failed, unauthorized, events
+        
+        server = FakePerplexityServer(latency='fixed:1')
+        with server.serve_in_thread():
+            ok, limited, failed, unauthorized, events = asyncio.run(scenario(server))
+        
+        self.assertTrue(ok.startswith('1. '))
+        self.assertEqual((limited, failed, unauthorized), (None, None, None))
+        self.assertEqual(server.stats()['status_counts'], {'200': 2, '401': 1, '429': 1, '500': 1})
+        self.assertEqual(events[-1], 'data: [DONE]')
+        self.assertGreater(len(events), 2)
+    
+    def test_benchmark_real_api_path(self):
+        """Concurrency, pooling, retry and cache scenarios over real HTTP"""
+        from bench_api import run_benchmark
+        
+        report = run_benchmark(latency='fixed:5', calls=20, levels=(1, 8), concurrency=8)
+        results = report['results']
+        
+        serial, parallel = results['concurrency']
+        self.assertEqual((serial['failures'], parallel['failures']), (0, 0))
+        self.assertGreater(parallel['throughput_per_s'], serial['throughput_per_s'])
+        self.assertEqual(serial['server']['peak_in_flight'], 1)
+        # A shared session reuses keep-alive connections
+        self.assertLess(results['pooling']['shared_session']['server']['connections'],
+                        results['pooling']['session_per_call']['server']['connections'])
+        self.assertGreaterEqual(results['retry']['attempts_per_call'], 1.0)
+        self.assertEqual(results['cache']['runs'][0]['api_calls'], 8)
+        
+        logger.info(f"Real API path benchmark: {json.dumps(results)}")
+        self.save_results(report, "benchmark_real_api")
 
 if __name__ == '__main__':
     unittest.main(verbosity=2) 
\ No newline at end of file
@@ -0,0 +1,288 @@
+"""
+Kiểm tra các thành phần xử lý văn bản cục bộ (không cần spaCy hay API)
+"""
+import os
+import sys
+import unittest
+import logging
+import tempfile
+import asyncio
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('test_text_processing')
+
+from analyzers.text_stats import (
+    text_statistics, batch_text_statistics, compute_statistics,
+    token_offsets, statistics_from_offsets, STAT_FIELDS
+)
+from analyzers.sanitizer import (
+    TextSanitizer, WHITESPACE_KEEP, WHITESPACE_NEWLINES, WHITESPACE_COLLAPSE, WHITESPACE_DROP
+)
+from analyzers.profile_cache import ProfileCache
+from analyzers.domain_classifier import DomainClassifier
+from analyzers.concept_ranker import rank_phrases, rank_sentences
+from analyzers.perplexity_analyzer import PerplexityAnalyzer
+from config import Config
+
+SAMPLE_TEXT = "The cat sat on the mat. The Cat was happy! Pi is 3.14 roughly"
+
+
+class TestTextStatistics(unittest.TestCase):
+    """Tests for the vectorized text statistics engine"""
+
+    def test_counts(self):
+        """Word, sentence and unique counts match a hand count"""
+        stats = text_statistics(SAMPLE_TEXT)
+        self.assertEqual(stats['word_count'], 15)
+        self.assertEqual(stats['sentence_count'], 3)
+        # "the"/"The" and "cat"/"Cat" fold together; "3.14" does not split a sentence
+        self.assertEqual(stats['unique_words'], 12)
+        self.assertAlmostEqual(stats['type_token_ratio'], 12 / 15)
+        self.assertEqual(stats['avg_word_length'], 3.0)
+
+    def test_empty_text(self):
+        """Empty text yields zeros instead of division errors"""
+        stats = text_statistics("")
+        self.assertEqual(set(stats), set(STAT_FIELDS))
+        self.assertTrue(all(value == 0 for value in stats.values()))
+
+    def test_batch_matches_single(self):
+        """Batch computation gives the same numbers as one-by-one computation"""
+        texts = ["Hello world", "", "A table. Another one", SAMPLE_TEXT]
+        batch = batch_text_statistics(texts)
+        self.assertEqual(len(batch), len(texts))
+        for text, row in zip(texts, batch):
+            with self.subTest(text=text):
+                self.assertEqual(row, text_statistics(text))
+
+    def test_documents_do_not_share_sentences(self):
+        """A document without terminal punctuation does not merge into the next one"""
+        columns = compute_statistics(["no punctuation here", "Next doc. Two sentences."])
+        self.assertEqual(list(columns['sentence_count']), [1, 2])
+
+    def test_readability_ordering(self):
+        """Simple text scores as easier to read than polysyllabic text"""
+        easy = text_statistics("The dog ran. The cat sat. We had fun.")
+        hard = text_statistics(
+            "Institutional interoperability necessitates comprehensive organizational "
+            "standardization and considerable administrative coordination."
+        )
+        self.assertGreater(easy['flesch_reading_ease'], hard['flesch_reading_ease'])
+        self.assertLess(easy['flesch_kincaid_grade'], hard['flesch_kincaid_grade'])
+
+    def test_statistics_from_offsets(self):
+        """External offsets and sentence starts are honoured"""
+        text = "Hi there. Bob"
+        starts, ends = token_offsets(text)
+        self.assertEqual(list(starts), [0, 3, 10])
+        self.assertEqual(list(ends), [2, 8, 13])
+        stats = statistics_from_offsets(text, starts, ends, [0, 10])
+        self.assertEqual(stats['word_count'], 3)
+        self.assertEqual(stats['sentence_count'], 2)
+
+
+class TestTextSanitizer(unittest.TestCase):
+    """Tests for the translate-table sanitizer"""
+
+    RAW = "  <b>Line one</b>\r\nLine\ttwo\x00\x07\x85 end\x7f  "
+
+    def test_keep_policy(self):
+        """Markup and control characters go, tabs and newlines stay"""
+        result = TextSanitizer(WHITESPACE_KEEP).sanitize(self.RAW)
+        self.assertEqual(result, "bLine one/b\r\nLine\ttwo end")
+
+    def test_newlines_policy(self):
+        """Line endings are normalized and tabs become spaces"""
+        result = TextSanitizer(WHITESPACE_NEWLINES).sanitize(self.RAW)
+        self.assertEqual(result, "bLine one/b\nLine two end")
+
+    def test_collapse_policy(self):
+        """Whitespace runs collapse to single spaces"""
+        result = TextSanitizer(WHITESPACE_COLLAPSE).sanitize(self.RAW)
+        self.assertEqual(result, "bLine one/b Line two end")
+
+    def test_drop_policy_matches_legacy(self):
+        """The drop policy reproduces the original character-by-character filter"""
+        import re
+        legacy = ''.join(c for c in re.sub(r'[<>]', '', self.RAW) if ord(c) >= 32).strip()
+        result = TextSanitizer(WHITESPACE_DROP, strip_c1=False).sanitize(self.RAW)
+        self.assertEqual(result, legacy.replace('\x7f', ''))
+
+    def test_ascii_and_unicode_paths_agree(self):
+        """Adding a non-ASCII character does not change how the rest of the text is cleaned"""
+        raw = "a\t\tb\x0b\x0cc\r\n\r\nd <e>\x00\x01f  \t g"
+        for policy in (WHITESPACE_KEEP, WHITESPACE_NEWLINES, WHITESPACE_COLLAPSE, WHITESPACE_DROP):
+            with self.subTest(policy=policy):
+                sanitizer = TextSanitizer(policy)
+                self.assertEqual(sanitizer.sanitize(raw + 'é'), sanitizer.sanitize(raw) + 'é')
+        self.assertEqual(TextSanitizer(WHITESPACE_NEWLINES).sanitize('a\t\tbé'), 'a  bé')
+
+    def test_unknown_policy(self):
+        """Unknown policies are rejected"""
+        with self.assertRaises(ValueError):
+            TextSanitizer('squash')
+
+
+
+class TestProfileCache(unittest.TestCase):
+    """Tests for the analysis profile cache"""
+
+    def test_key_depends_on_text_and_salt(self):
+        """Keys change with content and with the salt values"""
+        key = ProfileCache.make_key(SAMPLE_TEXT, 'en_core_web_sm', 1)
+        self.assertEqual(key, ProfileCache.make_key(SAMPLE_TEXT, 'en_core_web_sm', 1))
+        self.assertNotEqual(key, ProfileCache.make_key(SAMPLE_TEXT + ' ', 'en_core_web_sm', 1))
+        self.assertNotEqual(key, ProfileCache.make_key(SAMPLE_TEXT, 'en_core_web_sm', 2))
+
+    def test_lru_eviction(self):
+        """The least recently used profile is evicted first"""
+        cache = ProfileCache(max_entries=2)
+        cache.set('a', {'n': 1})
+        cache.set('b', {'n': 2})
+        self.assertEqual(cache.get('a'), {'n': 1})
+        cache.set('c', {'n': 3})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_disk_persistence(self):
+        """Persisted profiles survive a new cache instance"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ProfileCache(cache_dir=cache_dir).set('key', {'themes': ['một', 'two']})
+            fresh = ProfileCache(cache_dir=cache_dir)
+            self.assertEqual(fresh.get('key'), {'themes': ['một', 'two']})
+            fresh.clear(disk=True)
+            self.assertIsNone(fresh.get('key'))
+
+
+
+class TestDomainClassifier(unittest.TestCase):
+    """Tests for the Aho-Corasick domain classifier"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.classifier = DomainClassifier.from_file(Config.DOMAIN_LEXICON_PATH)
+
+    def legacy_scores(self, words):
+        """Substring scoring used by the original extract_context"""
+        import json
+        with open(Config.DOMAIN_LEXICON_PATH, encoding='utf-8') as f:
+            lexicon = json.load(f)
+        return {domain: sum(1 for word in words if any(kw in word for kw in keywords))
+                for domain, keywords in lexicon.items()}
+
+    def test_matches_legacy_scoring(self):
+        """Scores equal the original nested any() loop"""
+        words = ["elearning", "methods", "dataset", "patients", "marketplace", "theory", "cat"]
+        self.assertEqual(self.classifier.score(words), self.legacy_scores(words))
+
+    def test_classify(self):
+        """Best domain wins, ties go to the first domain, no match gives the default"""
+        self.assertEqual(self.classifier.classify(["software", "network", "customer"]), "technology")
+        # "method" belongs to education and science; education is listed first
+        self.assertEqual(self.classifier.classify(["method"]), "education")
+        self.assertEqual(self.classifier.classify(["cat", "mat"]), "general topic")
+
+    def test_overlapping_keywords(self):
+        """Keywords that are suffixes of other keywords are found through failure links"""
+        classifier = DomainClassifier({"a": ["she", "he"], "b": ["hers"], "c": ["his"]})
+        self.assertEqual(classifier.score(["ushers"]), {"a": 1, "b": 1, "c": 0})
+        self.assertEqual(classifier.score(["ushers"], weights=[3]), {"a": 3, "b": 3, "c": 0})
+
+    def test_large_lexicon(self):
+        """Hundreds of domains and thousands of keywords compile and score correctly"""
+        lexicon = {f"domain{d}": [f"kw{d}x{k}" for k in range(20)] for d in range(300)}
+        classifier = DomainClassifier(lexicon)
+        scores = classifier.score(["kw299x19", "zzkw7x3zz", "kw299x0"])
+        self.assertEqual(scores["domain299"], 2)
+        self.assertEqual(scores["domain7"], 1)
+        self.assertEqual(sum(scores.values()), 3)
+
+
+
+class TestConceptRanking(unittest.TestCase):
+    """Tests for local concept ranking and hybrid extraction"""
+
+    SENTENCES = [
+        ['machine learning', 'data'],
+        ['data', 'model', 'machine learning'],
+        ['cat'],
+        ['model', 'training data', 'data'],
+    ]
+
+    def test_textrank_prefers_central_phrases(self):
+        """Phrases connected to many others rank above isolated ones"""
+        ranked = rank_phrases(self.SENTENCES)
+        self.assertEqual(ranked[0], ('data', 1.0))
+        self.assertEqual(ranked[-1][0], 'cat')
+        self.assertEqual([p for p, w in ranked], sorted([p for p, w in ranked], key=lambda p: -dict(ranked)[p]))
+
+    def test_tfidf_and_limits(self):
+        """TF-IDF ranking, top_n and empty input"""
+        ranked = rank_phrases(self.SENTENCES, top_n=2, method='tfidf')
+        self.assertEqual(len(ranked), 2)
+        self.assertEqual(ranked[0][0], 'data')
+        self.assertEqual(rank_phrases([]), [])
+        with self.assertRaises(ValueError):
+            rank_phrases(self.SENTENCES, method='bm25')
+
+    def test_rank_sentences(self):
+        """Theme sentences come back in document order"""
+        weights = dict(rank_phrases(self.SENTENCES))
+        self.assertEqual(rank_sentences(self.SENTENCES, weights, top_n=2), [1, 3])
+
+    def test_hybrid_mode_uses_local_concepts(self):
+        """Hybrid mode fills concepts, themes and entities from local NLP"""
+        insights = {
+            'key_concepts': ['machine learning', 'data'],
+            'concept_weights': [{'text': 'machine learning', 'weight': 1.0}],
+            'themes': ['Machine learning needs data.'],
+            'entities': ['Alan Turing']
+        }
+        local_analyzer = mock.MagicMock()
+        local_analyzer.profile.return_value = {'insights': insights}
+
+        generated = {name: mock.AsyncMock(return_value=['generated']) for name in (
+            '_generate_questions', '_generate_explanations', '_generate_practice_questions',
+            '_generate_key_terms', '_generate_summary', '_generate_blooms_questions', '_generate_analogies')}
+        extract_remote = mock.AsyncMock()
+
+        with mock.patch.object(Config, 'DEVELOPMENT_MODE', False), \
+             mock.patch.dict(os.environ, {'PERPLEXITY_API_KEY': 'pplx-test'}), \
+             mock.patch.object(Config, 'ANALYSIS_MODE', 'hybrid'), \
+             mock.patch('analyzers.perplexity_analyzer._load_text_analyzer', return_value=local_analyzer), \
+             mock.patch.multiple(PerplexityAnalyzer, _extract_concepts_and_entities=extract_remote, **generated):
+            result = asyncio.run(PerplexityAnalyzer().analyze("Machine learning needs data."))
+
+        extract_remote.assert_not_called()
+        self.assertEqual(result['key_concepts'], insights['key_concepts'])
+        self.assertEqual(result['entities'], insights['entities'])
+        self.assertEqual(result['concept_weights'], insights['concept_weights'])
+        local_analyzer.profile.assert_called_once_with("Machine learning needs data.")
+
+        # Results are copies: changing them leaves the cached profile intact
+        result['key_concepts'].append('mutated')
+        result['concept_weights'][0]['weight'] = 0.0
+        self.assertEqual(insights['key_concepts'], ['machine learning', 'data'])
+        self.assertEqual(insights['concept_weights'][0]['weight'], 1.0)
+
+    def test_mock_mode_keeps_canned_results(self):
+        """Without the API, hybrid mode does not load spaCy or replace the canned concepts"""
+        with mock.patch.object(Config, 'DEVELOPMENT_MODE', True), \
+             mock.patch.object(Config, 'ANALYSIS_MODE', 'hybrid'), \
+             mock.patch('analyzers.perplexity_analyzer._load_text_analyzer') as load:
+            result = asyncio.run(PerplexityAnalyzer().analyze("Machine learning needs data."))
+
+        load.assert_not_called()
+        self.assertEqual(result['key_concepts'], ["concept 1", "concept 2", "concept 3"])
+        self.assertNotIn('concept_weights', result)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
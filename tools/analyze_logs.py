@@ -1,61 +1,687 @@
 #!/usr/bin/env python3
+"""
+Streaming log analytics
+
+Reads log files line by line, including rotated (``api.log.1``,
+``api_daily.log.2024-05-01``) and compressed (``.gz``) files, and keeps only
+running aggregates: record counts by level and logger, and latency sketches
+by endpoint, status and generator. Memory does not grow with the number of
+records, and aggregates from several runs or files can be merged.
+
+Both log formats are understood: JSON lines from CustomJsonFormatter
+(latency fields in ``data``) and the plain-text format of utils/logger.py
+(latency parsed from the API call and generator messages).
+
+With ``--checkpoint`` the byte offset and inode of every live file are saved
+together with the aggregates, so the next run only reads what was appended
+since (following rotations and truncation). ``--follow`` keeps polling and
+prints a summary of the latest interval periodically.
+
+Usage:
+    python tools/analyze_logs.py logs/api.log            # the file and its rotations
+    python tools/analyze_logs.py logs/*.log --json
+    python tools/analyze_logs.py logs/*.log --checkpoint cache/logs.ckpt           # incremental
+    python tools/analyze_logs.py logs/*.log --checkpoint cache/logs.ckpt --follow  # live
+"""
+import argparse
+import bz2
+import glob
+import gzip
+import hashlib
 import json
-import sys
+import math
 import os
-import pandas as pd
+import re
+import sys
+import tempfile
+import time
 from datetime import datetime
-import matplotlib.pyplot as plt
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+PERCENTILES = (50, 95, 99)
+
+# Plain-text format of utils/logger.py: '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+TEXT_RECORD = re.compile(
+    r'^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:,\d{3})?) - (?P<name>.+?) - '
+    r'(?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL) - (?P<message>.*)$'
+)
+
+# Latency events in plain-text messages (see PerplexityAnalyzer._call_api and GeneratorExecutor._run_one)
+TEXT_EVENTS = (
+    re.compile(r'API call to (?P<endpoint>\S+): (?P<status>\S+) in (?P<duration_ms>[\d.]+) ms'),
+    re.compile(r'Generated (?P<generator>\S+) content \((?P<status>\w+), (?P<duration_ms>[\d.]+) ms\)'),
+)
+
+# Rotation suffixes: RotatingFileHandler (.1, .2, ...) and TimedRotatingFileHandler (.2024-05-01)
+ROTATION_SUFFIX = re.compile(r'\.(?:(?P<number>\d+)|(?P<date>\d{4}-\d{2}-\d{2}(?:_\d{2}(?:-\d{2}){0,2})?))$')
+COMPRESSION_SUFFIXES = ('.gz', '.bz2')
+
+
+class LatencySketch:
+    """
+    Mergeable quantile sketch with bounded relative error (DDSketch-style)
+
+    Values are counted in logarithmic buckets whose width is set by
+    ``relative_accuracy``: a reported quantile is within that fraction of the
+    true value. Memory depends on the range of values, not their number, and
+    two sketches with the same accuracy are merged by adding bucket counts.
+    """
+
+    __slots__ = ('relative_accuracy', 'gamma', '_log_gamma', 'buckets', 'zero_count', 'count', 'total', 'min', 'max')
+
+    # Values at or below this (in ms) are counted as zero
+    MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= self.MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: 'LatencySketch') -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` (0 to 1), or None if the sketch is empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        result = {'count': self.count}
+        if self.count:
+            result['mean'] = round(self.total / self.count, 3)
+            result['min'] = round(self.min, 3)
+            result['max'] = round(self.max, 3)
+            for p in PERCENTILES:
+                result[f'p{p}'] = round(self.quantile(p / 100), 3)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'buckets': {str(index): count for index, count in self.buckets.items()},
+            'zero_count': self.zero_count, 'count': self.count, 'total': self.total,
+            'min': self.min if self.count else None, 'max': self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencySketch':
+        sketch = cls(data['relative_accuracy'])
+        sketch.buckets = {int(index): count for index, count in data['buckets'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.total = data['total']
+        if sketch.count:
+            sketch.min, sketch.max = data['min'], data['max']
+        return sketch
+
+
+class LogStats:
+    """Running aggregates over log records"""
+
+    # Latency breakdowns: name -> record field holding the group
+    DIMENSIONS = ('endpoint', 'status', 'generator')
+
+    def __init__(self):
+        self.records = 0
+        self.unparsed = 0
+        self.levels: Dict[str, int] = {}
+        self.loggers: Dict[str, int] = {}
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+        self.latency = LatencySketch()
+        self.breakdown: Dict[str, Dict[str, LatencySketch]] = {dimension: {} for dimension in self.DIMENSIONS}
+        # Hourly (sum, count) of latencies, for the optional chart
+        self.hourly: Dict[str, List[float]] = {}
+
+    def add(self, record: Optional[Dict[str, Any]]) -> None:
+        """Add one parsed record (None counts as an unparsed line)"""
+        if record is None:
+            self.unparsed += 1
+            return
+        self.records += 1
+        level = record.get('level') or 'UNKNOWN'
+        self.levels[level] = self.levels.get(level, 0) + 1
+        name = record.get('name') or 'unknown'
+        self.loggers[name] = self.loggers.get(name, 0) + 1
+
+        timestamp = record.get('timestamp')
+        if timestamp:
+            if self.first_timestamp is None or timestamp < self.first_timestamp:
+                self.first_timestamp = timestamp
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+
+        event = record.get('event')
+        if event is None:
+            return
+        duration = event['duration_ms']
+        self.latency.add(duration)
+        for dimension in self.DIMENSIONS:
+            group = event.get(dimension)
+            if group is not None:
+                sketches = self.breakdown[dimension]
+                sketch = sketches.get(group)
+                if sketch is None:
+                    sketch = sketches[group] = LatencySketch()
+                sketch.add(duration)
+        if timestamp:
+            hour = self.hourly.setdefault(timestamp[:13], [0.0, 0])
+            hour[0] += duration
+            hour[1] += 1
+
+    def merge(self, other: 'LogStats') -> None:
+        """Add the aggregates of another LogStats (e.g. from another file or process)"""
+        self.records += other.records
+        self.unparsed += other.unparsed
+        for counts, other_counts in ((self.levels, other.levels), (self.loggers, other.loggers)):
+            for key, count in other_counts.items():
+                counts[key] = counts.get(key, 0) + count
+        for timestamp in (other.first_timestamp, other.last_timestamp):
+            if timestamp:
+                self.first_timestamp = min(filter(None, (self.first_timestamp, timestamp)))
+                self.last_timestamp = max(filter(None, (self.last_timestamp, timestamp)))
+        self.latency.merge(other.latency)
+        for dimension, sketches in other.breakdown.items():
+            for group, sketch in sketches.items():
+                self.breakdown[dimension].setdefault(group, LatencySketch()).merge(sketch)
+        for hour, (total, count) in other.hourly.items():
+            current = self.hourly.setdefault(hour, [0.0, 0])
+            current[0] += total
+            current[1] += count
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'records': self.records,
+            'unparsed_lines': self.unparsed,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'levels': dict(sorted(self.levels.items())),
+            'loggers': dict(sorted(self.loggers.items(), key=lambda item: -item[1])),
+            'latency_ms': self.latency.summary(),
+            'latency_ms_by': {
+                dimension: {group: sketch.summary() for group, sketch in sorted(sketches.items())}
+                for dimension, sketches in self.breakdown.items() if sketches
+            }
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state, restored with from_dict"""
+        return {
+            'records': self.records, 'unparsed': self.unparsed,
+            'levels': self.levels, 'loggers': self.loggers,
+            'first_timestamp': self.first_timestamp, 'last_timestamp': self.last_timestamp,
+            'latency': self.latency.to_dict(),
+            'breakdown': {dimension: {group: sketch.to_dict() for group, sketch in sketches.items()}
+                          for dimension, sketches in self.breakdown.items()},
+            'hourly': self.hourly
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LogStats':
+        stats = cls()
+        stats.records = data['records']
+        stats.unparsed = data['unparsed']
+        stats.levels = dict(data['levels'])
+        stats.loggers = dict(data['loggers'])
+        stats.first_timestamp = data['first_timestamp']
+        stats.last_timestamp = data['last_timestamp']
+        stats.latency = LatencySketch.from_dict(data['latency'])
+        for dimension, sketches in data['breakdown'].items():
+            stats.breakdown[dimension] = {group: LatencySketch.from_dict(s) for group, s in sketches.items()}
+        stats.hourly = {hour: list(values) for hour, values in data['hourly'].items()}
+        return stats
+
+
+def _event_from_fields(fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Latency event from JSON data fields or regex groups, if there is a duration"""
+    duration = fields.get('duration_ms')
+    if duration is None:
+        return None
+    try:
+        event = {'duration_ms': float(duration)}
+    except (TypeError, ValueError):
+        return None
+    status = fields.get('status_code', fields.get('status'))
+    if status is not None:
+        event['status'] = str(status)
+    for dimension in ('endpoint', 'generator'):
+        if fields.get(dimension) is not None:
+            event[dimension] = str(fields[dimension])
+    return event
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one log line in either format
+
+    Returns:
+        Dict with timestamp, name, level, message and (for latency records)
+        event; None for lines that are not records, e.g. traceback lines
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith('{'):
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        data = entry.get('data')
+        return {
+            'timestamp': entry.get('timestamp'),
+            'name': entry.get('name'),
+            'level': entry.get('level'),
+            'message': entry.get('message', ''),
+            'event': _event_from_fields(data) if isinstance(data, dict) else None
+        }
+
+    match = TEXT_RECORD.match(line)
+    if not match:
+        return None
+    message = match.group('message')
+    event = None
+    for pattern in TEXT_EVENTS:
+        event_match = pattern.search(message)
+        if event_match:
+            event = _event_from_fields(event_match.groupdict())
+            break
+    return {
+        # ISO-like so that text and JSON timestamps compare and group by hour alike
+        'timestamp': match.group('timestamp').replace(' ', 'T').replace(',', '.'),
+        'name': match.group('name'),
+        'level': match.group('level'),
+        'message': message,
+        'event': event
+    }
+
+
+def open_log(path: str):
+    """Open a plain, gzip or bz2 log file for reading text"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
 
-def read_json_logs(log_file):
-    """Đọc file log định dạng JSON và chuyển thành DataFrame"""
-    records = []
-    with open(log_file, 'r', encoding='utf-8') as f:
+
+def _rotation_key(base: str, path: str) -> Tuple[int, Any]:
+    """Sort key placing the oldest rotation first and the live file last"""
+    name = path[len(base):]
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    match = ROTATION_SUFFIX.match(name)
+    if not name or not match:
+        return (2, 0)
+    if match.group('number'):
+        # Higher numbers are older
+        return (0, -int(match.group('number')))
+    return (1, match.group('date'))
+
+
+def expand_log_paths(paths: Iterable[str]) -> List[str]:
+    """
+    Expand arguments into log files, oldest first
+
+    A path (or glob) naming a live log file also selects its rotated and
+    compressed siblings, e.g. ``api.log`` selects ``api.log.2.gz``,
+    ``api.log.1`` and ``api.log``.
+    """
+    files: List[str] = []
+    seen = set()
+    for argument in paths:
+        for path in sorted(glob.glob(argument)) or [argument]:
+            base = path
+            for suffix in COMPRESSION_SUFFIXES:
+                if base.endswith(suffix):
+                    base = base[:-len(suffix)]
+            family = [candidate for candidate in glob.glob(glob.escape(base) + '*')
+                      if candidate == base or _rotation_key(base, candidate)[0] < 2]
+            if path not in family and os.path.exists(path):
+                family.append(path)
+            for candidate in sorted(family, key=lambda candidate: _rotation_key(base, candidate)):
+                if candidate not in seen and os.path.isfile(candidate):
+                    seen.add(candidate)
+                    files.append(candidate)
+    return files
+
+
+def iter_records(path: str) -> Iterator[Optional[Dict[str, Any]]]:
+    """Yield parsed records (None for unparsed lines) from one file, line by line"""
+    with open_log(path) as f:
         for line in f:
-            try:
-                log_entry = json.loads(line.strip())
-                records.append(log_entry)
-            except json.JSONDecodeError:
-                print(f"Warning: Could not parse line: {line[:50]}...")
-    
-    return pd.DataFrame(records)
-
-def analyze_api_logs(log_file):
-    """Phân tích API logs và hiển thị thống kê"""
-    df = read_json_logs(log_file)
-    
-    # Thống kê cơ bản
-    print(f"Total API calls: {len(df)}")
-    print(f"Average response time: {df['data'].apply(lambda x: x.get('duration_ms', 0)).mean():.2f} ms")
-    
-    # Thống kê theo status code
-    status_counts = df['data'].apply(lambda x: x.get('status_code')).value_counts()
-    print("\nStatus Code Distribution:")
-    print(status_counts)
-    
-    # Biểu đồ thời gian phản hồi
+            if line.strip():
+                yield parse_line(line)
+
+
+def analyze_files(paths: Iterable[str], stats: Optional[LogStats] = None) -> LogStats:
+    """
+    Stream every file into one LogStats
+
+    Args:
+        paths: Log files, read in order
+        stats: Aggregates to add to (a new LogStats if None)
+    """
+    stats = stats or LogStats()
+    for path in paths:
+        for record in iter_records(path):
+            stats.add(record)
+    return stats
+
+
+class LogTailer:
+    """
+    Incremental reader of live log files with a persisted checkpoint
+
+    For every live file the checkpoint stores its device, inode and the
+    offset of the first unread byte, plus the cumulative LogStats. A poll
+    reads only complete lines appended since the last one. When the inode
+    changed the file was rotated: the rest of the old file (found among the
+    rotated siblings by inode) and any newer rotations are read first. A
+    file smaller than the offset, or whose first bytes no longer match the
+    saved fingerprint (truncated, then rewritten past the offset between two
+    polls, as with copytruncate), is read from the start.
+    """
+
+    CHECKPOINT_VERSION = 1
+    # Leading bytes hashed to recognize a file rewritten in place
+    FINGERPRINT_BYTES = 256
+
+    def __init__(self, paths: Iterable[str], checkpoint_path: Optional[str] = None):
+        """
+        Args:
+            paths: Live log files or globs (re-expanded on every poll)
+            checkpoint_path: JSON checkpoint file; None keeps state in memory only
+        """
+        self.paths = list(paths)
+        self.checkpoint_path = checkpoint_path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.stats = LogStats()
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != self.CHECKPOINT_VERSION:
+            print(f"Warning: ignoring checkpoint {self.checkpoint_path} with unknown version", file=sys.stderr)
+            return
+        self.files = data['files']
+        self.stats = LogStats.from_dict(data['stats'])
+
+    def save(self) -> None:
+        """Write the checkpoint atomically (temporary file, then rename)"""
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.CHECKPOINT_VERSION, 'files': self.files, 'stats': self.stats.to_dict()}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _live_files(self) -> List[str]:
+        files = []
+        for argument in self.paths:
+            for path in sorted(glob.glob(argument)) or [argument]:
+                name = os.path.basename(path)
+                rotated = name.endswith(COMPRESSION_SUFFIXES) or ROTATION_SUFFIX.search(name)
+                if os.path.isfile(path) and not rotated and path not in files:
+                    files.append(path)
+        return files
+
+    def poll(self) -> LogStats:
+        """
+        Read everything appended since the last poll and save the checkpoint
+
+        Returns:
+            Aggregates of the newly read records only (already merged into ``stats``)
+        """
+        interval = LogStats()
+        for path in self._live_files():
+            self._poll_file(path, interval)
+        self.stats.merge(interval)
+        self.save()
+        return interval
+
+    def _poll_file(self, path: str, stats: LogStats) -> None:
+        st = os.stat(path)
+        state = self.files.get(path)
+        offset = 0
+        if state is None:
+            # First sight: include the history in rotated (and compressed) siblings
+            for rotated in expand_log_paths([path]):
+                if rotated != path:
+                    self._read(rotated, 0, stats, final=True)
+        elif (state['device'], state['inode']) != (st.st_dev, st.st_ino):
+            self._read_rotations(path, state, stats)
+        elif st.st_size >= state['offset']:
+            offset = state['offset']
+            # Checkpoints written before fingerprints were added skip the check
+            if 'fingerprint' in state and self._fingerprint(path, offset) != state['fingerprint']:
+                print(f"Warning: {path} was truncated and rewritten; reading it again from the start",
+                      file=sys.stderr)
+                offset = 0
+
+        offset = self._read(path, offset, stats)
+        self.files[path] = {'device': st.st_dev, 'inode': st.st_ino, 'offset': offset,
+                            'fingerprint': self._fingerprint(path, offset)}
+
+    @classmethod
+    def _fingerprint(cls, path: str, offset: int) -> str:
+        """Hash of the leading bytes already read (at most FINGERPRINT_BYTES)"""
+        with open(path, 'rb') as f:
+            head = f.read(min(offset, cls.FINGERPRINT_BYTES))
+        return hashlib.blake2b(head, digest_size=8).hexdigest()
+
+    def _read_rotations(self, path: str, state: Dict[str, int], stats: LogStats) -> None:
+        """Finish the rotated-away file, then read rotations newer than it"""
+        family = [candidate for candidate in expand_log_paths([path]) if candidate != path]
+        for index, candidate in enumerate(family):
+            if candidate.endswith(COMPRESSION_SUFFIXES):
+                continue
+            candidate_stat = os.stat(candidate)
+            if (candidate_stat.st_dev, candidate_stat.st_ino) == (state['device'], state['inode']):
+                self._read(candidate, state['offset'], stats, final=True)
+                for newer in family[index + 1:]:
+                    self._read(newer, 0, stats, final=True)
+                return
+        print(f"Warning: rotated file of {path} not found; lines written before rotation may be missing",
+              file=sys.stderr)
+
+    @staticmethod
+    def _read(path: str, offset: int, stats: LogStats, final: bool = False) -> int:
+        """
+        Add complete lines from ``offset`` on to stats
+
+        Args:
+            final: The file will not grow any more, so a last line without
+                newline is complete
+
+        Returns:
+            Offset of the first unread byte
+        """
+        opener = gzip.open if path.endswith('.gz') else bz2.open if path.endswith('.bz2') else open
+        with opener(path, 'rb') as f:
+            f.seek(offset)
+            for line in iter(f.readline, b''):
+                if not line.endswith(b'\n') and not final:
+                    # Partially written line: read it completely next time
+                    break
+                offset += len(line)
+                text = line.decode('utf-8', errors='replace')
+                if text.strip():
+                    stats.add(parse_line(text))
+        return offset
+
+    def follow(self, interval: float = 2.0, summary_every: float = 10.0, as_json: bool = False,
+               max_polls: Optional[int] = None) -> None:
+        """
+        Poll until interrupted, printing a summary of each summary period
+
+        Args:
+            interval: Seconds between polls
+            summary_every: Seconds between summaries
+            as_json: Print summaries as JSON lines
+            max_polls: Stop after this many polls (for tests)
+        """
+        window = LogStats()
+        last_summary = time.monotonic()
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                window.merge(self.poll())
+                polls += 1
+                if time.monotonic() - last_summary >= summary_every or polls == max_polls:
+                    print(format_summary(window, self.stats, as_json), flush=True)
+                    window = LogStats()
+                    last_summary = time.monotonic()
+                if max_polls is None or polls < max_polls:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            self.save()
+
+
+def format_summary(window: LogStats, total: LogStats, as_json: bool = False) -> str:
+    """One-line summary of the latest period, with the running total"""
+    latency = window.latency.summary()
+    errors = window.levels.get('ERROR', 0) + window.levels.get('CRITICAL', 0)
+    if as_json:
+        return json.dumps({'time': datetime.now().isoformat(timespec='seconds'), 'records': window.records,
+                           'errors': errors, 'latency_ms': latency, 'total_records': total.records})
+    line = f"[{datetime.now():%H:%M:%S}] +{window.records} records, {errors} errors"
+    if latency['count']:
+        line += (f", latency n={latency['count']} "
+                 + ' '.join(f"p{p}={latency[f'p{p}']:.1f}" for p in PERCENTILES) + " ms")
+    return line + f" (total {total.records})"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Plain-text rendering of LogStats.report()"""
+    lines = [
+        f"Records: {report['records']} ({report['unparsed_lines']} unparsed lines)",
+        f"Period: {report['first_timestamp'] or '-'} .. {report['last_timestamp'] or '-'}",
+        "",
+        "Levels: " + ', '.join(f"{level}={count}" for level, count in report['levels'].items()),
+        "Top loggers: " + ', '.join(f"{name}={count}" for name, count in list(report['loggers'].items())[:5]),
+    ]
+
+    def latency_row(label: str, summary: Dict[str, Any]) -> str:
+        if not summary['count']:
+            return f"  {label:<40} {0:>8}"
+        return (f"  {label:<40} {summary['count']:>8} {summary['mean']:>10.1f}"
+                + ''.join(f" {summary[f'p{p}']:>10.1f}" for p in PERCENTILES))
+
+    header = f"  {'':<40} {'count':>8} {'mean':>10}" + ''.join(f" {f'p{p}':>10}" for p in PERCENTILES)
+    lines += ["", "Latency (ms):", header, latency_row('all', report['latency_ms'])]
+    for dimension, groups in report['latency_ms_by'].items():
+        lines.append(f"By {dimension}:")
+        for group, summary in groups.items():
+            lines.append(latency_row(group, summary))
+    return '\n'.join(lines)
+
+
+def save_chart(stats: LogStats, path: str) -> None:
+    """Plot average latency by hour (requires matplotlib)"""
+    if not MATPLOTLIB_AVAILABLE:
+        raise RuntimeError("matplotlib is not installed")
+    hours = sorted(stats.hourly)
     plt.figure(figsize=(10, 6))
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df.set_index('timestamp', inplace=True)
-    df['data'].apply(lambda x: x.get('duration_ms', 0)).resample('1H').mean().plot()
-    plt.title('Average API Response Time by Hour')
+    plt.plot(hours, [stats.hourly[hour][0] / stats.hourly[hour][1] for hour in hours])
+    plt.xticks(rotation=45, ha='right')
+    plt.title('Average Response Time by Hour')
     plt.ylabel('Response Time (ms)')
-    plt.savefig('api_response_time.png')
-    print("\nSaved response time chart to api_response_time.png")
-
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python analyze_logs.py <log_file>")
-        sys.exit(1)
-    
-    log_file = sys.argv[1]
-    if not os.path.exists(log_file):
-        print(f"Error: Log file {log_file} not found")
-        sys.exit(1)
-    
-    if 'api' in log_file:
-        analyze_api_logs(log_file)
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Streaming analysis of JSON and plain-text logs")
+    parser.add_argument('paths', nargs='+', help="Log files or globs; rotated and .gz siblings are included")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    parser.add_argument('--chart', metavar='PNG', help="Save average latency by hour (requires matplotlib)")
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help="Resume from and save offsets and aggregates; only new lines are read")
+    parser.add_argument('--reset', action='store_true', help="Discard the checkpoint before reading")
+    parser.add_argument('--follow', '-f', action='store_true', help="Keep reading appended lines and print summaries")
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls in follow mode")
+    parser.add_argument('--summary-every', type=float, default=10.0, help="Seconds between follow-mode summaries")
+    args = parser.parse_args(argv)
+
+    if args.follow or args.checkpoint:
+        if args.reset and args.checkpoint and os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+        tailer = LogTailer(args.paths, args.checkpoint)
+        if args.follow:
+            tailer.follow(args.interval, args.summary_every, args.json)
+            return 0
+        tailer.poll()
+        files, stats = sorted(tailer.files), tailer.stats
     else:
-        print("Generic log analysis not implemented yet")
+        files = expand_log_paths(args.paths)
+        stats = analyze_files(files)
+    if not files:
+        print(f"Error: no log files found for {' '.join(args.paths)}", file=sys.stderr)
+        return 1
+
+    report = stats.report()
+    if args.json:
+        print(json.dumps({'files': files, **report}, indent=2))
+    else:
+        print(f"Files: {len(files)}")
+        print(format_report(report))
+    if args.chart:
+        save_chart(stats, args.chart)
+        print(f"\nSaved response time chart to {args.chart}", file=sys.stderr if args.json else sys.stdout)
+    return 0
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
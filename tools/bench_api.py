@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of the real Perplexity request path against a local fake server
+
+tests/test_performance.py runs in DEVELOPMENT_MODE, where analyze() returns
+canned results without any I/O. These scenarios instead send every request
+through PerplexityAnalyzer._call_api (aiohttp, JSON encoding, timeouts, the
+retry loop) to mocks/fake_perplexity_server.py, which injects latency, 5xx
+errors and 429s:
+
+- concurrency: throughput and latency of N calls at several concurrency levels
+- pooling: one shared ClientSession versus a new session per call
+- retry: success rate, attempts per call and latency with faults injected
+- cache: repeated analyze() of the same text, and the API calls each one makes
+
+Usage:
+    python tools/bench_api.py                                  # all scenarios
+    python tools/bench_api.py --scenario pooling --calls 200 --latency lognormal:50:0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analyzers.perplexity_analyzer import PerplexityAnalyzer
+from mocks.fake_perplexity_server import FakePerplexityServer
+
+RESULTS_DIR = os.path.join(ROOT, 'bench_results')
+
+SCENARIOS = ('concurrency', 'pooling', 'retry', 'cache')
+
+BENCH_TEXT = (
+    "Photosynthesis converts light energy into chemical energy stored in glucose. Chlorophyll in the "
+    "chloroplasts absorbs light, water is split to release oxygen, and carbon dioxide is fixed in the "
+    "Calvin cycle. The process sustains most food chains and regulates atmospheric carbon."
+)
+
+
+def make_analyzer(base_url: str) -> PerplexityAnalyzer:
+    """An analyzer that calls ``base_url`` through the real API path, whatever the environment says"""
+    analyzer = PerplexityAnalyzer()
+    analyzer.base_url = base_url
+    analyzer.api_key = 'pplx-benchmark'
+    analyzer.use_api = True
+    analyzer.analysis_mode = 'api'
+    return analyzer
+
+
+def summarize(latencies: Sequence[float]) -> Dict[str, Any]:
+    """Count, mean and nearest-rank percentiles in milliseconds"""
+    if not latencies:
+        return {'count': 0}
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))] * 1000, 3)
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+
+
+async def run_calls(call: Callable[[int], Awaitable[Any]], calls: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``call(i)`` for i in range(calls) with at most ``concurrency`` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            result = await call(i)
+            latencies.append(time.perf_counter() - start)
+            if not result:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    wall = time.perf_counter() - start
+    return {
+        'calls': calls,
+        'concurrency': concurrency,
+        'failures': failures,
+        'wall_s': round(wall, 4),
+        'throughput_per_s': round(calls / wall, 2) if wall else None,
+        'latency': summarize(latencies)
+    }
+
+
+async def bench_concurrency(server: FakePerplexityServer, analyzer: PerplexityAnalyzer, calls: int = 100,
+                            levels: Sequence[int] = (1, 4, 16, 64)) -> List[Dict[str, Any]]:
+    """Throughput and latency of single _call_api calls over one shared session"""
+    rows = []
+    async with aiohttp.ClientSession() as session:
+        for level in levels:
+            server.reset_stats()
+            row = await run_calls(lambda i: analyzer._call_api(session, f"Question {i} about {BENCH_TEXT}"),
+                                  calls, level)
+            row['server'] = server.stats()
+            rows.append(row)
+    return rows
+
+
+async def bench_pooling(server: FakePerplexityServer, analyzer: PerplexityAnalyzer, calls: int = 100,
+                        concurrency: int = 16) -> Dict[str, Any]:
+    """A shared session (pooled keep-alive connections) versus a new session per call"""
+    results = {}
+
+    server.reset_stats()
+    async with aiohttp.ClientSession() as session:
+        row = await run_calls(lambda i: analyzer._call_api(session, f"Pooled {i}: {BENCH_TEXT}"), calls, concurrency)
+    row['server'] = server.stats()
+    results['shared_session'] = row
+
+    async def fresh_session_call(i: int) -> Any:
+        async with aiohttp.ClientSession() as session:
+            return await analyzer._call_api(session, f"Unpooled {i}: {BENCH_TEXT}")
+
+    server.reset_stats()
+    row = await run_calls(fresh_session_call, calls, concurrency)
+    row['server'] = server.stats()
+    results['session_per_call'] = row
+    return results
+
+
+async def bench_retry(server: FakePerplexityServer, analyzer: PerplexityAnalyzer, calls: int = 50,
+                      concurrency: int = 16, error_rate: float = 0.1, rate_limit_rate: float = 0.1) -> Dict[str, Any]:
+    """_call_api_with_retry with 5xx and 429 responses injected"""
+    saved = server.error_rate, server.rate_limit_rate
+    server.error_rate, server.rate_limit_rate = error_rate, rate_limit_rate
+    server.reset_stats()
+    try:
+        async with aiohttp.ClientSession() as session:
+            row = await run_calls(
+                lambda i: analyzer._call_api_with_retry(session, f"Retry {i}: {BENCH_TEXT}", operation='bench'),
+                calls, concurrency)
+    finally:
+        server.error_rate, server.rate_limit_rate = saved
+    row['server'] = server.stats()
+    row['attempts_per_call'] = round(server.requests / calls, 3) if calls else None
+    row['injected'] = {'error_rate': error_rate, 'rate_limit_rate': rate_limit_rate}
+    return row
+
+
+async def bench_cache(server: FakePerplexityServer, analyzer: PerplexityAnalyzer, runs: int = 3) -> Dict[str, Any]:
+    """Full analyze() of the same text repeatedly: does any layer avoid repeated API calls?"""
+    rows = []
+    for _ in range(runs):
+        server.reset_stats()
+        start = time.perf_counter()
+        await analyzer.analyze(BENCH_TEXT)
+        rows.append({'wall_s': round(time.perf_counter() - start, 4), 'api_calls': server.requests})
+    return {
+        'runs': rows,
+        'cold_s': rows[0]['wall_s'],
+        'warm_s': round(sum(row['wall_s'] for row in rows[1:]) / (len(rows) - 1), 4) if len(rows) > 1 else None,
+        'api_calls_saved_when_warm': rows[0]['api_calls'] - min(row['api_calls'] for row in rows)
+    }
+
+
+async def run_scenarios(server: FakePerplexityServer, scenarios: Sequence[str] = SCENARIOS, calls: int = 100,
+                        levels: Sequence[int] = (1, 4, 16, 64), concurrency: int = 16) -> Dict[str, Any]:
+    """
+    Run the selected scenarios against a started server
+
+    Returns:
+        Results by scenario name
+    """
+    analyzer = make_analyzer(server.url)
+    results: Dict[str, Any] = {}
+    if 'concurrency' in scenarios:
+        results['concurrency'] = await bench_concurrency(server, analyzer, calls, levels)
+    if 'pooling' in scenarios:
+        results['pooling'] = await bench_pooling(server, analyzer, calls, concurrency)
+    if 'retry' in scenarios:
+        results['retry'] = await bench_retry(server, analyzer, max(1, calls // 2), concurrency)
+    if 'cache' in scenarios:
+        results['cache'] = await bench_cache(server, analyzer)
+    return results
+
+
+def run_benchmark(scenarios: Sequence[str] = SCENARIOS, latency: str = 'lognormal:50:0.5', calls: int = 100,
+                  levels: Sequence[int] = (1, 4, 16, 64), concurrency: int = 16, seed: int = 0) -> Dict[str, Any]:
+    """Start a fake server in its own thread, run the scenarios and return the results with their settings"""
+    server = FakePerplexityServer(latency=latency, seed=seed)
+    with server.serve_in_thread():
+        results = asyncio.run(run_scenarios(server, scenarios, calls, levels, concurrency))
+    return {
+        'benchmark': 'real_api_path',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'settings': {'latency': str(server.latency), 'calls': calls, 'levels': list(levels),
+                     'concurrency': concurrency, 'seed': seed},
+        'results': results
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the real Perplexity request path against a local fake server")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help="Run only these (repeatable)")
+    parser.add_argument('--latency', default='lognormal:50:0.5', help="fixed:MS, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--levels', default='1,4,16,64', help="Concurrency levels for the concurrency scenario")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrency for pooling and retry")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Result file (default bench_results/benchmark_real_api_<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.scenario or SCENARIOS, args.latency, args.calls,
+                           [int(level) for level in args.levels.split(',')], args.concurrency, args.seed)
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark_real_api_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report['results'], indent=2))
+    print(f"\nSaved to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
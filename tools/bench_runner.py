@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Benchmark runs with a fixed schema, environment metadata and baseline comparison
+
+Every run of a suite is stored as ``bench_results/runs/<suite>_<timestamp>.json``:
+
+    {"schema": 1, "suite": "api", "timestamp": "...",
+     "environment": {"python": "3.11.7", "git_commit": "...", "cpu_count": 8, ...},
+     "settings": {"repeats": 5, ...},
+     "metrics": {"call_latency_ms": {"unit": "ms", "better": "lower", "samples": [...]}, ...}}
+
+A run is compared metric by metric with the suite's baseline
+(``bench_results/baselines/<suite>.json``): the change is the ratio of sample
+medians, with a bootstrap confidence interval. A metric regresses when its
+median moved in the bad direction by more than the threshold and the interval
+excludes "no change"; otherwise differences are reported as noise.
+
+Usage:
+    python tools/bench_runner.py run                          # all suites, compare with baselines
+    python tools/bench_runner.py run --suite api --fail-on-regression
+    python tools/bench_runner.py run --save-baseline          # accept this run as the new baseline
+    python tools/bench_runner.py compare RUN.json BASELINE.json
+    python tools/bench_runner.py history --suite api          # medians over stored runs
+    python tools/bench_runner.py history --legacy             # also the old bench_results/*.json files
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+
+RESULTS_DIR = os.path.join(ROOT, 'bench_results')
+SCHEMA_VERSION = 1
+DEFAULT_THRESHOLD = 0.10
+BOOTSTRAP_RESAMPLES = 2000
+
+STATUS_REGRESSED = 'regressed'
+STATUS_IMPROVED = 'improved'
+STATUS_UNCHANGED = 'unchanged'
+STATUS_NOISE = 'noise'          # beyond the threshold, but the interval includes no change
+STATUS_MISSING = 'missing'      # metric absent from the baseline
+
+# Packages whose versions are recorded with every run
+_TRACKED_PACKAGES = ('aiohttp', 'flask', 'numpy', 'spacy')
+
+# Environment fields that must match for timings to be comparable
+_COMPARABLE_FIELDS = ('python', 'implementation', 'machine', 'cpu_count')
+
+
+def metric(samples: Sequence[float], unit: str, better: str = 'lower') -> Dict[str, Any]:
+    """A metric entry: raw samples, their unit and whether lower or higher is better"""
+    if better not in ('lower', 'higher'):
+        raise ValueError(f"better must be 'lower' or 'higher', not {better!r}")
+    return {'unit': unit, 'better': better, 'samples': [float(sample) for sample in samples]}
+
+
+# ----------------------------------------------------------------------------
+# Suites: each takes the number of repeats and returns {metric name: metric(...)}
+# ----------------------------------------------------------------------------
+
+def suite_api(repeats: int) -> Dict[str, Dict[str, Any]]:
+    """Real _call_api path against the fake server with a fixed 2 ms delay (measures our overhead)"""
+    from bench_api import make_analyzer, run_calls
+    from mocks.fake_perplexity_server import FakePerplexityServer
+    import aiohttp
+
+    server = FakePerplexityServer(latency='fixed:2')
+    latencies: List[float] = []
+    throughput: List[float] = []
+
+    async def measure():
+        analyzer = make_analyzer(server.url)
+        async with aiohttp.ClientSession() as session:
+            # Warm-up opens the pooled connections
+            await run_calls(lambda i: analyzer._call_api(session, f"Warm-up {i}"), 16, 16)
+            for _ in range(repeats):
+                for i in range(20):
+                    start = time.perf_counter()
+                    await analyzer._call_api(session, f"Latency probe {i}")
+                    latencies.append((time.perf_counter() - start) * 1000)
+                row = await run_calls(lambda i: analyzer._call_api(session, f"Throughput probe {i}"), 200, 16)
+                throughput.append(row['throughput_per_s'])
+
+    with server.serve_in_thread():
+        asyncio.run(measure())
+    return {
+        'call_latency_ms': metric(latencies, 'ms'),
+        'throughput_per_s': metric(throughput, 'calls/s', 'higher')
+    }
+
+
+def suite_generators(repeats: int) -> Dict[str, Dict[str, Any]]:
+    """Batch generation with the Bloom's generator, memo cleared before each repeat"""
+    from generators.blooms import generator as blooms_generator
+    from generators.memo import generator_memo
+
+    analyses = [{'concepts': [f"concept {i} {j}" for j in range(20)], 'context': 'science'} for i in range(200)]
+    batch_seconds = []
+    for _ in range(repeats):
+        generator_memo.clear()
+        start = time.perf_counter()
+        blooms_generator.generate_many(analyses, compact=True)
+        batch_seconds.append(time.perf_counter() - start)
+    generator_memo.clear()
+    return {'blooms_batch_s': metric(batch_seconds, 's')}
+
+
+def suite_sanitizer(repeats: int) -> Dict[str, Dict[str, Any]]:
+    """TextSanitizer throughput on 1 MB of text with markup and control characters"""
+    from analyzers.sanitizer import TextSanitizer
+
+    sanitizer = TextSanitizer()
+    chunk = "Photosynthesis converts light <b>energy</b> into chemical energy.\x00\x07\t "
+    text = chunk * (1024 * 1024 // len(chunk))
+    mb = len(text) / (1024 * 1024)
+    throughput = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sanitizer.sanitize(text)
+        throughput.append(mb / (time.perf_counter() - start))
+    return {'sanitize_mb_per_s': metric(throughput, 'MB/s', 'higher')}
+
+
+SUITES: Dict[str, Callable[[int], Dict[str, Dict[str, Any]]]] = {
+    'api': suite_api,
+    'generators': suite_generators,
+    'sanitizer': suite_sanitizer
+}
+
+
+# ----------------------------------------------------------------------------
+# Environment and storage
+# ----------------------------------------------------------------------------
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        result = subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, machine, package versions and source revision of this run"""
+    from importlib import metadata
+
+    packages = {}
+    for name in _TRACKED_PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': _git('rev-parse', 'HEAD'),
+        'git_dirty': bool(status) if status is not None else None,
+        'packages': packages
+    }
+
+
+def run_suite(name: str, repeats: int = 5) -> Dict[str, Any]:
+    """Run one suite and return it as a schema-1 run document"""
+    started = time.perf_counter()
+    metrics = SUITES[name](repeats)
+    return {
+        'schema': SCHEMA_VERSION,
+        'suite': name,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'duration_s': round(time.perf_counter() - started, 3),
+        'environment': environment(),
+        'settings': {'repeats': repeats},
+        'metrics': metrics
+    }
+
+
+def save_run(run: Dict[str, Any], results_dir: str = RESULTS_DIR) -> str:
+    runs_dir = os.path.join(results_dir, 'runs')
+    os.makedirs(runs_dir, exist_ok=True)
+    stamp = datetime.fromisoformat(run['timestamp']).strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(runs_dir, f"{run['suite']}_{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    return path
+
+
+def baseline_path(suite: str, results_dir: str = RESULTS_DIR) -> str:
+    return os.path.join(results_dir, 'baselines', f"{suite}.json")
+
+
+def save_baseline(run_path: str, results_dir: str = RESULTS_DIR) -> str:
+    """Copy a stored run to its suite's baseline"""
+    suite = load_run(run_path)['suite']
+    path = baseline_path(suite, results_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copyfile(run_path, path)
+    return path
+
+
+def load_run(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        run = json.load(f)
+    if run.get('schema') != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark schema {run.get('schema')!r}")
+    return run
+
+
+# ----------------------------------------------------------------------------
+# Comparison
+# ----------------------------------------------------------------------------
+
+def median_ratio_interval(current: Sequence[float], baseline: Sequence[float], confidence: float = 0.95,
+                          resamples: int = BOOTSTRAP_RESAMPLES, seed: int = 0) -> Tuple[float, float]:
+    """Bootstrap confidence interval of median(current) / median(baseline)"""
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        base = statistics.median(rng.choices(baseline, k=len(baseline)))
+        if base:
+            ratios.append(statistics.median(rng.choices(current, k=len(current))) / base)
+    if not ratios:
+        return float('nan'), float('nan')
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    return ratios[int(tail * (len(ratios) - 1))], ratios[int((1 - tail) * (len(ratios) - 1))]
+
+
+def compare_metric(current: Dict[str, Any], baseline: Optional[Dict[str, Any]],
+                   threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """
+    Compare one metric with its baseline
+
+    Args:
+        current: Metric entry of the new run
+        baseline: Metric entry of the baseline, or None
+        threshold: Relative change of the median tolerated before flagging (0.10 = 10%)
+
+    Returns:
+        Medians, ratio, confidence interval and status
+    """
+    current_median = statistics.median(current['samples'])
+    if baseline is None or not baseline.get('samples'):
+        return {'status': STATUS_MISSING, 'median': current_median, 'unit': current['unit']}
+
+    baseline_median = statistics.median(baseline['samples'])
+    ratio = current_median / baseline_median if baseline_median else float('nan')
+    low, high = median_ratio_interval(current['samples'], baseline['samples'])
+
+    # Express the change so that > 1 is always worse
+    worse_ratio, worse_low, worse_high = (ratio, low, high) if current['better'] == 'lower' \
+        else (1 / ratio if ratio else float('nan'), 1 / high if high else float('nan'), 1 / low if low else float('nan'))
+    if worse_ratio > 1 + threshold and worse_low > 1:
+        status = STATUS_REGRESSED
+    elif worse_ratio < 1 / (1 + threshold) and worse_high < 1:
+        status = STATUS_IMPROVED
+    elif abs(worse_ratio - 1) > threshold:
+        status = STATUS_NOISE
+    else:
+        status = STATUS_UNCHANGED
+
+    return {
+        'status': status,
+        'unit': current['unit'],
+        'better': current['better'],
+        'median': current_median,
+        'baseline_median': baseline_median,
+        'ratio': round(ratio, 4),
+        'ci95': [round(low, 4), round(high, 4)],
+        'samples': len(current['samples']),
+        'baseline_samples': len(baseline['samples'])
+    }
+
+
+def compare_runs(run: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """Compare every metric of a run with a baseline run of the same suite"""
+    if run['suite'] != baseline['suite']:
+        raise ValueError(f"Cannot compare suite {run['suite']!r} with {baseline['suite']!r}")
+    differences = {field: [baseline['environment'].get(field), run['environment'].get(field)]
+                   for field in _COMPARABLE_FIELDS
+                   if run['environment'].get(field) != baseline['environment'].get(field)}
+    metrics = {name: compare_metric(entry, baseline['metrics'].get(name), threshold)
+               for name, entry in run['metrics'].items()}
+    return {
+        'suite': run['suite'],
+        'baseline_timestamp': baseline['timestamp'],
+        'baseline_commit': baseline['environment'].get('git_commit'),
+        'threshold': threshold,
+        # Timings from different interpreters or machines are flagged, not trusted
+        'environment_differences': differences,
+        'metrics': metrics,
+        'regressed': sorted(name for name, result in metrics.items() if result['status'] == STATUS_REGRESSED)
+    }
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    lines = [f"Suite {comparison['suite']} vs baseline {comparison['baseline_timestamp']} "
+             f"(threshold {comparison['threshold']:.0%})"]
+    for field, (before, after) in comparison['environment_differences'].items():
+        lines.append(f"  WARNING: {field} differs from baseline ({before} -> {after})")
+    for name, result in sorted(comparison['metrics'].items()):
+        if result['status'] == STATUS_MISSING:
+            lines.append(f"  {name:<24} {result['median']:>12.4g} {result['unit']:<8} (not in baseline)")
+            continue
+        low, high = result['ci95']
+        lines.append(f"  {name:<24} {result['median']:>12.4g} {result['unit']:<8} "
+                     f"x{result['ratio']:.3f} [{low:.3f}, {high:.3f}]  {result['status'].upper()}")
+    return '\n'.join(lines)
+
+
+# ----------------------------------------------------------------------------
+# History, including the files written before this schema
+# ----------------------------------------------------------------------------
+
+_LEGACY_NAME = re.compile(r'^(?P<suite>.+?)_(?P<stamp>\d{8}_\d{6})\.json$')
+
+
+def legacy_to_run(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Convert a pre-schema bench_results file to a run document
+
+    ``times`` lists become samples; other numeric top-level fields become
+    single-sample metrics. Returns None for files without numbers.
+    """
+    match = _LEGACY_NAME.match(os.path.basename(path))
+    if not match:
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    metrics = {}
+    entries = data.get('benchmarks') if isinstance(data.get('benchmarks'), list) else [data]
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        prefix = f"{entry['generator']}." if 'generator' in entry and len(entries) > 1 else ''
+        skipped = {'iterations', 'text_length'}
+        if isinstance(entry.get('times'), list) and entry['times']:
+            metrics[f"{prefix}time_s"] = metric(entry['times'], 's')
+            # Summaries of the samples just added
+            skipped.update(('avg_time', 'std_dev'))
+        for key, value in entry.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and key not in skipped:
+                better = 'higher' if key.endswith(('_per_s', 'factor', 'speedup')) else 'lower'
+                metrics[f"{prefix}{key}"] = metric([value], 's' if 'time' in key else '', better)
+    if not metrics:
+        return None
+    return {
+        'schema': SCHEMA_VERSION,
+        'suite': f"legacy.{match.group('suite')}",
+        'timestamp': datetime.strptime(match.group('stamp'), '%Y%m%d_%H%M%S').isoformat(),
+        'environment': {},
+        'settings': {'source': os.path.basename(path)},
+        'metrics': metrics
+    }
+
+
+def load_history(results_dir: str = RESULTS_DIR, suite: Optional[str] = None,
+                 legacy: bool = False) -> List[Dict[str, Any]]:
+    """Stored runs (and optionally converted legacy files), oldest first"""
+    runs = []
+    for path in glob.glob(os.path.join(results_dir, 'runs', '*.json')):
+        try:
+            runs.append(load_run(path))
+        except (OSError, ValueError):
+            continue
+    if legacy:
+        runs.extend(run for run in map(legacy_to_run, glob.glob(os.path.join(results_dir, '*.json'))) if run)
+    if suite:
+        runs = [run for run in runs if run['suite'] == suite]
+    return sorted(runs, key=lambda run: (run['suite'], run['timestamp']))
+
+
+def format_history(runs: Sequence[Dict[str, Any]]) -> str:
+    lines = []
+    suite = None
+    for run in runs:
+        if run['suite'] != suite:
+            suite = run['suite']
+            lines.append(f"{suite}:")
+        commit = (run['environment'].get('git_commit') or '')[:8]
+        medians = ', '.join(f"{name}={statistics.median(entry['samples']):.4g}"
+                            for name, entry in sorted(run['metrics'].items()))
+        lines.append(f"  {run['timestamp']} {commit:<8} {medians}")
+    return '\n'.join(lines)
+
+
+# ----------------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run benchmarks and track regressions against baselines")
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run suites, store the results and compare with baselines")
+    run_parser.add_argument('--suite', action='append', choices=sorted(SUITES), help="Run only these (repeatable)")
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    run_parser.add_argument('--save-baseline', action='store_true', help="Make this run the suite's baseline")
+    run_parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on a regression")
+    run_parser.add_argument('--json', action='store_true')
+
+    compare_parser = commands.add_parser('compare', help="Compare two stored runs")
+    compare_parser.add_argument('run')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument('--fail-on-regression', action='store_true')
+    compare_parser.add_argument('--json', action='store_true')
+
+    history_parser = commands.add_parser('history', help="Medians of stored runs over time")
+    history_parser.add_argument('--suite')
+    history_parser.add_argument('--legacy', action='store_true', help="Include pre-schema bench_results files")
+    args = parser.parse_args(argv)
+
+    if args.command == 'history':
+        print(format_history(load_history(args.results_dir, args.suite, args.legacy)))
+        return 0
+
+    if args.command == 'compare':
+        comparisons = [compare_runs(load_run(args.run), load_run(args.baseline), args.threshold)]
+    else:
+        comparisons = []
+        for name in args.suite or sorted(SUITES):
+            run = run_suite(name, args.repeats)
+            path = save_run(run, args.results_dir)
+            print(f"Saved {path}", file=sys.stderr)
+            baseline = baseline_path(name, args.results_dir)
+            if os.path.exists(baseline):
+                comparisons.append(compare_runs(run, load_run(baseline), args.threshold))
+            else:
+                print(f"No baseline for suite {name}; use --save-baseline to create one", file=sys.stderr)
+            if args.save_baseline:
+                print(f"Baseline updated: {save_baseline(path, args.results_dir)}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(comparisons, indent=2))
+    else:
+        print('\n\n'.join(format_comparison(comparison) for comparison in comparisons))
+    regressed = any(comparison['regressed'] for comparison in comparisons)
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,5 +3,6 @@ Utils package
 """
 
 from .logger import setup_logger
+from .instrumentation import Instrument
 
-__all__ = ['setup_logger']
\ No newline at end of file
+__all__ = ['setup_logger', 'Instrument']
\ No newline at end of file
@@ -4,13 +4,23 @@ import json
 from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
 import datetime
 
-class CustomJsonFormatter(logging.Formatter):
+from config import Config
+from utils.logger import OnceFormatter
+from utils.log_queue import (get_log_queue, existing_log_queue, BatchStreamHandler,
+                             BatchRotatingFileHandler, BatchTimedRotatingFileHandler)
+
+_encode_json = json.JSONEncoder(default=str).encode
+
+class CustomJsonFormatter(OnceFormatter):
     """
     Formatter that outputs JSON strings after parsing the log record.
+
+    The record is rendered once and the text shared by every handler using
+    this formatter; the timestamp is the time the record was created.
     """
-    def format(self, record):
+    def render(self, record):
         logobj = {
-            'timestamp': datetime.datetime.now().isoformat(),
+            'timestamp': datetime.datetime.fromtimestamp(record.created).isoformat(),
             'name': record.name,
             'level': record.levelname,
             'message': record.getMessage(),
@@ -18,19 +28,21 @@ class CustomJsonFormatter(logging.Formatter):
             'funcName': record.funcName
         }
         
-        # Thêm exception info nếu có
+        # Thêm exception info nếu có (exc_text khi record đi qua log queue)
         if record.exc_info:
             logobj['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            logobj['exception'] = record.exc_text
         
         # Thêm custom fields nếu có
         if hasattr(record, 'data'):
             logobj['data'] = record.data
             
-        return json.dumps(logobj)
+        return _encode_json(logobj)
 
 def setup_enhanced_logger(name, log_dir='logs', 
                          json_format=True, max_bytes=10485760, 
-                         backup_count=5, log_level=logging.INFO):
+                         backup_count=5, log_level=logging.INFO, use_queue=None):
     """
     Thiết lập logger với nhiều tùy chọn nâng cao
     
@@ -40,6 +52,7 @@ def setup_enhanced_logger(name, log_dir='logs',
     :param max_bytes: Kích thước tối đa của file log trước khi rotate
     :param backup_count: Số lượng file backup tối đa
     :param log_level: Mức độ logging (DEBUG, INFO, etc.)
+    :param use_queue: Ghi log qua background queue (mặc định Config.LOG_ASYNC)
     :return: Logger object
     """
     # Tạo thư mục log nếu chưa tồn tại
@@ -49,35 +62,45 @@ def setup_enhanced_logger(name, log_dir='logs',
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
     
+    # Chỉ một chuỗi handler cho mỗi logger: không ghi lại qua root logger
+    logger.propagate = False
+    
     # Xóa handlers cũ nếu có
     if logger.handlers:
         logger.handlers.clear()
+        # Only a queue that already exists can hold sinks; do not start one for a synchronous logger
+        log_queue = existing_log_queue()
+        if log_queue is not None:
+            log_queue.remove_sinks(name)
     
-    # Tạo formatter
+    # Tạo formatter, dùng chung cho cả ba handler để mỗi record chỉ format một lần
     if json_format:
         formatter = CustomJsonFormatter()
     else:
-        formatter = logging.Formatter(
+        formatter = OnceFormatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
     
+    if use_queue is None:
+        use_queue = Config.LOG_ASYNC
+    
     # Console handler - luôn hiển thị log ra console
-    console_handler = logging.StreamHandler()
+    console_handler = BatchStreamHandler() if use_queue else logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
     # File handler với rotation theo kích thước
-    size_handler = RotatingFileHandler(
+    size_class = BatchRotatingFileHandler if use_queue else RotatingFileHandler
+    size_handler = size_class(
         os.path.join(log_dir, f"{name}.log"),
         maxBytes=max_bytes,
         backupCount=backup_count,
         encoding='utf-8'
     )
     size_handler.setFormatter(formatter)
-    logger.addHandler(size_handler)
     
     # File handler với rotation theo thời gian (hàng ngày)
-    time_handler = TimedRotatingFileHandler(
+    time_class = BatchTimedRotatingFileHandler if use_queue else TimedRotatingFileHandler
+    time_handler = time_class(
         os.path.join(log_dir, f"{name}_daily.log"),
         when='midnight',
         interval=1,
@@ -85,7 +108,17 @@ def setup_enhanced_logger(name, log_dir='logs',
         encoding='utf-8'
     )
     time_handler.setFormatter(formatter)
-    logger.addHandler(time_handler)
+    
+    handlers = [console_handler, size_handler, time_handler]
+    if use_queue:
+        # Một thread nền ghi tất cả các sink; request thread chỉ enqueue
+        log_queue = get_log_queue()
+        for handler in handlers:
+            log_queue.add_sink(handler, name)
+        logger.addHandler(log_queue.handler)
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     
     return logger
 
@@ -0,0 +1,90 @@
+"""
+Lazily evaluated, level-checked and sampled logging for hot paths
+
+``logger.debug(f"... {concepts}")`` formats its message even when DEBUG is
+disabled. An Instrument checks the level first and only then resolves its
+fields, so a disabled event costs one method call:
+
+    instrument = Instrument(logger)
+    instrument.info("Generated {count} questions", count=lambda: sum(map(len, questions.values())))
+
+Field values that are callables are only called when the event is emitted.
+Fields are also attached to the record as ``data`` for CustomJsonFormatter.
+DEBUG and INFO events can be sampled; warnings and errors are always emitted.
+"""
+import itertools
+import logging
+from typing import Any, Optional, Union
+
+# Fraction of DEBUG/INFO events emitted by instruments without their own rate
+_default_sample_rate = 1.0
+
+
+def set_default_sample_rate(rate: float) -> None:
+    """
+    Set the sampling rate used by instruments created without one
+
+    Args:
+        rate: Fraction of DEBUG/INFO events to emit, from 0.0 (none) to 1.0 (all)
+    """
+    global _default_sample_rate
+    _default_sample_rate = min(max(float(rate), 0.0), 1.0)
+
+
+class Instrument:
+    """Structured logging wrapper that does no work for disabled or unsampled events"""
+
+    __slots__ = ('logger', 'sample_rate', '_counter')
+
+    def __init__(self, logger: Union[logging.Logger, str], sample_rate: Optional[float] = None):
+        """
+        Args:
+            logger: Logger or logger name
+            sample_rate: Fraction of DEBUG/INFO events to emit (None for the default rate)
+        """
+        self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+        self.sample_rate = sample_rate
+        self._counter = itertools.count()
+
+    def enabled(self, level: int) -> bool:
+        """Return True if events at ``level`` would reach a handler"""
+        return self.logger.isEnabledFor(level)
+
+    def _sampled(self) -> bool:
+        rate = _default_sample_rate if self.sample_rate is None else self.sample_rate
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        # Emit every n-th event: deterministic and cheaper than drawing random numbers
+        return next(self._counter) % round(1 / rate) == 0
+
+    def log(self, level: int, message: str, **fields: Any) -> None:
+        """
+        Emit an event if its level is enabled (and, below WARNING, it is sampled)
+
+        Args:
+            level: Logging level
+            message: str.format template using the field names
+            fields: Field values, or zero-argument callables producing them
+        """
+        self._emit(level, message, fields)
+
+    def _emit(self, level: int, message: str, fields: dict) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.WARNING and not self._sampled():
+            return
+
+        data = {name: value() if callable(value) else value for name, value in fields.items()}
+        self.logger.log(level, message.format(**data) if data else message,
+                        extra={'data': data} if data else None, stacklevel=3)
+
+    def debug(self, message: str, **fields: Any) -> None:
+        self._emit(logging.DEBUG, message, fields)
+
+    def info(self, message: str, **fields: Any) -> None:
+        self._emit(logging.INFO, message, fields)
+
+    def warning(self, message: str, **fields: Any) -> None:
+        self._emit(logging.WARNING, message, fields)
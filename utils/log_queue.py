@@ -0,0 +1,290 @@
+"""
+Non-blocking logging backend
+
+Loggers get a single DropQueueHandler that only puts records on a bounded
+queue. One background BatchQueueListener thread takes records off the queue
+in batches, passes them to the real sinks (console, log files) and flushes
+every sink once per batch instead of once per record. When the queue is full
+records are dropped according to the overflow policy and counted, so a slow
+disk never stalls request handling:
+
+    log_queue = get_log_queue()
+    log_queue.add_sink(logging.FileHandler('logs/api.log'), 'api')
+    logging.getLogger('api').addHandler(log_queue.handler)
+"""
+import atexit
+import copy
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Optional
+
+# Overflow policies
+DROP_NEW = 'drop_new'        # Discard the incoming record (errors evict the oldest record instead)
+DROP_OLDEST = 'drop_oldest'  # Discard the oldest queued record
+
+
+class FlushMarker:
+    """Queue item set by the listener once every record queued before it has been written"""
+
+    __slots__ = ('done',)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+def _is_control(item) -> bool:
+    # Listener stop sentinel (None) or a flush marker: never dropped
+    return item is None or isinstance(item, FlushMarker)
+
+
+class DropQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records that do not fit are dropped and counted"""
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = DROP_NEW):
+        if overflow not in (DROP_NEW, DROP_OLDEST):
+            raise ValueError(f"Unknown log queue overflow policy: {overflow}")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self._lock_dropped = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments and render the traceback in the calling thread
+
+        Unlike QueueHandler.prepare the message is not passed through a
+        formatter, so the sinks can still format the record their own way.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == DROP_OLDEST or record.levelno >= logging.ERROR:
+            try:
+                evicted = self.queue.get_nowait()
+                self.queue.task_done()
+            except queue.Empty:
+                evicted = record
+            if _is_control(evicted):
+                # Keep the marker and drop this record instead. Another producer may
+                # already have taken the freed slot, so wait for room: the listener
+                # is draining, and a lost sentinel would hang stop() forever
+                self.queue.put(evicted)
+            elif evicted is not record:
+                try:
+                    # The evicted record will never be handled by the listener
+                    self.queue.put_nowait(record)
+                except queue.Full:
+                    pass
+        with self._lock_dropped:
+            self.dropped += 1
+
+    def take_dropped(self) -> int:
+        """Return the number of records dropped since the last call and reset it"""
+        with self._lock_dropped:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class BatchQueueListener(QueueListener):
+    """QueueListener that handles records in batches and flushes sinks once per batch"""
+
+    def __init__(self, log_queue: queue.Queue, batch_size: int = 256, source: Optional[DropQueueHandler] = None):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.batch_size = max(1, batch_size)
+        self.source = source
+        self._lock_handlers = threading.Lock()
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room: stopping must not be dropped like a record
+        self.queue.put(self._sentinel)
+
+    def add_handler(self, handler: logging.Handler) -> None:
+        with self._lock_handlers:
+            # The monitor thread iterates over the old tuple until it sees the new one
+            self.handlers = self.handlers + (handler,)
+
+    def remove_handlers(self, predicate) -> list:
+        with self._lock_handlers:
+            removed = [handler for handler in self.handlers if predicate(handler)]
+            self.handlers = tuple(handler for handler in self.handlers if handler not in removed)
+        return removed
+
+    def _monitor(self) -> None:
+        has_task_done = hasattr(self.queue, 'task_done')
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            stop = False
+            markers = []
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                elif isinstance(record, FlushMarker):
+                    markers.append(record)
+                else:
+                    self.handle(record)
+
+            self._report_dropped()
+            for handler in self.handlers:
+                try:
+                    handler.flush()
+                except (OSError, ValueError):
+                    # A closed or broken sink must not stop the writer thread
+                    pass
+            # Wake flush() callers only once the records before their marker are on disk
+            for marker in markers:
+                marker.done.set()
+            if has_task_done:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                break
+
+    def _report_dropped(self) -> None:
+        dropped = self.source.take_dropped() if self.source else 0
+        if dropped:
+            self.handle(logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f"Dropped {dropped} log records: logging queue full",
+                'data': {'dropped': dropped}
+            }))
+
+
+class _BatchFlushMixin:
+    """Defer flushing to the listener, which flushes once per batch"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._batched = True
+        try:
+            super().emit(record)
+        finally:
+            self._batched = False
+
+    def flush(self) -> None:
+        if not getattr(self, '_batched', False):
+            super().flush()
+
+
+class BatchStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
+
+class BatchFileHandler(_BatchFlushMixin, logging.FileHandler):
+    pass
+
+
+class BatchRotatingFileHandler(_BatchFlushMixin, RotatingFileHandler):
+    pass
+
+
+class BatchTimedRotatingFileHandler(_BatchFlushMixin, TimedRotatingFileHandler):
+    pass
+
+
+class LogQueue:
+    """A bounded record queue, the handler feeding it and the listener draining it"""
+
+    def __init__(self, maxsize: int = 10000, overflow: str = DROP_NEW, batch_size: int = 256):
+        """
+        Args:
+            maxsize: Records buffered before the overflow policy applies
+            overflow: DROP_NEW or DROP_OLDEST
+            batch_size: Maximum records written between flushes
+        """
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.handler = DropQueueHandler(self.queue, overflow)
+        self.listener = BatchQueueListener(self.queue, batch_size, source=self.handler)
+        self._started = False
+        self._lock = threading.Lock()
+
+    def add_sink(self, handler: logging.Handler, logger_name: Optional[str] = None) -> None:
+        """
+        Write queued records to a handler
+
+        Args:
+            handler: Sink, e.g. a BatchFileHandler
+            logger_name: Only records from this logger (and its children) reach the sink
+        """
+        if logger_name:
+            handler.addFilter(logging.Filter(logger_name))
+        self.listener.add_handler(handler)
+
+    def remove_sinks(self, logger_name: str) -> None:
+        """Close and remove the sinks added for ``logger_name``"""
+        self.flush()
+        removed = self.listener.remove_handlers(
+            lambda handler: any(getattr(f, 'name', None) == logger_name for f in handler.filters))
+        for handler in removed:
+            handler.close()
+
+    def start(self) -> None:
+        with self._lock:
+            if not self._started:
+                self.listener.start()
+                self._started = True
+
+    def stop(self) -> None:
+        """Write every queued record, then stop the background thread"""
+        with self._lock:
+            if self._started:
+                self.listener.stop()
+                self._started = False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every record queued so far has been written
+
+        Returns:
+            False if the listener is not running or did not catch up in time
+        """
+        if not self._started:
+            return False
+        marker = FlushMarker()
+        try:
+            # Like the stop sentinel, the marker waits for room instead of being dropped
+            self.queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        # A stalled listener just leaves the marker queued; no thread is left waiting
+        return marker.done.wait(timeout)
+
+
+_log_queue: Optional[LogQueue] = None
+_log_queue_lock = threading.Lock()
+
+
+def get_log_queue() -> LogQueue:
+    """Return the process-wide log queue, starting its writer thread on first use"""
+    global _log_queue
+    with _log_queue_lock:
+        if _log_queue is None:
+            from config import Config
+            _log_queue = LogQueue(Config.LOG_QUEUE_SIZE, Config.LOG_QUEUE_OVERFLOW, Config.LOG_BATCH_SIZE)
+            _log_queue.start()
+            atexit.register(_log_queue.stop)
+        return _log_queue
+
+
+def existing_log_queue() -> Optional[LogQueue]:
+    """Return the process-wide log queue if it has been created, without starting it"""
+    return _log_queue
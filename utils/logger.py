@@ -4,8 +4,38 @@ Logger setup module
 import logging
 import os
 
-def setup_logger(name, log_dir=None):
-    """Setup and configure a logger"""
+from config import Config
+from utils.log_queue import get_log_queue, BatchStreamHandler, BatchFileHandler
+
+class OnceFormatter(logging.Formatter):
+    """
+    Formatter that renders each record only once
+
+    Sinks sharing a formatter (console and files) receive the same record
+    object, so the first sink renders it and the others reuse the text.
+    Subclasses override render() instead of format().
+    """
+
+    def format(self, record):
+        cached = record.__dict__.get('_rendered')
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        text = self.render(record)
+        record._rendered = (self, text)
+        return text
+
+    def render(self, record):
+        return super().format(record)
+
+def setup_logger(name, log_dir=None, use_queue=None):
+    """
+    Setup and configure a logger
+
+    Args:
+        name: Logger name
+        log_dir: Directory for ``<name>.log`` (console only if None)
+        use_queue: Write through the background log queue (defaults to Config.LOG_ASYNC)
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
     
@@ -13,24 +43,41 @@ def setup_logger(name, log_dir=None):
     if logger.handlers:
         return logger
     
-    # Formatter for logs
-    formatter = logging.Formatter(
+    # Exactly one handler chain: records must not be written again by root handlers
+    logger.propagate = False
+    
+    # Formatter for logs, shared by every sink of this logger
+    formatter = OnceFormatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
+    if use_queue is None:
+        use_queue = Config.LOG_ASYNC
+    
     # Console handler
-    console_handler = logging.StreamHandler()
+    console_handler = BatchStreamHandler() if use_queue else logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # File handler if log_dir is provided
     if log_dir:
         os.makedirs(log_dir, exist_ok=True)
-        file_handler = logging.FileHandler(
+        file_class = BatchFileHandler if use_queue else logging.FileHandler
+        file_handler = file_class(
             os.path.join(log_dir, f"{name}.log"),
             encoding="utf-8"
         )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    if use_queue:
+        # Request threads only enqueue; the log queue's thread writes to the sinks
+        log_queue = get_log_queue()
+        for handler in handlers:
+            log_queue.add_sink(handler, name)
+        logger.addHandler(log_queue.handler)
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     
     return logger
\ No newline at end of file
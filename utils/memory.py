@@ -0,0 +1,272 @@
+"""
+Memory accounting by component and on-demand allocation diffs
+
+Components register a callable returning at least ``{'bytes': n}``, the same
+way caches register their counters for /metrics:
+
+    register_component('cache.text_profiles', text_analyzer.profile_cache.memory_report)
+
+Short-lived objects that could leak (analyzers, HTTP sessions and, with
+Config.MEMORY_DEBUG_ENABLED, compact results) are tracked with weak
+references, so a growing live count after requests finish points at the leak. For a closer look, ``allocation_tracker``
+wraps tracemalloc: take a baseline snapshot, run some load, then list the
+source lines whose allocations grew.
+"""
+import gc
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Objects whose size is shared with the whole process, not owned by a component
+_SHARED_TYPES = (type, type(sys), type(len), type(lambda: None))
+
+_components: Dict[str, Callable[[], Dict[str, Any]]] = {}
+# kind -> {id(obj): weak reference}; keyed by id because tracked objects need not be hashable
+_live: Dict[str, Dict[int, 'weakref.ref']] = {}
+_sizers: Dict[str, Callable[[Any], int]] = {}
+
+_inflight: Dict[int, Dict[str, Any]] = {}
+_inflight_ids = itertools.count(1)
+_lock = threading.Lock()
+
+
+def deep_sizeof(obj: Any, limit: int = 1_000_000) -> int:
+    """
+    Approximate bytes held by an object and everything reachable from it
+
+    Containers, instance ``__dict__`` and ``__slots__`` are followed; each
+    object is counted once. Classes, modules and functions are not counted.
+
+    Args:
+        obj: Root object
+        limit: Maximum number of objects visited
+    """
+    seen = set()
+    pending = [obj]
+    total = 0
+    while pending and len(seen) < limit:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        else:
+            if hasattr(current, '__dict__'):
+                pending.append(vars(current))
+            for cls in type(current).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if slot not in ('__dict__', '__weakref__') and hasattr(current, slot):
+                        pending.append(getattr(current, slot))
+    return total
+
+
+def process_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None if unavailable"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process(os.getpid()).memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def register_component(name: str, report: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Include a component in memory reports
+
+    Args:
+        name: Component name, e.g. 'spacy_model' or 'cache.generator_memo'
+        report: Returns a dict with 'bytes' and any component-specific details
+    """
+    _components[name] = report
+
+
+def track(kind: str, obj: Any, sizer: Optional[Callable[[Any], int]] = None) -> None:
+    """
+    Count an object as live until it is garbage collected
+
+    Args:
+        kind: Group name in the report, e.g. 'perplexity_analyzer'
+        obj: Object to track (must support weak references)
+        sizer: Returns the object's size in bytes; without it only the count is reported
+    """
+    live = _live.get(kind)
+    if live is None:
+        with _lock:
+            live = _live.setdefault(kind, {})
+            if sizer is not None:
+                _sizers[kind] = sizer
+    key = id(obj)
+
+    def forget(ref, key=key, live=live):
+        if live.get(key) is ref:
+            del live[key]
+
+    live[key] = weakref.ref(obj, forget)
+
+
+def request_started(method: str, path: str, body_bytes: int = 0) -> int:
+    """Record an in-flight request; returns the id to pass to request_finished"""
+    request_id = next(_inflight_ids)
+    _inflight[request_id] = {'method': method, 'path': path, 'body_bytes': body_bytes,
+                             'started': time.monotonic()}
+    return request_id
+
+
+def request_finished(request_id: int) -> None:
+    _inflight.pop(request_id, None)
+
+
+def _inflight_report() -> Dict[str, Any]:
+    now = time.monotonic()
+    requests = sorted(list(_inflight.values()), key=lambda r: r['started'])
+    return {
+        'count': len(requests),
+        'body_bytes': sum(r['body_bytes'] for r in requests),
+        'oldest': [{'method': r['method'], 'path': r['path'], 'age_s': round(now - r['started'], 3)}
+                   for r in requests[:10]]
+    }
+
+
+def memory_report() -> Dict[str, Any]:
+    """
+    Memory use by component, live tracked objects and in-flight requests
+
+    Returns:
+        Report with process RSS, per-component bytes and details, live object
+        counts and sizes, in-flight requests and GC counters
+    """
+    components = {}
+    for name, report in sorted(list(_components.items())):
+        try:
+            components[name] = report()
+        except Exception as e:
+            components[name] = {'bytes': None, 'error': str(e)}
+
+    live = {}
+    for kind, refs in sorted(list(_live.items())):
+        items = [obj for obj in (ref() for ref in list(refs.values())) if obj is not None]
+        entry = {'count': len(items)}
+        sizer = _sizers.get(kind)
+        if sizer is not None:
+            entry['bytes'] = sum(sizer(item) for item in items)
+        live[kind] = entry
+
+    return {
+        'rss_bytes': process_rss(),
+        'components': components,
+        'live_objects': live,
+        'inflight_requests': _inflight_report(),
+        'gc': {'counts': gc.get_count(), 'objects': len(gc.get_objects())},
+        'tracemalloc': allocation_tracker.status()
+    }
+
+
+class AllocationTracker:
+    """On-demand tracemalloc baseline and diff"""
+
+    # Allocations made by the tracing machinery itself
+    _FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    )
+
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_at: Optional[float] = None
+        self._started_here = False
+        self._lock = threading.Lock()
+
+    def snapshot(self, frames: int = 10) -> Dict[str, Any]:
+        """
+        Start tracing if needed and take a new baseline
+
+        Allocations made before tracing started are invisible to the diff, so
+        take the baseline before the load you want to inspect.
+
+        Args:
+            frames: Stack depth recorded per allocation (only used when tracing starts here)
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._started_here = True
+            gc.collect()
+            self.baseline = tracemalloc.take_snapshot().filter_traces(self._FILTERS)
+            self.baseline_at = time.time()
+        return self.status()
+
+    def diff(self, limit: int = 20, group_by: str = 'lineno') -> List[Dict[str, Any]]:
+        """
+        Allocation growth since the baseline, largest first
+
+        Args:
+            limit: Number of rows returned
+            group_by: 'lineno', 'filename' or 'traceback'
+
+        Returns:
+            Rows with location, size_diff, size, count_diff and count
+        """
+        if group_by not in ('lineno', 'filename', 'traceback'):
+            raise ValueError(f"Unknown group_by: {group_by}")
+        with self._lock:
+            if self.baseline is None or not tracemalloc.is_tracing():
+                raise RuntimeError("No baseline snapshot; take one first")
+            gc.collect()
+            current = tracemalloc.take_snapshot().filter_traces(self._FILTERS)
+            stats = current.compare_to(self.baseline, group_by)
+
+        rows = []
+        for stat in stats[:limit]:
+            frames = stat.traceback if group_by == 'traceback' else stat.traceback[:1]
+            rows.append({
+                'location': [f"{frame.filename}:{frame.lineno}" for frame in frames],
+                'size_diff': stat.size_diff,
+                'size': stat.size,
+                'count_diff': stat.count_diff,
+                'count': stat.count
+            })
+        return rows
+
+    def stop(self) -> None:
+        """Drop the baseline and stop tracing if it was started by snapshot()"""
+        with self._lock:
+            self.baseline = None
+            self.baseline_at = None
+            if self._started_here and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._started_here = False
+
+    def status(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        status = {'tracing': tracing, 'baseline_at': self.baseline_at}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            status.update(traced_bytes=current, peak_bytes=peak,
+                          overhead_bytes=tracemalloc.get_tracemalloc_memory())
+        return status
+
+
+allocation_tracker = AllocationTracker()
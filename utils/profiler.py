@@ -0,0 +1,147 @@
+"""
+Opt-in sampling profiler
+
+A background thread samples the Python stack of every other thread at a
+fixed interval (``sys._current_frames``) and counts identical stacks. The
+profiled code is not instrumented, so its overhead is the sampler's own CPU
+time, roughly proportional to 1 / interval. Results are written in the
+collapsed ("folded") stack format read by flamegraph.pl, speedscope and
+inferno:
+
+    MainThread;run (app.py:250);analyze (app.py:140);_call_api (perplexity_analyzer.py:250) 12
+
+Profiling is enabled with Config.PROFILING_ENABLED and triggered either per
+request (``X-Profile: 1`` header; streamed responses are sampled until the
+body has been sent) or for a time window (``POST /api/profile``).
+"""
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Only one profile runs at a time: concurrent samplers would double the overhead
+_profile_slot = threading.BoundedSemaphore(1)
+
+
+def _frame_label(code) -> str:
+    # ';' separates frames in the folded format
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads but its own into folded-stack counts"""
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        """
+        Args:
+            interval: Seconds between samples
+            max_depth: Frames kept per stack (innermost frames are kept)
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.counts: Dict[str, int] = {}
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Folded label per code object, so repeated frames are formatted once
+        self._labels: Dict[object, str] = {}
+
+    def start(self) -> 'SamplingProfiler':
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> 'SamplingProfiler':
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._sample(names.get(thread_id, str(thread_id)), frame)
+            self.samples += 1
+
+    def _sample(self, thread_name: str, frame) -> None:
+        labels = self._labels
+        stack: List[str] = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = _frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(thread_name.replace(';', ':'))
+        key = ';'.join(reversed(stack))
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def to_folded(self) -> str:
+        """Stacks in collapsed format, one ``frame;frame;... count`` line each"""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+    def top_frames(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Innermost frames with the most samples (where the time is spent)"""
+        totals: Dict[str, int] = {}
+        for stack, count in self.counts.items():
+            leaf = stack.rsplit(';', 1)[-1]
+            totals[leaf] = totals.get(leaf, 0) + count
+        return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+    def write(self, directory: str, label: str = 'profile') -> str:
+        """
+        Write the folded stacks to ``<directory>/<timestamp>-<label>.folded``
+
+        Returns:
+            Path of the written file
+        """
+        return self.save(profile_path(directory, label))
+
+    def save(self, path: str) -> str:
+        """Write the folded stacks to ``path`` (its directory is created if needed)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_folded())
+        return path
+
+
+def profile_path(directory: str, label: str = 'profile') -> str:
+    """Path ``<directory>/<timestamp>-<label>.folded`` for a new profile"""
+    safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label).strip('_') or 'profile'
+    return os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{safe_label}.folded")
+
+
+def try_start_profile(interval: float) -> Optional[SamplingProfiler]:
+    """Start a profile unless one is already running (returns None then)"""
+    if not _profile_slot.acquire(blocking=False):
+        return None
+    try:
+        return SamplingProfiler(interval).start()
+    except Exception:
+        _profile_slot.release()
+        raise
+
+
+def finish_profile(profiler: SamplingProfiler) -> SamplingProfiler:
+    """Stop a profile started with try_start_profile and free the slot"""
+    try:
+        return profiler.stop()
+    finally:
+        _profile_slot.release()
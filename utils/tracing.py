@@ -0,0 +1,275 @@
+"""
+Lightweight request tracing
+
+A trace is started per request; every ``span()`` opened while it is active
+(in the same task, or in tasks created from it) becomes a child of the span
+that was current when it was opened. Outside a trace ``span()`` does nothing
+but one context variable lookup:
+
+    with start_trace('POST /analyze') as trace:
+        with span('perplexity.call', operation='summary') as current:
+            current.set_attribute('retries', 1)
+    trace.export('logs/traces')      # OTLP/JSON, readable by OpenTelemetry tools
+    trace.waterfall()                # rows for a quick timing summary
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'learning_framework'
+
+STATUS_UNSET = 'unset'
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+# Attributes shown next to the span name in text waterfalls
+_LABEL_ATTRIBUTES = ('generator', 'operation', 'attempt')
+
+# OTLP status codes
+_OTLP_STATUS = {STATUS_UNSET: 0, STATUS_OK: 1, STATUS_ERROR: 2}
+
+_current_trace: contextvars.ContextVar[Optional['Trace']] = contextvars.ContextVar('trace', default=None)
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('span', default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'status')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns or self.start_ns),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': _OTLP_STATUS[self.status]}
+        }
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        return data
+
+
+class _NoopSpan:
+    """Span returned outside a trace; discards everything"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Trace:
+    """Finished spans of one request"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Trace in the OTLP/JSON export format"""
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+                'scopeSpans': [{
+                    'scope': {'name': SERVICE_NAME},
+                    'spans': [s.to_otlp() for s in sorted(self.spans, key=lambda s: s.start_ns)]
+                }]
+            }]
+        }
+
+    def export(self, directory: str) -> str:
+        """
+        Write the trace as OTLP/JSON
+
+        Args:
+            directory: Output directory (created if missing)
+
+        Returns:
+            Path of the written ``<trace_id>.json`` file
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.trace_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_otlp(), f, separators=(',', ':'))
+        return path
+
+    def waterfall(self) -> List[Dict[str, Any]]:
+        """
+        Spans in start order with their offset from the start of the trace
+
+        Returns:
+            Rows with name, depth, start_ms, duration_ms, status and attributes
+        """
+        if not self.spans:
+            return []
+        origin = min(s.start_ns for s in self.spans)
+        depth = {}
+        rows = []
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            depth[s.span_id] = depth.get(s.parent_id, -1) + 1
+            rows.append({
+                'name': s.name,
+                'depth': depth[s.span_id],
+                'start_ms': round((s.start_ns - origin) / 1e6, 3),
+                'duration_ms': round(s.duration_ms, 3),
+                'status': s.status,
+                'attributes': dict(s.attributes)
+            })
+        return rows
+
+    def render_waterfall(self, width: int = 40) -> str:
+        """Waterfall as text, one line per span with a bar scaled to the trace length"""
+        rows = self.waterfall()
+        if not rows:
+            return ''
+        total = max(row['start_ms'] + row['duration_ms'] for row in rows) or 1.0
+        lines = []
+        for row in rows:
+            offset = int(row['start_ms'] / total * width)
+            length = max(1, int(row['duration_ms'] / total * width))
+            details = [str(row['attributes'][key]) for key in _LABEL_ATTRIBUTES if key in row['attributes']]
+            label = '  ' * row['depth'] + ' '.join([row['name']] + details)
+            lines.append(f"{label:<40} {' ' * offset}{'#' * length:<{width - offset}} {row['duration_ms']:>10.1f} ms")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def start_trace(name: str, export_dir: Optional[str] = None, **attributes: Any) -> Iterator[Trace]:
+    """
+    Start a trace with a root span for the duration of the block
+
+    Args:
+        name: Root span name, e.g. 'POST /analyze'
+        export_dir: If set, the finished trace is written there as OTLP/JSON
+        attributes: Root span attributes
+    """
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        with span(name, **attributes) as root:
+            trace.root = root
+            yield trace
+    finally:
+        _current_trace.reset(token)
+        if export_dir:
+            try:
+                trace.export(export_dir)
+            except OSError as e:
+                logger.warning(f"Could not export trace {trace.trace_id}: {str(e)}")
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a block as a child of the current span
+
+    The span is marked as an error (and re-raises) if the block raises.
+
+    Args:
+        name: Span name
+        attributes: Initial span attributes
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(name, trace.trace_id, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = STATUS_ERROR
+        current.attributes['exception.type'] = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.spans.append(current)
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator running a function (sync or async) inside a span
+
+    Args:
+        name: Span name
+    """
+    def decorator(function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span() -> Any:
+    """The innermost open span, or a no-op span outside a trace"""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the active trace, if any"""
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None